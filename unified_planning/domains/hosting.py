@@ -79,7 +79,7 @@ class Hosting(Domain):
         find_broom.add_precondition(OverallPreconditionTiming(), lightOn, True)
 
         find_broom.add_probabilistic_effect([found_broom],
-                                              self.found_prob())
+                                              self.found_prob(), static=True)
         self.problem.add_action(find_broom)
 
 
@@ -146,7 +146,7 @@ class Machine_Shop(Domain):
         def probability(state, actual_params):
             piece_param = actual_params.get(piece)
 
-            return {p[0]: {fluent(piece_param): True}, p[1]: {}}
+            return [(p[0], [fluent(piece_param)], []), (p[1], [], [])]
 
         return probability
 
@@ -187,7 +187,8 @@ class Machine_Shop(Domain):
         if self.kind == 'regular':
             polish.add_precondition(OverallPreconditionTiming(), at(piece, machine), True)
 
-        polish.add_probabilistic_effect([polished(piece)], self.action_prob(p=[0.9, 0.1], fluent=polished, piece=piece))
+        polish.add_probabilistic_effect([polished(piece)], self.action_prob(p=[0.9, 0.1], fluent=polished, piece=piece),
+                                        static=True)
         self.problem.add_action(polish)
 
     def spraypaint_action(self):
@@ -205,7 +206,7 @@ class Machine_Shop(Domain):
             spraypaint.add_precondition(OverallPreconditionTiming(), at(piece, machine), True)
 
         spraypaint.add_probabilistic_effect([painted(piece)],
-                                            self.action_prob(p=[0.8, 0.2], fluent=painted, piece=piece))
+                                            self.action_prob(p=[0.8, 0.2], fluent=painted, piece=piece), static=True)
         self.problem.add_action(spraypaint)
 
     def immersionpaint_action(self):
@@ -230,7 +231,7 @@ class Machine_Shop(Domain):
             immersionpaint.add_precondition(OverallPreconditionTiming(), hasimmersion(machine), True)
 
         immersionpaint.add_probabilistic_effect([painted(piece), hasimmersion(machine)],
-                                                self.immersionpaint_prob(piece, machine))
+                                                self.immersionpaint_prob(piece, machine), static=True)
         self.problem.add_action(immersionpaint)
 
     def lathe_action(self):
@@ -252,7 +253,7 @@ class Machine_Shop(Domain):
         lathe.add_effect(painted(piece), False)  # TODO: changed to be not probabilistic effect
         lathe.add_effect(smooth(piece), False)   # TODO: changed to be not probabilistic effect
         # lathe.add_probabilistic_effect([shaped(piece), painted(piece), smooth(piece)], self.lathe_prob(piece))
-        lathe.add_probabilistic_effect([shaped(piece)], self.lathe_prob(piece))
+        lathe.add_probabilistic_effect([shaped(piece)], self.lathe_prob(piece), static=True)
         self.problem.add_action(lathe)
 
     def grind_action(self):
@@ -269,7 +270,8 @@ class Machine_Shop(Domain):
         if self.kind == 'regular':
             grind.add_precondition(OverallPreconditionTiming(), at(piece, machine), True)
 
-        grind.add_probabilistic_effect([smooth(piece)], self.action_prob(p=[0.9, 0.1], fluent=smooth, piece=piece))
+        grind.add_probabilistic_effect([smooth(piece)], self.action_prob(p=[0.9, 0.1], fluent=smooth, piece=piece),
+                                       static=True)
         self.problem.add_action(grind)
 
     def buyimmersion_action(self):
@@ -222,10 +222,10 @@ class Nasa_Rover(Domain):
             rock_param = actual_params.get(rock)
             store_param = actual_params.get(store)
             rover_param = actual_params.get(rover)
-            return {p[0]: {full(store_param): True, have_rock_analysis(rover_param, rock_param): True,
-                           free_h(hand_param): True,
-                           ready(hand_param, rock_param): False},
-                    p[1]: {ready(hand_param, rock_param): False, free_h(hand_param): True}, p[2]: {}}
+            return [(p[0], [full(store_param), have_rock_analysis(rover_param, rock_param), free_h(hand_param)],
+                     [ready(hand_param, rock_param)]),
+                    (p[1], [free_h(hand_param)], [ready(hand_param, rock_param)]),
+                    (p[2], [], [])]
 
         return sample_probability
 
@@ -259,8 +259,8 @@ class Nasa_Rover(Domain):
         def communicate_probability(state, actual_params):
             actual_param = actual_params.get(param)
 
-            return {p[0]: {fluent(actual_param): True},
-                    p[1]: {fluent(actual_param): False}}
+            return [(p[0], [fluent(actual_param)], []),
+                    (p[1], [], [fluent(actual_param)])]
 
         return communicate_probability
 
@@ -292,7 +292,7 @@ class Nasa_Rover(Domain):
 
         sample_rock_good.add_probabilistic_effect(
             [full(store), have_rock_analysis(rover, rock), free_h(hand), ready(hand, rock)],
-            self.sample_prob(hand, rock, store, rover, p=[0.9, 0.051, 0.049]))
+            self.sample_prob(hand, rock, store, rover, p=[0.9, 0.051, 0.049]), static=True)
         self.problem.add_action(sample_rock_good)
 
     def sample_rock_action(self):
@@ -323,7 +323,7 @@ class Nasa_Rover(Domain):
 
         sample_rock.add_probabilistic_effect(
             [full(store), have_rock_analysis(rover, rock), free_h(hand), ready(hand, rock)],
-            self.sample_prob(hand, rock, store, rover, p=[0.7, 0.05, 0.25]))
+            self.sample_prob(hand, rock, store, rover, p=[0.7, 0.05, 0.25]), static=True)
         self.problem.add_action(sample_rock)
 
     def drop_action(self):
@@ -401,7 +401,8 @@ class Nasa_Rover(Domain):
         turn_on_hand.add_precondition(free_h(hand), True)
         turn_on_hand.add_precondition(good(hand), False)
 
-        turn_on_hand.add_probabilistic_effect([free_h(hand), ready(hand, rock)], self.turn_hand_prob(hand, rock))
+        turn_on_hand.add_probabilistic_effect([free_h(hand), ready(hand, rock)], self.turn_hand_prob(hand, rock),
+                                              static=True)
         self.problem.add_action(turn_on_hand)
 
     def take_image_action(self):
@@ -420,7 +421,7 @@ class Nasa_Rover(Domain):
         take_image.add_precondition(OverallPreconditionTiming(), on_board(camera, rover), True)
 
         take_image.add_probabilistic_effect([have_image(rover, objective), calibrated(camera, objective)],
-                                            self.take_image_prob(rover, objective, camera))
+                                            self.take_image_prob(rover, objective, camera), static=True)
         self.problem.add_action(take_image)
 
     def communicate_rock_data_action(self):
@@ -436,7 +437,8 @@ class Nasa_Rover(Domain):
 
         communicate_rock_data.add_probabilistic_effect([communicated_rock_data(rock)],
                                                        self.communicate_prob(p=[0.6, 0.4],
-                                                                             fluent=communicated_rock_data, param=rock))
+                                                                             fluent=communicated_rock_data, param=rock),
+                                                       static=True)
         self.problem.add_action(communicate_rock_data)
 
     def communicate_image_data_action(self):
@@ -454,7 +456,7 @@ class Nasa_Rover(Domain):
         communicate_image_data.add_probabilistic_effect([communicated_image_data(objective)],
                                                         self.communicate_prob(p=[0.6, 0.4],
                                                                               fluent=communicated_image_data,
-                                                                              param=objective))
+                                                                              param=objective), static=True)
         self.problem.add_action(communicate_image_data)
 
 
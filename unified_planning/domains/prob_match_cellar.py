@@ -51,7 +51,7 @@ class Prob_MatchCellar(Domain):
         mended = self.problem.fluent_by_name("mended")
         def probability(state, actual_params):
             fluent_param = actual_params.get(fluent)
-            return {p[0]: {mended(fluent_param): True}, p[1]: {}}
+            return [(p[0], [mended(fluent_param)], []), (p[1], [], [])]
 
         return probability
 
@@ -84,7 +84,7 @@ class Prob_MatchCellar(Domain):
         mend_fuse.add_precondition(OverallPreconditionTiming(), light(match), True)
         mend_fuse.add_start_effect(handFree(match), False)
 
-        mend_fuse.add_probabilistic_effect([mended(fuse)], self.action_prob(p=[0.7, 0.3], fluent=fuse))
+        mend_fuse.add_probabilistic_effect([mended(fuse)], self.action_prob(p=[0.7, 0.3], fluent=fuse), static=True)
         mend_fuse.add_effect(handFree(match), True)
 
         self.problem.add_action(mend_fuse)
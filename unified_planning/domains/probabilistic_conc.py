@@ -51,7 +51,7 @@ class Prob_Conc(Domain):
 
     def action_prob(self, p, fluent):
         def probability(state, actual_params):
-            return {p[0]: {fluent: True}, p[1]: {}}
+            return [(p[0], [fluent], []), (p[1], [], [])]
 
         return probability
 
@@ -72,7 +72,7 @@ class Prob_Conc(Domain):
         four = unified_planning.model.action.DurativeAction('four')
         four.set_fixed_duration(4)
 
-        four.add_probabilistic_effect([got(b)], self.action_prob(p=[0.7, 0.3], fluent=got(b)))
+        four.add_probabilistic_effect([got(b)], self.action_prob(p=[0.7, 0.3], fluent=got(b)), static=True)
         self.problem.add_action(four)
 
     def two_action(self):
@@ -82,7 +82,7 @@ class Prob_Conc(Domain):
         two = unified_planning.model.action.DurativeAction('two')
         two.set_fixed_duration(2)
 
-        two.add_probabilistic_effect([got(c)], self.action_prob(p=[0.49, 0.51], fluent=got(c)))
+        two.add_probabilistic_effect([got(c)], self.action_prob(p=[0.49, 0.51], fluent=got(c)), static=True)
         self.problem.add_action(two)
 
     def one_action(self):
@@ -92,7 +92,7 @@ class Prob_Conc(Domain):
         one = unified_planning.model.action.DurativeAction('one')
         one.set_fixed_duration(1)
 
-        one.add_probabilistic_effect([got(d)], self.action_prob(p=[0.3, 0.7], fluent=got(d)))
+        one.add_probabilistic_effect([got(d)], self.action_prob(p=[0.3, 0.7], fluent=got(d)), static=True)
         self.problem.add_action(one)
 
 
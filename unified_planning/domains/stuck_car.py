@@ -203,7 +203,7 @@ class Stuck_Car(Domain):
 
         place_rock.add_effect(rock_under_car(car, rock), True)
         place_rock.add_effect(got_rock(robot, rock), False)
-        place_rock.add_probabilistic_effect([tired(robot)], self.tired_prob(robot))
+        place_rock.add_probabilistic_effect([tired(robot)], self.tired_prob(robot), static=True)
 
         self.problem.add_action(place_rock)
 
@@ -229,7 +229,7 @@ class Stuck_Car(Domain):
             return {p: {got_rock(robot_param, bad): True},
                     1 - p: {got_rock(robot_param, good): True}}
 
-        search.add_probabilistic_effect([got_rock(robot, bad), got_rock(robot, good)], rock_probability)
+        search.add_probabilistic_effect([got_rock(robot, bad), got_rock(robot, good)], rock_probability, static=True)
         self.problem.add_action(search)
 
     def push_gas_action(self):
@@ -270,7 +270,7 @@ class Stuck_Car(Domain):
         self.use_bodyPart(push_car, robot, hands)
 
         push_car.add_probabilistic_effect([car_out(car)], self.push_prob(car, probs=dict(bad=0.3, good=0.48, none=0.1)))
-        push_car.add_probabilistic_effect([tired(robot)], self.tired_prob(robot))
+        push_car.add_probabilistic_effect([tired(robot)], self.tired_prob(robot), static=True)
         self.problem.add_action(push_car)
 
     def push_car_gas_action(self):
@@ -290,7 +290,7 @@ class Stuck_Car(Domain):
 
         push_car_gas.add_probabilistic_effect([car_out(car)],
                                               self.push_prob(car, probs=dict(bad=0.4, good=0.9, none=0.2)))
-        push_car_gas.add_probabilistic_effect([tired(robot)], self.tired_prob(robot))
+        push_car_gas.add_probabilistic_effect([tired(robot)], self.tired_prob(robot), static=True)
 
         self.problem.add_action(push_car_gas)
 
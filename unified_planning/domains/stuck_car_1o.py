@@ -145,7 +145,7 @@ class Stuck_Car_1o(Domain):
 
         place_rock.add_effect(rock_under_car(rock), True)
         place_rock.add_effect(got_rock(rock), False)
-        place_rock.add_probabilistic_effect([tired], self.tired_prob())
+        place_rock.add_probabilistic_effect([tired], self.tired_prob(), static=True)
         self.problem.add_action(place_rock)
 
     def search_rock_action(self):
@@ -178,7 +178,7 @@ class Stuck_Car_1o(Domain):
             return {p: {got_rock_0_exp: True},
                     1 - p: {got_rock_1_exp: True}}
 
-        search.add_probabilistic_effect([got_rock(bad), got_rock(good)], rock_probability)
+        search.add_probabilistic_effect([got_rock(bad), got_rock(good)], rock_probability, static=True)
         self.problem.add_action(search)
 
     def push_gas_action(self):
@@ -215,7 +215,7 @@ class Stuck_Car_1o(Domain):
         self.use(push_car, free(hands))
 
         push_car.add_probabilistic_effect([car_out], self.push_prob(probs=dict(bad=0.3, good=0.48, none=0.1)))
-        push_car.add_probabilistic_effect([tired], self.tired_prob())
+        push_car.add_probabilistic_effect([tired], self.tired_prob(), static=True)
 
         self.problem.add_action(push_car)
 
@@ -235,7 +235,7 @@ class Stuck_Car_1o(Domain):
         self.use(push_car_gas, free(legs))
 
         push_car_gas.add_probabilistic_effect([car_out], self.push_prob(probs=dict(bad=0.4, good=0.9, none=0.2)))
-        push_car_gas.add_probabilistic_effect([tired], self.tired_prob())
+        push_car_gas.add_probabilistic_effect([tired], self.tired_prob(), static=True)
 
         self.problem.add_action(push_car_gas)
 
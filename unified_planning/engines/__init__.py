@@ -16,6 +16,10 @@ from unified_planning.engines.node import (
     C_ANode,
     C_SNode,
 )
+from unified_planning.engines.fluent_index import FluentIndex, ActionMasks
+from unified_planning.engines.legal_actions_engine import LegalActionsEngine
+from unified_planning.engines.lru_cache import LRUCache
+from unified_planning.engines.outcome_sampler import AliasSampler, CompiledOutcomes
 from unified_planning.engines.state import State, CombinationState, ActionQueue, QueueNode
 from unified_planning.engines.mdp import MDP, combinationMDP
 from unified_planning.engines.mixins.compiler import CompilationKind
@@ -23,9 +27,12 @@ from unified_planning.engines.engine import Engine
 from unified_planning.engines.compilers.grounder import Grounder, GrounderHelper
 from unified_planning.engines.solvers.mcts import (plan, MCTS, C_MCTS)
 from unified_planning.engines.solvers.rtdp import (plan, RTDP)
+from unified_planning.engines.solvers.search_budget import SearchBudget
 from unified_planning.engines.utils import create_init_stn, update_stn
 from unified_planning.engines.heuristics import TRPG
-from unified_planning.engines.linked_list import LinkedList, LinkedListNode
+from unified_planning.engines.linked_list import LinkedListNode
+from unified_planning.engines.interval_map import IntervalMap
+from unified_planning.engines.profiling import Profiler, profiler
 
 __all__ = [
     "Convert_problem",
@@ -41,6 +48,12 @@ __all__ = [
     "SNode",
     "C_ANode",
     "C_SNode",
+    "FluentIndex",
+    "ActionMasks",
+    "LegalActionsEngine",
+    "LRUCache",
+    "AliasSampler",
+    "CompiledOutcomes",
     "State",
     "CombinationState",
     "ActionQueue",
@@ -56,10 +69,13 @@ __all__ = [
     "plan",
     "plan",
     "RTDP",
+    "SearchBudget",
     "create_init_stn",
     "update_stn",
     "TRPG",
-    "LinkedList",
     "LinkedListNode",
+    "IntervalMap",
+    "Profiler",
+    "profiler",
 
 ]
\ No newline at end of file
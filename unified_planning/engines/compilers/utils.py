@@ -157,7 +157,7 @@ def create_probabilistic_effect_with_given_subs(
         assert old_probabilistic_effect is not None
         return old_probabilistic_effect.probability_function(_state, c_subs)
 
-    return ProbabilisticEffect(new_fluents, fun)
+    return ProbabilisticEffect(new_fluents, fun, old_probabilistic_effect.static)
 
 
 def create_action_with_given_subs(
@@ -0,0 +1,88 @@
+import unified_planning as up
+from typing import Dict, Iterable, List, Set
+
+
+class FluentIndex:
+    """
+    Interns the ground fluents of a problem as bit positions,
+    so a set of predicates is encoded as an int bitmask.
+    A fluent that is not indexed yet gets the next free bit.
+    """
+    def __init__(self, fluents: Iterable["up.model.fnode.FNode"] = ()):
+        self._bits: Dict["up.model.fnode.FNode", int] = {}
+        self._fluents: List["up.model.fnode.FNode"] = []
+        self._hashes: List[int] = []
+        for fluent in fluents:
+            self.bit(fluent)
+
+    def __len__(self):
+        return len(self._fluents)
+
+    def bit(self, fluent: "up.model.fnode.FNode") -> int:
+        """ Returns the bit position of `fluent` """
+        bit = self._bits.get(fluent)
+        if bit is None:
+            bit = len(self._fluents)
+            self._bits[fluent] = bit
+            self._fluents.append(fluent)
+            self._hashes.append(hash(fluent))
+        return bit
+
+    def mask(self, fluents: Iterable["up.model.fnode.FNode"]) -> int:
+        """ Returns the bitmask of `fluents` """
+        mask = 0
+        for fluent in fluents:
+            mask |= 1 << self.bit(fluent)
+        return mask
+
+    def fluents(self, mask: int) -> Set["up.model.fnode.FNode"]:
+        """ Returns the fluents of the bits set in `mask` """
+        fluents = set()
+        while mask:
+            low = mask & -mask
+            fluents.add(self._fluents[low.bit_length() - 1])
+            mask ^= low
+        return fluents
+
+    def hash_sum(self, mask: int) -> int:
+        """ Returns the sum of the hashes of the fluents of the bits set in `mask` """
+        res = 0
+        hashes = self._hashes
+        while mask:
+            low = mask & -mask
+            res += hashes[low.bit_length() - 1]
+            mask ^= low
+        return res
+
+
+class ActionMasks:
+    """
+    The preconditions and the effects of an action as bitmasks of a FluentIndex.
+
+    `relevant` and `end_delete` hold, for a start action, the fluents the action and its end action
+    contribute - the action is not relevant in a state that holds all the `relevant` fluents and none of
+    the `end_delete` fluents.
+    """
+    def __init__(self, action: "up.engines.Action", fluent_index: FluentIndex,
+                 in_execution: "up.model.fluent.Fluent" = None):
+        self.pos_preconditions = fluent_index.mask(getattr(action, 'pos_preconditions', ()))
+        self.neg_preconditions = fluent_index.mask(getattr(action, 'neg_preconditions', ()))
+        self.add_effects = fluent_index.mask(getattr(action, 'add_effects', ()))
+        self.del_effects = fluent_index.mask(getattr(action, 'del_effects', ()))
+        self.in_execution = fluent_index.mask(getattr(action, 'inExecution', None) or ())
+        self.is_probabilistic = bool(getattr(action, 'probabilistic_effects', None))
+
+        self.relevant = None
+        self.end_delete = None
+        if isinstance(action, up.engines.InstantaneousStartAction):
+            end_action = action.end_action
+            # inExecution is not considered a new effect
+            add = [a for a in action.add_effects if a._content.payload != in_execution]
+            self.relevant = fluent_index.mask(add) | fluent_index.mask(end_action.add_effects)
+            for pe in end_action.probabilistic_effects:
+                self.relevant |= fluent_index.mask(pe.fluents)
+            self.end_delete = fluent_index.mask(end_action.del_effects)
+
+    def apply(self, mask: int) -> int:
+        """ Returns `mask` after the deterministic effects of the action """
+        return (mask | self.add_effects) & ~self.del_effects
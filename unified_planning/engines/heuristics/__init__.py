@@ -1,6 +1,9 @@
-from unified_planning.engines.heuristics.trpg import TRPG
+from unified_planning.engines.heuristics.trpg import TRPG, TRPGTables
+from unified_planning.engines.heuristics.heuristic_cache import HeuristicCache
 
 
 __all__ = [
     "TRPG",
+    "TRPGTables",
+    "HeuristicCache",
 ]
\ No newline at end of file
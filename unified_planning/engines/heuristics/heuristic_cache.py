@@ -0,0 +1,78 @@
+import unified_planning as up
+from typing import Dict
+
+
+class HeuristicCache:
+    """
+    Memoizes the TRPG heuristic of an MDP by the state, the current time and the lower bounds of the end actions,
+    evicting the least recently used values when it is full.
+
+    With probabilistic effects in the 'sample' heuristic mode the TRPG draws the outcomes, so the cached value is
+    the expected value, estimated by the average of the first `samples` evaluations of the key.
+    Otherwise the TRPG is deterministic and a single evaluation is cached.
+
+    :param mdp: the MDP the TRPG is built on
+    :param size: the amount of values the cache holds
+    :param samples: the amount of evaluations averaged before a value is served from the cache
+    """
+    def __init__(self, mdp: "up.engines.MDP", size: int, samples: int = 1):
+        assert samples > 0
+        self._mdp = mdp
+        self._cache = up.engines.LRUCache(size)
+        self._deterministic = mdp.heuristic_mode != 'sample' or not any(
+            getattr(action, 'probabilistic_effects', None) for action in mdp.problem.actions)
+        self._samples = 1 if self._deterministic else samples
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def samples(self):
+        return self._samples
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    def key(self, state: "up.engines.State", current_time: int, lower_bounds: Dict = None):
+        """ Returns the cache key of the heuristic of `state` """
+        bounds = None
+        if lower_bounds is not None:
+            bounds = tuple(sorted((id(action), bound) for action, bound in lower_bounds.items()))
+        return self._mdp.state_mask(state), current_time, bounds
+
+    def value(self, state: "up.engines.State", current_time: int, lower_bounds: Dict = None):
+        """
+        Returns the heuristic of `state` at `current_time`,
+        runs the TRPG and returns its value if the key was evaluated less than `samples` times
+        """
+        key = self.key(state, current_time, lower_bounds)
+        # [sum of the evaluations, amount of evaluations]
+        entry = self._cache.get(key)
+        if entry is not None and entry[1] >= self._samples:
+            self._hits += 1
+            return entry[0] / entry[1]
+
+        self._misses += 1
+        h = up.engines.heuristics.TRPG(self._mdp, state, current_time)
+        value = h.get_heuristic(lower_bounds)
+        if entry is None:
+            entry = [0, 0]
+        entry[0] += value
+        entry[1] += 1
+        self._cache.put(key, entry)
+        return value
+
+    def clear(self):
+        self._cache.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def info(self):
+        """ Returns the size, the amount of entries, the hits, the misses and the hit rate of the cache """
+        lookups = self._hits + self._misses
+        return dict(size=self._cache.size, entries=len(self._cache), hits=self._hits, misses=self._misses,
+                    hit_rate=self._hits / lookups if lookups else 0.0)
@@ -1,78 +1,142 @@
 import heapq
 import math
 import unified_planning as up
-from typing import Dict
 import numpy as np
 
 
+class TRPGTables:
+    """
+    The static data of the TRPG of an MDP, built once per MDP and shared by all the evaluations:
+    the preconditions and the effects of the actions as bitmasks, the pairing of the start and the end actions,
+    the inExecution fluent of each end action and the durations as integers.
+    The actions are referred to by their row in the problem actions.
+    """
+    def __init__(self, mdp: "up.engines.MDP"):
+        problem = mdp.problem
+        fluent_index = mdp.fluent_index
+        self.actions = list(problem.actions)
+        self.rows = {id(action): i for i, action in enumerate(self.actions)}
+
+        masks = [mdp.action_masks(action) for action in self.actions]
+        self.pos_preconditions = [m.pos_preconditions for m in masks]
+        self.neg_preconditions = [m.neg_preconditions for m in masks]
+        self.add_effects = [m.add_effects for m in masks]
+        self.del_effects = [m.del_effects for m in masks]
+        self.probabilistic = [m.is_probabilistic for m in masks]
+
+        self.initial_mask = fluent_index.mask(problem.initial_values.keys())
+        self.goals_mask = fluent_index.mask(problem.goals)
+        self.deadline = mdp.deadline() if mdp.deadline() else math.inf
+
+        self.is_start = [isinstance(action, up.engines.InstantaneousStartAction) for action in self.actions]
+        self.end_actions = [i for i, action in enumerate(self.actions)
+                            if isinstance(action, up.engines.InstantaneousEndAction)]
+        # The row of the end action of a start action, the duration of a start action or of the start of an end action
+        self.end_row = [-1] * len(self.actions)
+        self.duration = [0] * len(self.actions)
+        # The inExecution fluent of an end action, as a bitmask
+        self.in_execution = [0] * len(self.actions)
+
+        inExecution = problem.fluent_by_name('inExecution')
+        for i, action in enumerate(self.actions):
+            if self.is_start[i]:
+                self.end_row[i] = self.row(action.end_action)
+                self.duration[i] = action.duration.lower.int_constant_value()
+            elif isinstance(action, up.engines.InstantaneousEndAction):
+                self.duration[i] = action.start_action.duration.lower.int_constant_value()
+                action_object = problem.object_by_name(f'start-{action.name[4:]}')
+                self.in_execution[i] = fluent_index.mask([inExecution(action_object)])
+
+    def row(self, action: "up.engines.Action") -> int:
+        """ Returns the row of `action` """
+        row = self.rows.get(id(action))
+        if row is None:
+            row = self.actions.index(action)
+        return row
+
+
 class TRPG:
 
-    def __init__(self, mdp: "up.engines.MDP", state: "up.engines.State", current_time: int):
+    def __init__(self, mdp: "up.engines.MDP", state: "up.engines.State", current_time: int, mode: str = None):
+        """
+        :param mode: how probabilistic effects are applied, 'sample', 'union' or 'most_likely',
+                     the heuristic mode of the MDP if not given
+        """
         self.mdp = mdp
-        self.negative = set(mdp.problem.initial_values.keys()).difference(state.predicates)
-        self.positive = set(state.predicates)
-        self.new_actions = []
+        self.mode = mode if mode is not None else mdp.heuristic_mode
+        self.tables = mdp.trpg_tables
+        self.positive = mdp.state_mask(state)
+        self.negative = self.tables.initial_mask & ~self.positive
+        # The rows of the actions not performed yet, in the order of the problem actions
+        self.new_actions = list(range(len(self.tables.actions)))
         self.legal_probabilistic_actions = []
-        self.deadline = self.mdp.deadline() if self.mdp.deadline() else math.inf
+        self.is_legal_probabilistic = [False] * len(self.tables.actions)
+        self.deadline = self.tables.deadline
         self.current_time = current_time
+        # The applicable actions of the current layer, computed by the legal actions engine of the MDP if exists
+        self.engine = self.mdp.legal_actions_engine
+        self.applicable = None
 
     def get_heuristic(self, lower_bounds=None):
         """
         Calculates the heuristic based on the current state and time
         """
+        tables = self.tables
         t = self.current_time
         earliest = self.init_actions(lower_bounds)
 
-        while t <= self.deadline and not self.mdp.problem.goals.issubset(self.positive):
-            negative_eps = set(self.negative)
-            positive_eps = set(self.positive)
+        while t <= self.deadline and tables.goals_mask & ~self.positive:
+            negative_eps = self.negative
+            positive_eps = self.positive
+            self.update_applicable()
 
-            for action in self.legal_probabilistic_actions:
+            for row in self.legal_probabilistic_actions:
                 perform = True
-                if isinstance(action, up.engines.InstantaneousEndAction):
-                    if earliest[action] <= t:
-                        earliest[action] = t + action.start_action.duration.lower.int_constant_value()
+                if row in earliest:
+                    if earliest[row] <= t:
+                        earliest[row] = t + tables.duration[row]
                     else:
                         perform = False
                 if perform:
-                    self.add_probabilistic_effects(action, negative_eps, positive_eps)
+                    negative_eps, positive_eps = self.add_probabilistic_effects(row, negative_eps, positive_eps)
 
-            for action in self.new_actions[:]:
+            new_actions = []
+            for row in self.new_actions:
 
                 # end action can occur only after `earliest[action]` time
-                if isinstance(action, up.engines.InstantaneousEndAction):
-                    if earliest[action] > t:
-                        continue
+                if row in earliest and earliest[row] > t:
+                    new_actions.append(row)
+                    continue
 
                 # Checks if the preconditions of the action are held
-                legal = self.legal_action(action)
-
-                if not legal:
+                if not self.legal_action(row):
+                    new_actions.append(row)
                     continue
 
                 # Sets the time when the end action can be executed
-                if isinstance(action, up.engines.InstantaneousStartAction):
-                    earliest[action.end_action] = min(earliest.get(action.end_action),
-                                                      t + action.duration.lower.int_constant_value())
+                if tables.is_start[row]:
+                    end_row = tables.end_row[row]
+                    earliest[end_row] = min(earliest[end_row], t + tables.duration[row])
 
                 # add the effects of the action to the next state
-                self.add_effects(action, negative_eps, positive_eps)
-
-                self.new_actions.remove(action)
+                negative_eps, positive_eps = self.add_effects(row, negative_eps, positive_eps)
 
-                if action.probabilistic_effects:
-                    self.legal_probabilistic_actions.append(action)
+                if tables.probabilistic[row]:
+                    self.legal_probabilistic_actions.append(row)
+                    self.is_legal_probabilistic[row] = True
                     # The next time the end action can be executed is after the duration time
-                    if isinstance(action, up.engines.InstantaneousEndAction):
-                        earliest[action] = t + action.start_action.duration_int()
+                    if row in earliest:
+                        earliest[row] = t + tables.duration[row]
+            self.new_actions = new_actions
 
             # advance the time
-            if len(negative_eps.difference(self.negative)) > 0 or len(positive_eps.difference(self.positive)) > 0:
+            if negative_eps != self.negative or positive_eps != self.positive:
                 self.negative = negative_eps
                 self.positive = positive_eps
             else:
-                endpoints = [earliest.get(a) for a in earliest.keys() if self.legal_action(a) and a in self.new_actions]
-                endpoints += [earliest.get(a) for a in earliest.keys() if a in self.legal_probabilistic_actions]
+                new = set(new_actions)
+                endpoints = [earliest[row] for row in earliest if row in new and self.legal_action(row)]
+                endpoints += [earliest[row] for row in earliest if self.is_legal_probabilistic[row]]
                 if endpoints:
                     t = min(endpoints)
                 else:
@@ -104,46 +168,50 @@ class TRPG:
 
 
 
-    def add_probabilistic_effects(self, action, negative_eps, positive_eps):
-        state = up.engines.State(positive_eps)
-        add_predicates, del_predicates = self.mdp.apply_probabilistic_effects(state, action)
-        negative_eps.update(del_predicates)
-        positive_eps.update(add_predicates)
+    def add_probabilistic_effects(self, row, negative_eps, positive_eps):
+        """ Returns the masks `negative_eps` and `positive_eps` after the probabilistic effects of the action """
+        action = self.tables.actions[row]
+        if not action.probabilistic_effects:
+            return negative_eps, positive_eps
+        state = up.engines.State(mask=positive_eps, fluent_index=self.mdp.fluent_index)
+        if self.mode == 'sample':
+            add_mask, del_mask = self.mdp.apply_probabilistic_masks(state, action)
+        else:
+            add_mask, del_mask = self.mdp.relaxed_probabilistic_masks(state, action, self.mode)
+        return negative_eps | del_mask, positive_eps | add_mask
 
-    def add_effects(self, action, negative_eps, positive_eps):
-        negative_eps.update(action.del_effects)
-        positive_eps.update(action.add_effects)
-        self.add_probabilistic_effects(action, negative_eps, positive_eps)
+    def add_effects(self, row, negative_eps, positive_eps):
+        """ Returns the masks `negative_eps` and `positive_eps` after the effects of the action """
+        negative_eps |= self.tables.del_effects[row]
+        positive_eps |= self.tables.add_effects[row]
+        return self.add_probabilistic_effects(row, negative_eps, positive_eps)
 
     def init_actions(self, lower_bounds):
         """
-        Init all actions into the new actions list
-        ensures the end actions can be performed only after the start actions.
+        Ensures the end actions can be performed only after the start actions.
 
-        :return: earliest - a dictionary containing the earliest time each end action can be executed
+        :return: earliest - a dictionary containing the earliest time each end action can be executed, by its row
         """
-
+        tables = self.tables
         earliest = {}
-        inExecution = self.mdp.problem.fluent_by_name('inExecution')
-
-        for action in self.mdp.problem.actions:
-            self.new_actions.append(action)
-
-            # Makes sure end action can start only after the start action is performed
-            if isinstance(action, up.engines.InstantaneousEndAction):
-                action_object = self.mdp.problem.object_by_name(f'start-{action.name[4:]}')
 
-                if not inExecution(action_object) in self.positive:
-                    earliest[action] = math.inf
-                elif lower_bounds is None:
-                    earliest[action] = self.current_time
-                else:
-                    earliest[action] = lower_bounds[action]
-
-                # earliest[action] = self.current_time if inExecution(action_object) in self.positive else math.inf
+        for row in tables.end_actions:
+            if not tables.in_execution[row] & self.positive:
+                earliest[row] = math.inf
+            elif lower_bounds is None:
+                earliest[row] = self.current_time
+            else:
+                earliest[row] = lower_bounds[tables.actions[row]]
 
         return earliest
 
-    def legal_action(self, action):
-        return action.pos_preconditions.issubset(self.positive) and action.neg_preconditions.issubset(self.negative)
+    def update_applicable(self):
+        """ Computes the applicable actions of the current layer at once, when the MDP has a legal actions engine """
+        if self.engine is not None:
+            self.applicable = self.engine.applicable(self.positive, self.negative)
 
+    def legal_action(self, row):
+        if self.applicable is not None:
+            return self.applicable[row]
+        return not (self.tables.pos_preconditions[row] & ~self.positive
+                    or self.tables.neg_preconditions[row] & ~self.negative)
@@ -0,0 +1,211 @@
+from bisect import bisect_left, bisect_right
+import operator
+from typing import Optional
+import math
+
+from unified_planning.engines.linked_list import LinkedListNode
+
+
+UPDATE_TYPES = {'Sum': operator.add, 'Max': max}
+
+
+class IntervalMap:
+    """
+    Maps disjoint intervals of time to values.
+    The fragments are kept in three parallel lists sorted by their bounds, so the fragments an interval intersects
+    are found by bisection. A fragment is split at the bounds of an updated interval, the parts are `epsilon` apart.
+    """
+    __slots__ = ('_lowers', '_uppers', '_values', 'epsilon', '_max_value', '_max_interval', '_resolution', '_coalesce')
+
+    def __init__(self, resolution=None, coalesce=False):
+        """
+        :param resolution: if given, the bounds of the updated intervals are rounded to multiples of it,
+            so the amount of fragments is bounded by the length of the updated time span divided by it
+        :param coalesce: if True, adjacent fragments with equal values are merged after each update
+        """
+        self._resolution = resolution
+        self._coalesce = coalesce
+        self._lowers = []
+        self._uppers = []
+        self._values = []
+        self.epsilon = 0.001
+        self._max_value = -math.inf
+        self._max_interval = (0, math.inf)
+
+    def empty(self):
+        """ Returns an empty map with the resolution and the coalescing of this map """
+        return IntervalMap(self._resolution, self._coalesce)
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def max_value(self):
+        return self._max_value
+
+    @property
+    def max_interval(self):
+        return self._max_interval
+
+    @property
+    def resolution(self):
+        return self._resolution
+
+    @property
+    def coalesce(self):
+        return self._coalesce
+
+    @property
+    def head(self) -> Optional[LinkedListNode]:
+        """ Returns the fragments as a chain of `LinkedListNode` """
+        return self._chain(self.fragments())
+
+    @staticmethod
+    def _chain(fragments):
+        head = None
+        for lower, upper, value in reversed(fragments):
+            node = LinkedListNode(lower, upper, value)
+            node.next = head
+            head = node
+        return head
+
+    def fragments(self):
+        """ Returns the map as (lower_bound, upper_bound, value) tuples """
+        return list(zip(self._lowers, self._uppers, self._values))
+
+    def _intersecting(self, lower, upper):
+        """ Returns the range of the indices of the fragments that intersect the interval between lower and upper """
+        return bisect_left(self._uppers, lower), bisect_right(self._lowers, upper)
+
+    def interval_value(self, lower, upper):
+        """ Returns the value of the intervals between the lower and upper bound
+
+        returns:  node -
+                  The sub_intervals of the interval between the lower and upper bound with corresponding values
+        """
+        start, end = self._intersecting(lower, upper)
+        return self._chain([(max(lower, self._lowers[i]), min(upper, self._uppers[i]), self._values[i])
+                            for i in range(start, end)])
+
+    def range_max(self, lower, upper):
+        """ Returns the maximal value of the fragments that intersect the interval between lower and upper """
+        start, end = self._intersecting(lower, upper)
+        if start == end:
+            return None
+        return max(self._values[start:end])
+
+    def update(self, lower_bound, upper_bound=None, value=None, type='Sum'):
+        """updates the value of the map according to the lower_bound and upper_bound
+        param lower_bound: lower bound of the interval to update, or a chain of `LinkedListNode` to update with
+        param upper_bound: upper bound of the interval to update
+        param value: the value to update the interval with
+        param type: 'Sum' adds the value to the intersected fragments, 'Max' keeps the maximum of the values
+
+        returns: for a chain, the fragments of the map between the bounds of the chain, as a chain
+        """
+        combine = UPDATE_TYPES[type]
+        if not isinstance(lower_bound, LinkedListNode):
+            self._update(lower_bound, upper_bound, value, combine)
+            return
+
+        node = lower_bound
+        while node is not None:
+            self._update(node.lower_bound, node.upper_bound, node.value, combine)
+            upper_bound = node.upper_bound
+            node = node.next
+        return self.interval_value(lower_bound.lower_bound, upper_bound)
+
+    def _update(self, lower_bound, upper_bound, value, combine):
+        if self._resolution is not None:
+            lower_bound = self._round(lower_bound)
+            upper_bound = self._round(upper_bound)
+        start, stop = self._replace(lower_bound, upper_bound, value, combine)
+        if self._coalesce:
+            self._merge_equal(start, stop)
+
+    def _round(self, bound):
+        """ Rounds the bound to a multiple of the resolution, an integral bound is kept an int """
+        bound = round(bound / self._resolution) * self._resolution
+        return int(bound) if float(bound).is_integer() else bound
+
+    def _replace(self, lower_bound, upper_bound, value, combine):
+        """ Updates the fragments, returns the range of the indices of the fragments that replaced the intersected ones """
+        lowers, uppers, values = self._lowers, self._uppers, self._values
+        start = bisect_left(uppers, lower_bound)
+        end = bisect_right(lowers, upper_bound, start)
+
+        if start == end:
+            # No intersection, the interval is a new fragment
+            lowers.insert(start, lower_bound)
+            uppers.insert(start, upper_bound)
+            values.insert(start, value)
+            self.update_max_value(lower_bound, upper_bound, value)
+            return start, start + 1
+
+        if end - start == 1 and lowers[start] == lower_bound and uppers[start] == upper_bound:
+            # Same interval
+            values[start] = combine(values[start], value)
+            self.update_max_value(lower_bound, upper_bound, values[start])
+            return start, end
+
+        epsilon = self.epsilon
+        # (lower, upper, value, is a candidate of the maximum) of the fragments replacing the intersected ones
+        fragments = []
+
+        # The part of the first fragment before the interval keeps its value
+        if lowers[start] < lower_bound:
+            fragments.append((lowers[start], lower_bound - epsilon, values[start], False))
+
+        current = lower_bound
+        for i in range(start, end):
+            # The gap before the fragment gets the value, with non-negative values it is not above the fragment
+            if lowers[i] > current:
+                fragments.append((current, lowers[i] - epsilon, value, False))
+            fragments.append((max(lowers[i], current), min(uppers[i], upper_bound), combine(values[i], value), True))
+            current = uppers[i] + epsilon
+
+        if uppers[end - 1] > upper_bound:
+            # The part of the last fragment after the interval keeps its value
+            fragments.append((upper_bound + epsilon, uppers[end - 1], values[end - 1], False))
+        elif current <= upper_bound:
+            fragments.append((current, upper_bound, value, True))
+
+        # The parts narrower than epsilon are dropped
+        fragments = [fragment for fragment in fragments if fragment[0] <= fragment[1]]
+        lowers[start:end] = [fragment[0] for fragment in fragments]
+        uppers[start:end] = [fragment[1] for fragment in fragments]
+        values[start:end] = [fragment[2] for fragment in fragments]
+        for lower, upper, fragment_value, candidate in fragments:
+            if candidate:
+                self.update_max_value(lower, upper, fragment_value)
+        return start, start + len(fragments)
+
+    def _merge_equal(self, start, stop):
+        """ Merges the adjacent fragments with equal values from the fragment before start to the fragment at stop """
+        lowers, uppers, values = self._lowers, self._uppers, self._values
+        # the fragments split from one another are epsilon apart, up to the rounding of the bounds
+        gap = self.epsilon * (1 + 1e-6)
+        i = max(start, 1)
+        stop = min(stop, len(values) - 1)
+        while i <= stop:
+            if values[i] == values[i - 1] and lowers[i] - uppers[i - 1] <= gap:
+                uppers[i - 1] = uppers[i]
+                del lowers[i], uppers[i], values[i]
+                stop -= 1
+                # the maximal interval grows with the fragment it is part of
+                max_lower, max_upper = self._max_interval
+                if values[i - 1] == self._max_value and lowers[i - 1] <= max_lower and max_upper <= uppers[i - 1]:
+                    self._max_interval = lowers[i - 1], uppers[i - 1]
+            else:
+                i += 1
+
+    def update_max_value(self, lower_bound, upper_bound, value_candidate):
+        """
+        Works only  if the rewards are not negative
+        update the max_value according to the added interval
+        """
+
+        # The candidate it bigger -> need to change
+        if self._max_value < value_candidate:
+            self._max_value = value_candidate
+            self._max_interval = lower_bound, upper_bound
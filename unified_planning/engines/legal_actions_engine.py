@@ -0,0 +1,117 @@
+import unified_planning as up
+from typing import Callable, List
+
+import numpy as np
+
+
+class LegalActionsEngine:
+    """
+    Holds the preconditions and the relevance fluents of all the actions of a problem as sparse incidence arrays,
+    grouped by fluent, and computes the legal actions of a state in one vectorized pass over all the actions.
+
+    Only the fluents that hold in the state are visited: the actions whose preconditions mention them are gathered
+    and counted per action, so the cost grows with the state and not with the amount of fluents.
+    """
+    def __init__(self, actions: List["up.engines.Action"], fluent_index: "up.engines.FluentIndex",
+                 action_masks: Callable[["up.engines.Action"], "up.engines.ActionMasks"]):
+        self._actions = list(actions)
+        self._rows = {id(action): i for i, action in enumerate(self._actions)}
+
+        pos, neg, relevant, end_delete = [], [], [], []
+        self._check_relevance = np.zeros(len(self._actions), dtype=bool)
+        self._selectable = np.ones(len(self._actions), dtype=bool)
+
+        for i, action in enumerate(self._actions):
+            masks = action_masks(action)
+            pos.append(masks.pos_preconditions)
+            neg.append(masks.neg_preconditions)
+            relevant.append(masks.relevant or 0)
+            end_delete.append(masks.end_delete or 0)
+            if masks.relevant is not None:
+                self._check_relevance[i] = True
+            if isinstance(action, up.engines.NoOpAction):
+                self._selectable[i] = False
+
+        self._fluent_amount = len(fluent_index)
+        self._bytes = (self._fluent_amount + 7) // 8
+        # The fluents indexed after the engine is built do not appear in any precondition
+        self._bits = (1 << self._fluent_amount) - 1
+
+        # The four incidences are held in one array, the rows of the k-th incidence are shifted by k * actions
+        self._incidence = self._build_incidence([pos, neg, relevant, end_delete])
+        self._pos_amount = np.array([bin(mask).count('1') for mask in pos], dtype=np.intp)
+        self._relevant_amount = np.array([bin(mask).count('1') for mask in relevant], dtype=np.intp)
+
+    def __len__(self):
+        return len(self._actions)
+
+    @property
+    def actions(self):
+        return self._actions
+
+    def row(self, action: "up.engines.Action") -> int:
+        """ Returns the row of `action` in the vectors returned by the engine """
+        return self._rows[id(action)]
+
+    def to_vector(self, mask: int) -> np.ndarray:
+        """ Returns the bitmask `mask` as a boolean vector over the indexed fluents """
+        packed = np.frombuffer((mask & self._bits).to_bytes(self._bytes, 'little'), dtype=np.uint8)
+        return np.unpackbits(packed, count=self._fluent_amount, bitorder='little').view(bool)
+
+    def applicable(self, true_mask: int, false_mask: int = None) -> np.ndarray:
+        """
+        Returns for each action if its positive preconditions are in `true_mask`
+        and its negative preconditions are in `false_mask`.
+        Without `false_mask` the fluents out of `true_mask` are false.
+        """
+        pos, neg, *_ = self._count(np.flatnonzero(self.to_vector(true_mask)))
+        applicable = pos == self._pos_amount
+        if false_mask is None:
+            applicable &= neg == 0
+        else:
+            applicable &= self._count(np.flatnonzero(~self.to_vector(false_mask)))[1] == 0
+        return applicable
+
+    def legal(self, mask: int) -> np.ndarray:
+        """
+        Returns for each action if it is legal and relevant in the state `mask`, no-op actions excluded.
+        A start action that, together with its end action, adds nothing new to the state is not relevant.
+        """
+        pos, neg, relevant, end_delete = self._count(np.flatnonzero(self.to_vector(mask)))
+        legal = pos == self._pos_amount
+        legal &= neg == 0
+        legal &= self._selectable
+        legal &= (relevant < self._relevant_amount) | (end_delete > 0) | ~self._check_relevance
+        return legal
+
+    def legal_actions(self, mask: int) -> List["up.engines.Action"]:
+        """ Returns the legal and relevant actions in the state `mask` in the order of the problem actions """
+        actions = self._actions
+        return [actions[i] for i in np.flatnonzero(self.legal(mask))]
+
+    def _count(self, bits: np.ndarray) -> np.ndarray:
+        """
+        Returns for each incidence and each action how many of the fluents of the action are in `bits`,
+        as an array of shape (4, actions)
+        """
+        offsets, rows = self._incidence
+        starts = offsets[bits]
+        lengths = offsets[bits + 1] - starts
+        # the positions of the rows of all the fluents in `bits`, range by range
+        positions = np.arange(lengths.sum()) + np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return np.bincount(rows[positions], minlength=4 * len(self._actions)).reshape(4, len(self._actions))
+
+    def _build_incidence(self, incidences: List[List[int]]):
+        """ Returns the rows of each fluent bit set in the masks of `incidences`, as offsets per bit and rows """
+        rows_per_bit = [[] for _ in range(self._fluent_amount)]
+        for k, masks in enumerate(incidences):
+            for row, mask in enumerate(masks):
+                while mask:
+                    low = mask & -mask
+                    rows_per_bit[low.bit_length() - 1].append(k * len(self._actions) + row)
+                    mask ^= low
+
+        offsets = np.zeros(self._fluent_amount + 1, dtype=np.intp)
+        offsets[1:] = np.cumsum([len(rows) for rows in rows_per_bit])
+        rows = np.array([row for rows in rows_per_bit for row in rows], dtype=np.intp)
+        return offsets, rows
@@ -0,0 +1,62 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    A size-capped mapping that evicts the least recently used entry when it is full.
+    Counts the hits and the misses of `get`.
+    """
+    def __init__(self, size: int):
+        assert size > 0
+        self._size = size
+        self._data = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    def get(self, key, default=None):
+        """ Returns the value of `key` and marks it as recently used, `default` if `key` is not cached """
+        try:
+            value = self._data[key]
+            self._data.move_to_end(key)
+        except KeyError:
+            # The key may also be evicted by another thread between the lookup and the move
+            self._misses += 1
+            return default
+        self._hits += 1
+        return value
+
+    def put(self, key, value):
+        """ Caches `value` for `key`, evicting the least recently used entry if the cache is full """
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self._size:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def info(self):
+        """ Returns the size, the amount of entries, the hits, the misses and the hit rate of the cache """
+        lookups = self._hits + self._misses
+        return dict(size=self._size, entries=len(self._data), hits=self._hits, misses=self._misses,
+                    hit_rate=self._hits / lookups if lookups else 0.0)
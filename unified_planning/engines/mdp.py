@@ -1,16 +1,66 @@
+import heapq
+import math
+import random
 from typing import List
 
 import unified_planning as up
 import numpy as np
 from unified_planning.exceptions import UPPreconditionDonHoldException
-from itertools import product
+from unified_planning.engines.fluent_index import FluentIndex, ActionMasks
+from unified_planning.engines.legal_actions_engine import LegalActionsEngine
+from unified_planning.engines.lru_cache import LRUCache
+from unified_planning.engines.outcome_sampler import CompiledOutcomes, sample_index
+
+# The ways the TRPG heuristic applies probabilistic effects
+HEURISTIC_MODES = ('sample', 'union', 'most_likely')
 
 
 class MDP:
-    def __init__(self, problem: "up.model.problem.Preoblem", discount_factor: float):
+    def __init__(self, problem: "up.model.problem.Preoblem", discount_factor: float, vectorize_threshold: int = 400,
+                 cache_size: int = 0, heuristic_cache_size: int = 0, heuristic_samples: int = 1,
+                 heuristic_mode: str = 'sample', seed: int = None):
+        """
+        :param problem: the converted problem
+        :param discount_factor: the discount factor of the rewards
+        :param vectorize_threshold: from this amount of actions the legal actions are computed by a vectorized
+                                    LegalActionsEngine over all the actions, None to never vectorize
+        :param cache_size: the amount of states the legal actions cache and the step cache hold, 0 for no caches
+        :param heuristic_cache_size: the amount of heuristic values the heuristic cache holds, 0 for no cache
+        :param heuristic_samples: the amount of TRPG evaluations averaged by the heuristic cache
+                                  when the problem has probabilistic effects
+        :param heuristic_mode: how the TRPG applies probabilistic effects - 'sample' draws an outcome,
+                               'union' applies the outcomes with a positive probability together and
+                               'most_likely' applies the outcome with the highest probability
+        :param seed: the seed of the random generator that draws the outcomes of the probabilistic effects,
+                     if None it is drawn from the global random generator
+        """
         self._problem = problem
         self._discount_factor = discount_factor
 
+        # The ground fluents are indexed once, the states and the actions are encoded as bitmasks of the index
+        self._fluent_index = FluentIndex(problem.initial_values.keys())
+        self._in_execution = problem.fluent_by_name('inExecution')
+        self._goals_mask = self._fluent_index.mask(problem.goals)
+        self._action_masks = {}
+        # The outcomes of the probabilistic effects of each action, see `probabilistic_outcomes`
+        self._probabilistic_outcomes = {}
+        self._rng = random.Random(random.getrandbits(64) if seed is None else seed)
+        self._compiled_actions = [(action, self.action_masks(action)) for action in problem.actions
+                                  if not isinstance(action, up.engines.NoOpAction)]
+        self._legal_actions_engine = None
+        if vectorize_threshold is not None and len(problem.actions) >= vectorize_threshold:
+            self._legal_actions_engine = LegalActionsEngine(problem.actions, self._fluent_index, self.action_masks)
+
+        self._legal_actions_cache = LRUCache(cache_size) if cache_size > 0 else None
+        # Holds the deterministic part of the transitions
+        self._step_cache = LRUCache(cache_size) if cache_size > 0 else None
+        assert heuristic_mode in HEURISTIC_MODES, f"Unknown heuristic mode {heuristic_mode}"
+        self._heuristic_mode = heuristic_mode
+        self._trpg_tables = None
+        self._heuristic_cache = None
+        if heuristic_cache_size > 0:
+            self._heuristic_cache = up.engines.heuristics.HeuristicCache(self, heuristic_cache_size, heuristic_samples)
+
     @property
     def problem(self):
         return self._problem
@@ -19,6 +69,82 @@ class MDP:
     def discount_factor(self):
         return self._discount_factor
 
+    @property
+    def fluent_index(self):
+        return self._fluent_index
+
+    @property
+    def legal_actions_engine(self):
+        """ The vectorized legal actions engine, None if the problem has too few actions to vectorize """
+        return self._legal_actions_engine
+
+    def action_masks(self, action: "up.engines.Action") -> ActionMasks:
+        """ Returns the bitmasks of `action`, compiled on the first call """
+        masks = self._action_masks.get(id(action))
+        if masks is None:
+            masks = ActionMasks(action, self._fluent_index, self._in_execution)
+            self._action_masks[id(action)] = masks
+        return masks
+
+    def seed(self, seed: int):
+        """ Seeds the random generator of the outcomes of the probabilistic effects """
+        self._rng.seed(seed)
+
+    def probabilistic_outcomes(self, action: "up.engines.Action"):
+        """
+        Returns the probabilistic effects of `action`, compiled on the first call:
+        the CompiledOutcomes of an effect which outcomes were computed when it was grounded,
+        the effect itself if its outcomes depend on the state
+        """
+        outcomes = self._probabilistic_outcomes.get(id(action))
+        if outcomes is None:
+            outcomes = []
+            for pe in action.probabilistic_effects:
+                if pe.static_outcomes is None:
+                    outcomes.append(pe)
+                elif pe.static_outcomes:
+                    outcomes.append(CompiledOutcomes(pe.static_outcomes, self._fluent_index))
+            self._probabilistic_outcomes[id(action)] = outcomes
+        return outcomes
+
+    @property
+    def heuristic_mode(self):
+        return self._heuristic_mode
+
+    @property
+    def trpg_tables(self):
+        """ The static tables of the TRPG heuristic, built on the first use """
+        if self._trpg_tables is None:
+            self._trpg_tables = up.engines.heuristics.TRPGTables(self)
+        return self._trpg_tables
+
+    @property
+    def heuristic_cache(self):
+        return self._heuristic_cache
+
+    def heuristic(self, state: "up.engines.State", current_time: int, lower_bounds=None):
+        """ Returns the TRPG heuristic of `state` at `current_time`, from the heuristic cache if exists """
+        if self._heuristic_cache is not None:
+            return self._heuristic_cache.value(state, current_time, lower_bounds)
+        h = up.engines.heuristics.TRPG(self, state, current_time)
+        return h.get_heuristic(lower_bounds)
+
+    def cache_info(self):
+        """ Returns the statistics of each of the caches of the MDP by the cache name """
+        cache_info = {}
+        if self._legal_actions_cache is not None:
+            cache_info['legal_actions'] = self._legal_actions_cache.info()
+            cache_info['step'] = self._step_cache.info()
+        if self._heuristic_cache is not None:
+            cache_info['heuristic'] = self._heuristic_cache.info()
+        return cache_info
+
+    def state_mask(self, state: "up.engines.State") -> int:
+        """ Returns the predicates of `state` as a bitmask of the fluent index of the MDP """
+        if state.fluent_index is self._fluent_index:
+            return state.mask
+        return self._fluent_index.mask(state.predicates)
+
     def deadline(self):
         return self.problem.deadline
 
@@ -29,7 +155,7 @@ class MDP:
         """
         predicates = self.problem.initial_values
         pos_predicates = set([key for key, value in predicates.items() if value.bool_constant_value()])
-        return up.engines.State(pos_predicates)
+        return up.engines.State(pos_predicates, fluent_index=self._fluent_index)
 
     def is_terminal(self, state: "up.engines.state.State"):
         """
@@ -38,8 +164,7 @@ class MDP:
         :param state: checked state
         :return: True is the `state` is a terminal state, False otherwise
         """
-
-        return self.problem.goals.issubset(state.predicates)
+        return self.state_mask(state) & self._goals_mask == self._goals_mask
 
     def legal_actions(self, state: "up.engines.state.State"):
         """
@@ -51,14 +176,28 @@ class MDP:
         :return: the legal actions that can be preformed in the state `state`
         """
 
+        mask = self.state_mask(state)
+        if self._legal_actions_cache is None:
+            return self.mask_legal_actions(mask)
+
+        legal_actions = self._legal_actions_cache.get(mask)
+        if legal_actions is None:
+            legal_actions = tuple(self.mask_legal_actions(mask))
+            self._legal_actions_cache.put(mask, legal_actions)
+        # The callers may change the returned list
+        return list(legal_actions)
+
+    def mask_legal_actions(self, mask: int):
+        """ Returns the legal actions in the state which predicates are `mask` """
+        if self._legal_actions_engine is not None:
+            return self._legal_actions_engine.legal_actions(mask)
+
         legal_actions = []
-        for action in self.problem.actions:
-            if isinstance(action, up.engines.NoOpAction):
-               continue
-            if action.pos_preconditions.issubset(state.predicates) and \
-                    action.neg_preconditions.isdisjoint(state.predicates):
-                if self.check_action_relevant(state, action):
-                    # prone action that don't add new effects
+        for action, masks in self._compiled_actions:
+            if mask & masks.pos_preconditions == masks.pos_preconditions and \
+                    not mask & masks.neg_preconditions:
+                # prone action that don't add new effects
+                if masks.relevant is None or mask & masks.relevant != masks.relevant or mask & masks.end_delete:
                     legal_actions.append(action)
 
         return legal_actions
@@ -73,13 +212,33 @@ class MDP:
 
         return new_preds
 
+    def update_mask(self, state: "up.engines.State", mask: int, action: "up.engines.action.Action"):
+        """ Returns `mask` after the effects of `action`, the probabilistic effects are drawn in `state` """
+        masks = self.action_masks(action)
+        mask = masks.apply(mask)
+
+        if masks.is_probabilistic:
+            add_mask, del_mask = self.apply_probabilistic_masks(state, action)
+            mask |= add_mask
+            mask &= ~del_mask
+
+        return mask
+
     def step(self, state: "up.engines.State", action: "up.engines.action.Action"):
         """
                Apply the action to this state to produce the next state.
+               A transition of an action without probabilistic effects is cached.
         """
-        new_preds = set(state.predicates)
-        new_preds = self.update_predicate(state, new_preds, action)
-        next_state = up.engines.State(new_preds)
+        mask = self.state_mask(state)
+        key = None
+        if self._step_cache is not None and not self.action_masks(action).is_probabilistic:
+            key = (mask, id(action))
+            transition = self._step_cache.get(key)
+            if transition is not None:
+                return transition
+
+        new_mask = self.update_mask(state, mask, action)
+        next_state = up.engines.State(mask=new_mask, fluent_index=self._fluent_index)
 
         terminal = self.is_terminal(next_state)
         relevant_reward = 0
@@ -91,6 +250,8 @@ class MDP:
         # reward = 10 if terminal else relevant_reward
         reward = 1 if terminal else relevant_reward
 
+        if key is not None:
+            self._step_cache.put(key, (terminal, next_state, reward))
         return terminal, next_state, reward
 
     def check_action_relevant(self, state: "up.engines.State", action):
@@ -114,46 +275,90 @@ class MDP:
             return False #-50
         return True #-1
 
-    def probabilistic_effects(self, prob_outcomes, index):
-        """ Gets the add and delete effect of the prob_outcome index effect"""
-        add_predicates = set()
-        del_predicates = set()
+    def apply_probabilistic_effects(self, state: "up.engines.State", action: "up.engines.Action"):
+        """
 
-        probability = list(prob_outcomes.keys())[index]
-        values = list(prob_outcomes.values())[index]
-        for v in values:
-            if values[v]:
-                add_predicates.add(v)
-            else:
-                del_predicates.add(v)
+        :param action: draw the outcome of the probabilistic effects
+        :return: the precicates that needs to be added and removed from the state
+        """
+        add_mask, del_mask = self.apply_probabilistic_masks(state, action)
+        return self._fluent_index.fluents(add_mask), self._fluent_index.fluents(del_mask)
 
-        return probability, add_predicates, del_predicates
+    def apply_probabilistic_masks(self, state: "up.engines.State", action: "up.engines.Action"):
+        """
+        `apply_probabilistic_effects` as bitmasks
 
-    def apply_probabilistic_effects(self, state: "up.engines.State", action: "up.engines.Action"):
+        :return: the masks of the precicates that needs to be added and removed from the state
         """
+        add_mask = 0
+        del_mask = 0
+
+        for outcomes in self.probabilistic_outcomes(action):
+            if isinstance(outcomes, CompiledOutcomes):
+                index = outcomes.sample(self._rng)
+                add_mask |= outcomes.add_masks[index]
+                del_mask |= outcomes.del_masks[index]
+                continue
+
+            outcomes = outcomes.outcomes(state)
+            if outcomes:
+                _, add, delete = outcomes[sample_index([probability for probability, _, _ in outcomes], self._rng)]
+                add_mask |= self._fluent_index.mask(add)
+                del_mask |= self._fluent_index.mask(delete)
+
+        return add_mask, del_mask
+
+    def relaxed_probabilistic_effects(self, state: "up.engines.State", action: "up.engines.Action",
+                                      mode: str = 'union'):
+        """
+        The probabilistic effects without drawing an outcome, used by the relaxed planning graph.
 
-        :param action: draw the outcome of the probabilistic effects
+        :param mode: 'union' for all the outcomes with a positive probability,
+                     'most_likely' for the outcome with the highest probability
         :return: the precicates that needs to be added and removed from the state
         """
-        add_predicates = set()
-        del_predicates = set()
+        add_mask, del_mask = self.relaxed_probabilistic_masks(state, action, mode)
+        return self._fluent_index.fluents(add_mask), self._fluent_index.fluents(del_mask)
 
-        for pe in action.probabilistic_effects:
-            prob_outcomes = pe.probability_function(state, None)
-            if prob_outcomes:
-                index = np.random.choice(len(prob_outcomes), p=list(prob_outcomes.keys()))
+    def relaxed_probabilistic_masks(self, state: "up.engines.State", action: "up.engines.Action",
+                                    mode: str = 'union'):
+        """
+        `relaxed_probabilistic_effects` as bitmasks
+
+        :return: the masks of the precicates that needs to be added and removed from the state
+        """
+        add_mask = 0
+        del_mask = 0
 
-                _, add, delete = self.probabilistic_effects(prob_outcomes, index)
+        for outcomes in self.probabilistic_outcomes(action):
+            if isinstance(outcomes, CompiledOutcomes):
+                probabilities, add_masks, del_masks = outcomes.probabilities, outcomes.add_masks, outcomes.del_masks
+            else:
+                outcomes = outcomes.outcomes(state)
+                if not outcomes:
+                    continue
+                probabilities = [probability for probability, _, _ in outcomes]
+                add_masks = [self._fluent_index.mask(add) for _, add, _ in outcomes]
+                del_masks = [self._fluent_index.mask(delete) for _, _, delete in outcomes]
+
+            if mode == 'union':
+                indices = [i for i, p in enumerate(probabilities) if p > 0]
+            else:
+                indices = [probabilities.index(max(probabilities))]
 
-                add_predicates.update(add)
-                del_predicates.update(delete)
+            for index in indices:
+                add_mask |= add_masks[index]
+                del_mask |= del_masks[index]
 
-        return add_predicates, del_predicates
+        return add_mask, del_mask
 
 
 class combinationMDP(MDP):
-    def __init__(self, problem: "up.model.problem.Problem", discount_factor: float):
-        super().__init__(problem, discount_factor)
+    def __init__(self, problem: "up.model.problem.Problem", discount_factor: float, vectorize_threshold: int = 400,
+                 cache_size: int = 0, heuristic_cache_size: int = 0, heuristic_samples: int = 1,
+                 heuristic_mode: str = 'sample', seed: int = None):
+        super().__init__(problem, discount_factor, vectorize_threshold, cache_size, heuristic_cache_size,
+                         heuristic_samples, heuristic_mode, seed)
 
     def initial_state(self):
         """
@@ -162,7 +367,7 @@ class combinationMDP(MDP):
         """
         predicates = self.problem.initial_values
         pos_predicates = set([key for key, value in predicates.items() if value.bool_constant_value()])
-        return up.engines.CombinationState(pos_predicates)
+        return up.engines.CombinationState(pos_predicates, fluent_index=self._fluent_index)
 
     def is_terminal(self, state: "up.engines.state.CombinationState"):
         """
@@ -193,36 +398,16 @@ class combinationMDP(MDP):
 
         """
 
-        new_preds = set(state.predicates)
-        new_active_actions = state.active_actions.clone()
-        current_time = state.current_time
-
-        if isinstance(action, up.engines.InstantaneousAction):
-            actions_to_perform = [action]
-
-        # Deals with no-op, durative actions and combination actions
-        else:
-            if isinstance(action, up.engines.DurativeAction):
-                new_active_actions.add_action(up.engines.QueueNode(action, action.duration.lower.int_constant_value()))
-                new_preds |= action.inExecution
-
-            elif isinstance(action, up.engines.CombinationAction):
-                for a in action.actions:
-                    new_active_actions.add_action(up.engines.QueueNode(a, a.duration.lower.int_constant_value()))
+        new_mask, new_active_actions, delta, actions_to_perform, deterministic = self.advance(state, action)
+        current_time = state.current_time + delta
 
-                new_preds |= action.inExecution
-
-            delta, actions_to_perform = new_active_actions.get_next_actions()
-
-            if delta != -1:
-                new_active_actions.update_delta(delta)
-                current_time += delta
-
-        # update the predicates according to the actions needs to be preformed
-        for a in actions_to_perform:
-            new_preds = super().update_predicate(state, new_preds, a)
+        if not deterministic:
+            # update the predicates according to the actions needs to be preformed
+            for a in actions_to_perform:
+                new_mask = super().update_mask(state, new_mask, a)
 
-        next_state = up.engines.CombinationState(new_preds, new_active_actions, current_time)
+        next_state = up.engines.CombinationState(None, new_active_actions.clone(), current_time, new_mask,
+                                                 self._fluent_index)
 
         terminal = self.is_terminal(next_state)
 
@@ -234,79 +419,141 @@ class combinationMDP(MDP):
 
         return terminal, next_state, reward
 
-    def transition_function(self, state: "up.engines.State", action: "up.engines.Action"):
+    def advance(self, state: "up.engines.CombinationState", action: "up.engines.action.Action"):
+        """
+        The deterministic part of `step`, cached by the state and the action.
+        Adds the durative actions of `action` to the active actions and advances to the next active actions to end.
 
-        new_preds_init = set(state.predicates)
+        :return: the predicates mask, the new active actions, the time passed, the actions needs to be preformed,
+                 and if the actions are deterministic - then the mask already holds their effects.
+                 The new active actions are shared by the cache, a state gets a clone of them
+        """
+        key = None
+        if self._step_cache is not None:
+            key = (state, id(action))
+            advance = self._step_cache.get(key)
+            if advance is not None:
+                return advance
+
+        new_mask = self.state_mask(state)
         new_active_actions = state.active_actions.clone()
-        current_time = state.current_time
+        delta = 0
 
         if isinstance(action, up.engines.InstantaneousAction):
-            new_preds_init |= action.add_effects
-            new_preds_init -= action.del_effects
             actions_to_perform = [action]
 
         # Deals with no-op, durative actions and combination actions
         else:
             if isinstance(action, up.engines.DurativeAction):
                 new_active_actions.add_action(up.engines.QueueNode(action, action.duration.lower.int_constant_value()))
-                new_preds_init |= action.inExecution
+                new_mask |= self.action_masks(action).in_execution
 
             elif isinstance(action, up.engines.CombinationAction):
                 for a in action.actions:
                     new_active_actions.add_action(up.engines.QueueNode(a, a.duration.lower.int_constant_value()))
 
-                new_preds_init |= action.inExecution
+                new_mask |= self.action_masks(action).in_execution
 
-            delta, actions_to_perform = new_active_actions.get_next_actions()
+            next_delta, actions_to_perform = new_active_actions.get_next_actions()
 
+            if next_delta != -1:
+                new_active_actions.update_delta(next_delta)
+                delta = next_delta
+
+        deterministic = not any(self.action_masks(a).is_probabilistic for a in actions_to_perform)
+        if deterministic:
             for a in actions_to_perform:
-                new_preds_init |= a.add_effects
-                new_preds_init -= a.del_effects
+                new_mask = self.action_masks(a).apply(new_mask)
 
-            if delta != -1:
-                new_active_actions.update_delta(delta)
-                current_time += delta
+        advance = (new_mask, new_active_actions, delta, actions_to_perform, deterministic)
+        if key is not None:
+            self._step_cache.put(key, advance)
+        return advance
 
-        probs = self.all_probabilistic_effects(state, actions_to_perform)
-        transition = []
-        for prob in probs:
-            new_preds = new_preds_init.copy()
-            new_preds |= prob['add']
-            new_preds -= prob['delete']
-            next_state = up.engines.CombinationState(new_preds, new_active_actions, current_time)
-            transition.append((next_state, prob['probability']))
+    def transition_function(self, state: "up.engines.State", action: "up.engines.Action"):
+        """ Returns the next states of `action` in `state` with their probabilities """
+        transitions, _ = self.successors(state, action)
+        return transitions
 
-        return transition
+    def successors(self, state: "up.engines.CombinationState", action: "up.engines.Action",
+                   threshold: float = 0, mass: float = 1):
+        """
+        Enumerates the outcomes of `action` in `state` from the most likely,
+        the outcomes that lead to the same next state are merged.
 
-    def all_probabilistic_effects(self, state: "up.engines.State", actions: List["up.engines.Action"]):
-        pe_length = []
-        pe_outcomes = []
+        :param threshold: the outcomes with a lower probability are not enumerated
+        :param mass: the enumeration stops once the enumerated outcomes cover this probability mass
+        :return: the next states with their probabilities, and the probability mass they cover
+        """
+        new_mask, new_active_actions, delta, actions_to_perform, deterministic = self.advance(state, action)
+        current_time = state.current_time + delta
 
-        # Get the length of each probabilistic effect greater then 0
-        for action in actions:
-            for pe in action.probabilistic_effects:
-                prob_outcomes = pe.probability_function(state, None)
-                if prob_outcomes:
-                    pe_outcomes.append(prob_outcomes)
-                    pe_length.append(len(prob_outcomes))
+        if not deterministic:
+            for a in actions_to_perform:
+                new_mask = self.action_masks(a).apply(new_mask)
+
+        probabilities = {}
+        covered = 0
+        for probability, add_mask, del_mask in self.iter_outcomes(state, actions_to_perform, threshold):
+            next_mask = (new_mask | add_mask) & ~del_mask
+            probabilities[next_mask] = probabilities.get(next_mask, 0) + probability
+            covered += probability
+            if covered >= mass:
+                break
+
+        transitions = [(up.engines.CombinationState(None, new_active_actions.clone(), current_time, next_mask,
+                                                    self._fluent_index), probability)
+                       for next_mask, probability in probabilities.items()]
+        return transitions, covered
+
+    def iter_outcomes(self, state: "up.engines.State", actions: List["up.engines.Action"], threshold: float = 0):
+        """
+        Yields the combined outcomes of the probabilistic effects of `actions` in `state` lazily,
+        as `(probability, added fluents mask, deleted fluents mask)`, by a non-increasing probability.
 
-        # holds all combination of indexes
-        series = list(product(*(range(x) for x in pe_length)))
+        Each effect has its outcomes sorted from the most likely, a combination is a choice of an outcome
+        of each effect. The successors of a combination choose the next outcome of one effect, from the last
+        effect it changed onwards, so each combination is pushed once, and it is not more likely than
+        the combination it came from.
 
+        :param threshold: the combinations with a lower probability are not enumerated
+        """
         effects = []
-        for s in series:
-            add_predicates = set()
-            del_predicates = set()
-            probability = 1
-            for i, p in enumerate(pe_outcomes):
-                prob, add, delete = self.probabilistic_effects(p, s[i])
-
-                add_predicates.update(add)
-                del_predicates.update(delete)
-                probability *= prob
-            effects.append({"probability": probability, "add": add_predicates, 'delete': del_predicates})
-
-        return effects
+        for action in actions:
+            for outcomes in self.probabilistic_outcomes(action):
+                if isinstance(outcomes, CompiledOutcomes):
+                    effect = list(zip(outcomes.probabilities, outcomes.add_masks, outcomes.del_masks))
+                else:
+                    effect = [(probability, self._fluent_index.mask(add), self._fluent_index.mask(delete))
+                              for probability, add, delete in outcomes.outcomes(state)]
+                if effect:
+                    effect.sort(key=lambda outcome: -outcome[0])
+                    effects.append(effect)
+
+        def probability_of(choice):
+            return math.prod(effect[i][0] for effect, i in zip(effects, choice))
+
+        first = (0,) * len(effects)
+        heap = [(-probability_of(first), first, 0)]
+        while heap:
+            negative_probability, choice, last = heapq.heappop(heap)
+            if -negative_probability < threshold:
+                return
+
+            add_mask = 0
+            del_mask = 0
+            for effect, i in zip(effects, choice):
+                _, add, delete = effect[i]
+                add_mask |= add
+                del_mask |= delete
+            yield -negative_probability, add_mask, del_mask
+
+            for j in range(last, len(effects)):
+                if choice[j] + 1 < len(effects[j]):
+                    successor = choice[:j] + (choice[j] + 1,) + choice[j + 1:]
+                    probability = probability_of(successor)
+                    if probability >= threshold:
+                        heapq.heappush(heap, (-probability, successor, j))
 
     def legal_actions(self, state: "up.engines.state.CombinationState"):
         """
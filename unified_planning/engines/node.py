@@ -1,4 +1,5 @@
 import math
+from array import array
 
 import unified_planning as up
 from typing import List, Dict
@@ -6,18 +7,24 @@ from unified_planning.shortcuts import *
 from unified_planning.engines.utils import (
     update_stn,
 )
-from unified_planning.engines.linked_list import LinkedList
+from unified_planning.engines.interval_map import IntervalMap
 
 
 class Node:
-    def __init__(self, isInterval=False):
+    __slots__ = ('_linkList', '_value', '_count', '_isInterval', '_virtual_loss')
+
+    def __init__(self, isInterval=False, intervals: IntervalMap = None):
+        """
+        :param intervals: the empty interval map of the node value in the interval approach, a default map if None
+        """
         if isInterval:
-            # The node value is per intervals, each interval is a node in the link list
-            self._linkList = LinkedList()
+            # The node value is per intervals, each interval is a fragment of the interval map
+            self._linkList = IntervalMap() if intervals is None else intervals
         else:
             self._value = 0.0
         self._count = 0.0
         self._isInterval = isInterval
+        self._virtual_loss = 0
 
 
     def __repr__(self):
@@ -32,6 +39,17 @@ class Node:
     def isInterval(self):
         return self._isInterval
 
+    @property
+    def virtual_loss(self):
+        """ Visits of searches currently passing through the node that are not backed up yet """
+        return self._virtual_loss
+
+    def add_virtual_loss(self, amount):
+        self._virtual_loss += amount
+
+    def remove_virtual_loss(self, amount):
+        self._virtual_loss -= amount
+
     @property
     def value(self):
         if self._isInterval:
@@ -53,19 +71,52 @@ class Node:
         else:
             self._linkList.update(lower, upper, reward)
 
+    def statistics(self):
+        """
+        Returns the statistics of the node in a picklable form:
+        the visit count and the value (the interval fragments in the interval approach)
+        """
+        if self._isInterval:
+            return self._count, self._linkList.fragments()
+        return self._count, self._value
 
-class SNode(Node):
-    """ State node """
+    def merge(self, count, value):
+        """
+        Merges the statistics of the same node grown in another tree
+
+        :param count: the visit count of the other node
+        :param value: the value of the other node, as returned by `statistics`
+        """
+        if count == 0:
+            return
+        if self._isInterval:
+            for lower, upper, fragment_value in value:
+                self._linkList.update(lower, upper, fragment_value)
+        else:
+            self._value = (self._value * self._count + value * count) / (self._count + count)
+        self._count += count
+
+
+class StateNode(Node):
+    """
+    Base of the state nodes.
+    The action node of a possible action is created only when the action is visited, see `child`.
+    The statistics an action gets before it has an action node are kept in arrays parallel to the possible actions.
+    """
+    __slots__ = ('_state', '_depth', '_parent', '_possible_actions', '_children', '_counts', '_values')
 
     def __init__(self, state: "up.engines.State", depth: int, possible_actions: List["up.engines.Action"],
-                 parent: "up.engines.ANode" = None):
-        super().__init__()
+                 parent=None, isInterval=False, intervals: IntervalMap = None):
+        super().__init__(isInterval, intervals)
         self._state = state
         self._depth = depth
         self._parent = parent
         self._possible_actions = possible_actions
-        self._children: Dict["up.engines.Action", "up.engines.ANode"] = {}
-        self._add_children()
+        # The action nodes created so far
+        self._children: Dict["up.engines.Action", Node] = {}
+        # The visit counts and the values of the possible actions without an action node, allocated on first update
+        self._counts = None
+        self._values = None
 
     def __repr__(self):
         s = "state Node; depth: %d; children: %d; visits: %d; reward: %f" % (
@@ -81,7 +132,17 @@ class SNode(Node):
         return self._depth
 
     def set_depth(self, depth):
+        """
+        Sets the depth of the node, the nodes below it get the depths that follow.
+        The state nodes another action node shares with this tree through a transposition table are dropped.
+        """
         self._depth = depth
+        for anode in self._children.values():
+            for snode in list(anode.children.values()):
+                if snode.parent is anode:
+                    snode.set_depth(depth + 1)
+                else:
+                    del anode.children[snode.state]
 
     @property
     def parent(self):
@@ -93,95 +154,208 @@ class SNode(Node):
 
     @property
     def children(self):
+        """ The action nodes of the visited actions """
         return self._children
 
-    def _add_children(self):
-        """
-        Adds to the SNode the possible actions as children.
+    def _create_child(self, action: "up.engines.Action") -> Node:
+        raise NotImplementedError
+
+    def child(self, action: "up.engines.Action") -> Node:
+        """ Returns the action node of `action`, created with the statistics of the action if it was not visited """
+        anode = self._children.get(action)
+        if anode is None:
+            anode = self._create_child(action)
+            if self._counts is not None:
+                index = self._possible_actions.index(action)
+                anode._count = self._counts[index]
+                anode._value = self._values[index]
+            self._children[action] = anode
+        return anode
+
+    def child_statistics(self, index: int):
+        """ Returns the visit count, the value and the virtual loss of the `index`-th possible action """
+        anode = self._children.get(self._possible_actions[index])
+        if anode is not None:
+            count = anode.count
+            return count, anode.value if count > 0 else 0.0, anode.virtual_loss
+        if self._counts is None:
+            return 0, 0.0, 0
+        return self._counts[index], self._values[index], 0
+
+    def action_statistics(self, index: int):
+        """ Returns the statistics of the `index`-th possible action in the picklable form of `Node.statistics` """
+        anode = self._children.get(self._possible_actions[index])
+        if anode is not None:
+            return anode.statistics()
+        count, value, _ = self.child_statistics(index)
+        return count, [] if self._isInterval else value
+
+    def update_child(self, action: "up.engines.Action", reward):
+        """ Updates the statistics of `action` with `reward`, without creating its action node """
+        if self._isInterval or action in self._children:
+            self.child(action).update(reward)
+            return
+        if self._counts is None:
+            self._counts = array('d', [0.0]) * len(self._possible_actions)
+            self._values = array('d', [0.0]) * len(self._possible_actions)
+        index = self._possible_actions.index(action)
+        count = self._counts[index] + 1
+        self._values[index] = (self._values[index] * count + reward) / (count + 1)
+        self._counts[index] = count
 
-        :param previous_chosen_action_node: the action chosen in the last search step
-        """
-        for action in self.possible_actions:
-            self.children[action] = ANode(action, self)
+    def remove_action(self, action: "up.engines.Action"):
+        if action in self._possible_actions:
+            if self._counts is not None:
+                index = self._possible_actions.index(action)
+                del self._counts[index]
+                del self._values[index]
+            self._possible_actions.remove(action)
+        self._children.pop(action, None)
 
-    def max_update(self):
+    def pop_subtree(self, action: "up.engines.Action", state: "up.engines.State"):
+        """
+        Returns the state node reached by `action` and `state` as the root of its own tree at depth 0,
+        None if it is not in the tree. The rest of the tree of this node is released.
+        """
+        anode = self._children.get(action)
+        snode = anode.children.pop(state, None) if anode is not None else None
+        if snode is not None:
+            snode._parent = None
+            snode.set_depth(0)
+        self.release()
+        return snode
+
+    def release(self):
+        """
+        Drops the nodes below this node, breaking the references to their parents so they are freed at once.
+        A state node is released through its own parent only.
+        """
+        stack = [self]
+        while stack:
+            snode = stack.pop()
+            for anode in snode._children.values():
+                stack.extend(child for child in anode.children.values() if child.parent is anode)
+                anode.children.clear()
+                anode._parent = None
+            snode._children = {}
+            snode._parent = None
+
+    def max_child_value(self):
+        """ Returns the maximal value of the visited actions, -inf if none is visited """
         max_v = -math.inf
-        for child in self.children.values():
-           if child.count > 0 and child.value > max_v:
-                max_v = child.value
-        self._value = max_v
-        self._count += 1
+        for index in range(len(self._possible_actions)):
+            count, value, _ = self.child_statistics(index)
+            if count > 0 and value > max_v:
+                max_v = value
         return max_v
 
 
-class C_SNode(Node):
-    """ State node with consistency STN check """
+class SNode(StateNode):
+    """ State node """
+    __slots__ = ()
 
     def __init__(self, state: "up.engines.State", depth: int, possible_actions: List["up.engines.Action"],
-                 stn: "up.plans.stn.STNPlan", parent: "up.engines.ANode" = None,
-                 previous_chosen_action_node: "up.plans.stn.STNPlanNode" = None, isInterval=False):
-        super().__init__(isInterval)
-        self._state = state
-        self._depth = depth
-        self._parent = parent
-        self._children: Dict["up.engines.Action", "up.engines.C_ANode"] = {}
-        self._possible_actions = possible_actions
-        self._add_children(stn, previous_chosen_action_node)
-
-    def __repr__(self):
-        s = "state Node; depth: %d; children: %d; visits: %d; reward: %f" % (
-            self.depth, len(self.children), self.count, self.value)
-        return s
-
-    @property
-    def state(self):
-        return self._state
-
-    @property
-    def depth(self):
-        return self._depth
+                 parent: "up.engines.ANode" = None):
+        super().__init__(state, depth, possible_actions, parent)
 
-    def set_depth(self, depth):
-        self._depth = depth
+    def _create_child(self, action: "up.engines.Action"):
+        return ANode(action, self)
 
-    @property
-    def parent(self):
-        return self._parent
-
-    @property
-    def children(self):
-        return self._children
+    def max_update(self):
+        max_v = self.max_child_value()
+        self._value = max_v
+        self._count += 1
+        return max_v
 
-    @property
-    def possible_actions(self):
-        return self._possible_actions
 
-    def remove_action(self, action: "up.engines.Action"):
-        if action in self._possible_actions:
-            self._possible_actions.remove(action)
+class C_SNode(StateNode):
+    """ State node with consistency STN check """
+    __slots__ = ('_stn', '_previous_chosen_action_node', '_lazy')
 
-    def _add_children(self, stn: "up.plans.stn.STNPlan",
-                      previous_chosen_action_node: "up.plans.stn.STNPlanNode" = None):
+    def __init__(self, state: "up.engines.State", depth: int, possible_actions: List["up.engines.Action"],
+                 stn: "up.plans.stn.STNPlan", parent: "up.engines.ANode" = None,
+                 previous_chosen_action_node: "up.plans.stn.STNPlanNode" = None, isInterval=False, lazy=False,
+                 intervals: IntervalMap = None):
+        """
+        :param lazy: if True, the STN of a child is built only when the child is expanded, see `expand_child`
+        :param intervals: the empty interval map of the node value, the children get empty maps like it
         """
-        Adds to the SNode the possible actions as children.
-        If a specific children is not consistent (adding the constaints of the action to the `stn`)
-        then the action is not possible in this SNode
+        super().__init__(state, depth, possible_actions, parent, isInterval, intervals)
+        self._stn = stn
+        self._previous_chosen_action_node = previous_chosen_action_node
+        self._lazy = lazy
+        self._remove_inconsistent_actions()
 
-        :param stn: The STN from the previous node
-        :param previous_chosen_action_node: the action chosen in the last search step
-        :return:
+    def _remove_inconsistent_actions(self):
         """
-        not_consistent = []
-        for action in self.possible_actions:
-            child = C_ANode(action, stn.clone(), self, previous_chosen_action_node, isInterval=self.isInterval)
+        Removes the possible actions whose constraints make the STN of the previous node inconsistent,
+        the action nodes of the others are created when they are visited
+        """
+        previous_node = self.parent.STNNode if self.parent is not None else self._previous_chosen_action_node
+        self._possible_actions[:] = self._stn.consistent_actions(self._possible_actions, previous_node)
+
+    def _create_child(self, action: "up.engines.Action"):
+        intervals = self._linkList.empty() if self.isInterval else None
+        if self._lazy:
+            return C_ANode(action, self._stn, self, self._previous_chosen_action_node,
+                           isInterval=self.isInterval, lazy=True, intervals=intervals)
+        return C_ANode(action, self._stn.clone(), self, self._previous_chosen_action_node, isInterval=self.isInterval,
+                       intervals=intervals)
+
+    def rebase(self, stn: "up.plans.stn.STNPlan", previous_chosen_action_node: "up.plans.stn.STNPlanNode" = None):
+        """
+        Rebuilds the STNs of the tree of this node on `stn`, the STN of the node.
+        The actions that are not consistent with `stn` are removed with their action nodes.
 
-            if child.is_consistent():
-                self.children[action] = child
-            else:
-                not_consistent.append(action)
+        :param stn: the new STN of the node
+        :param previous_chosen_action_node: the action node chosen in the previous step, if the node is the root
+        """
+        assert not self.isInterval, "The interval values are relative to the STN they were collected on"
+        self._stn = stn
+        self._previous_chosen_action_node = previous_chosen_action_node
+        previous_node = self.parent.STNNode if self.parent is not None else previous_chosen_action_node
+        consistent = set(stn.consistent_actions(self._possible_actions, previous_node))
+        for action in list(self._possible_actions):
+            if action not in consistent:
+                self.remove_action(action)
+
+        for action, anode in list(self._children.items()):
+            anode.rebase(stn, previous_chosen_action_node)
+            if not anode.is_consistent():
+                for snode in anode.children.values():
+                    if snode.parent is anode:
+                        snode.release()
+                self.remove_action(action)
+                continue
+            for snode in list(anode.children.values()):
+                if snode.parent is anode:
+                    snode.rebase(anode.stn)
+                else:
+                    # a state node shared through a transposition table is rebased by its own parent
+                    del anode.children[snode.state]
+
+    def expand_child(self, action: "up.engines.Action"):
+        """
+        Creates the child of `action` and builds its STN if it was created lazily.
+        If the STN is not consistent then the action is not possible in this SNode and is removed.
 
-        for a in not_consistent:
-            self.possible_actions.remove(a)
+        :return: True if the action is consistent
+        """
+        child = self.child(action)
+        if child.expanded:
+            return True
+        child.expand()
+        if child.is_consistent():
+            return True
+        self.remove_action(action)
+        return False
+
+    def has_consistent_action(self):
+        """ Returns True if one of the possible actions is consistent, the children are expanded in order until one is """
+        for action in list(self.possible_actions):
+            if self.expand_child(action):
+                return True
+        return False
 
     def max_update(self, node=None):
         self._count += 1
@@ -191,10 +365,7 @@ class C_SNode(Node):
             return self.max_update_interval(node)
 
     def max_update_wo_interval(self):
-        max_v = -math.inf
-        for child in self.children.values():
-           if child.count > 0 and child.value > max_v:
-                max_v = child.value
+        max_v = self.max_child_value()
         self._value = max_v
         return max_v
 
@@ -205,6 +376,7 @@ class C_SNode(Node):
 
 class ANode(Node):
     """ Action node """
+    __slots__ = ('_action', '_parent', '_children')
 
     def __init__(self, action: "up.engines.action.Action",
                  parent: "up.engines.node.SNode" = None):
@@ -238,16 +410,28 @@ class ANode(Node):
 
 class C_ANode(Node):
     """ Action node with consistency STN check """
+    __slots__ = ('_action', '_parent', '_children', '_stn', '_STNNode', '_previous_chosen_action_node', '_expanded')
 
     def __init__(self, action: "up.engines.action.Action", stn: "up.plans.stn.STNPlan",
                  parent: "up.engines.node.C_SNode" = None,
-                 previous_chosen_action_node: "up.plans.stn.STNPlanNode" = None, isInterval = False):
-        super().__init__(isInterval)
+                 previous_chosen_action_node: "up.plans.stn.STNPlanNode" = None, isInterval = False, lazy=False,
+                 intervals: IntervalMap = None):
+        """
+        :param stn: the STN of the node, if `lazy` - the STN of the parent, cloned when the node is expanded
+        :param lazy: if True, the constraints of the action are added to the STN only by `expand`
+        :param intervals: the empty interval map of the node value in the interval approach
+        """
+        super().__init__(isInterval, intervals)
         self._action = action
         self._parent = parent
         self._children: Dict["up.engines.State", "up.engines.node.SNode"] = {}
         self._stn = stn
-        self._STNNode = self._add_constraints(previous_chosen_action_node)
+        self._STNNode = None
+        self._previous_chosen_action_node = previous_chosen_action_node
+        self._expanded = False
+        if not lazy:
+            self._STNNode = self._add_constraints(previous_chosen_action_node)
+            self._expanded = True
 
     def __repr__(self):
         s = "action Node; children: %d; visits: %d; reward: %f" % (len(self.children), self.count, self.value)
@@ -289,6 +473,30 @@ class C_ANode(Node):
     def is_consistent(self):
         return self._stn.is_consistent()
 
+    @property
+    def expanded(self):
+        return self._expanded
+
+    def expand(self):
+        """ Clones the STN of the parent and adds the constraints of the action, for a lazily created node """
+        if self._expanded:
+            return
+        self._stn = self._stn.clone()
+        self._STNNode = self._add_constraints(self._previous_chosen_action_node)
+        self._expanded = True
+
+    def rebase(self, stn: "up.plans.stn.STNPlan", previous_chosen_action_node: "up.plans.stn.STNPlanNode" = None):
+        """
+        Rebuilds the STN of the node on `stn`, the STN of its parent.
+        A lazily created node that is not expanded yet keeps referencing `stn` until it is expanded.
+        """
+        self._previous_chosen_action_node = previous_chosen_action_node
+        if self._expanded:
+            self._stn = stn.clone()
+            self._STNNode = self._add_constraints(previous_chosen_action_node)
+        else:
+            self._stn = stn
+
     def _add_constraints(self, previous_chosen_action_node: "up.plans.stn.STNPlanNode" = None):
         """
 
@@ -0,0 +1,72 @@
+import random
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List
+
+import unified_planning as up
+
+
+class AliasSampler:
+    """
+    Draws an index with the given probabilities in O(1) by Vose's alias method:
+    each index owns an equal slice of [0, 1), a part of the slice that exceeds its probability is aliased
+    to an index with a larger probability.
+    The probabilities are normalized, so they do not have to sum to 1.
+    """
+    __slots__ = ('_threshold', '_alias')
+
+    def __init__(self, probabilities: List[float]):
+        n = len(probabilities)
+        assert n > 0
+        total = sum(probabilities)
+        assert total > 0, "At least one outcome should have a positive probability"
+        scaled = [p * n / total for p in probabilities]
+        self._threshold = [1.0] * n
+        self._alias = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self._threshold[s] = scaled[s]
+            self._alias[s] = l
+            scaled[l] -= 1 - scaled[s]
+            (small if scaled[l] < 1 else large).append(l)
+
+    def __len__(self):
+        return len(self._alias)
+
+    def sample(self, rng: random.Random) -> int:
+        """ Returns an index drawn with `rng` """
+        u = rng.random() * len(self._alias)
+        i = int(u)
+        return i if u - i < self._threshold[i] else self._alias[i]
+
+
+def sample_index(probabilities: List[float], rng: random.Random) -> int:
+    """ Returns an index drawn with `rng` by the cumulative probabilities, for outcomes that are drawn once """
+    cumulative = list(accumulate(probabilities))
+    return min(bisect_right(cumulative, rng.random() * cumulative[-1]), len(cumulative) - 1)
+
+
+class CompiledOutcomes:
+    """
+    The outcomes of a probabilistic effect that do not depend on the state, compiled once:
+    the probability, the added and the deleted fluents of each outcome, as bitmasks,
+    and an alias sampler of the outcomes.
+    """
+    __slots__ = ('outcomes', 'probabilities', 'add_masks', 'del_masks', 'sampler')
+
+    def __init__(self, outcomes: "up.model.effect.Outcomes", fluent_index: "up.engines.FluentIndex"):
+        """
+        :param outcomes: the `(probability, added fluents, deleted fluents)` outcomes of the effect
+        """
+        self.outcomes = outcomes
+        self.probabilities = [probability for probability, _, _ in outcomes]
+        self.add_masks = [fluent_index.mask(add) for _, add, _ in outcomes]
+        self.del_masks = [fluent_index.mask(delete) for _, _, delete in outcomes]
+        self.sampler = AliasSampler(self.probabilities)
+
+    def sample(self, rng: random.Random) -> int:
+        """ Returns the index of an outcome drawn with `rng` """
+        return self.sampler.sample(rng)
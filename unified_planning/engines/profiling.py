@@ -0,0 +1,147 @@
+import functools
+import importlib
+import json
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import numpy as np
+
+# The component of each instrumented function, as (module, owner in the module or None, function name, component)
+INSTRUMENTED = [
+    ('unified_planning.engines.solvers.mcts', 'Base_MCTS', 'search', 'search'),
+    ('unified_planning.engines.solvers.rtdp', 'RTDP', 'search', 'search'),
+    ('unified_planning.engines.mdp', 'MDP', 'step', 'step'),
+    ('unified_planning.engines.mdp', 'combinationMDP', 'step', 'step'),
+    ('unified_planning.engines.mdp', 'MDP', 'legal_actions', 'legal_actions'),
+    ('unified_planning.engines.mdp', 'combinationMDP', 'legal_actions', 'legal_actions'),
+    ('unified_planning.engines.heuristics.trpg', 'TRPG', 'get_heuristic', 'heuristic'),
+    # update_stn is imported by name, so it is replaced in every module that calls it
+    ('unified_planning.engines.utils', None, 'update_stn', 'update_stn'),
+    ('unified_planning.engines.node', None, 'update_stn', 'update_stn'),
+    ('unified_planning.engines.solvers.mcts', None, 'update_stn', 'update_stn'),
+    ('unified_planning.plans.stn.stn_plan', 'STNPlan', 'clone', 'stn_clone'),
+    ('unified_planning.plans.stn.stn_plan', 'STNPlan', 'get_legal_interval', 'legal_interval'),
+    ('unified_planning.engines.interval_map', 'IntervalMap', 'update', 'interval_update'),
+]
+
+PERCENTILES = (50, 90, 99)
+
+
+class Profiler:
+    """
+    Records the calls of the functions of the search hot path, see `INSTRUMENTED`: the amount of calls and the
+    wall-clock duration of each call, per component and per decision step.
+
+    The functions are wrapped only while the profiler is enabled, so a disabled profiler costs nothing.
+    The time of a component includes the components it calls, e.g. the search includes the steps,
+    a call made inside a call of the same component, e.g. to the method of the base class, is not recorded.
+    The calls in forked root parallel workers are not recorded.
+    """
+    def __init__(self):
+        self._enabled = False
+        self._originals = []
+        # the durations of the calls of every component, per decision step
+        self._steps: List[Dict[str, List[float]]] = []
+        # the components each thread is inside of
+        self._local = threading.local()
+
+    @property
+    def enabled(self):
+        return self._enabled
+
+    def enable(self):
+        """ Wraps the instrumented functions and clears the recorded calls """
+        self.clear()
+        if self._enabled:
+            return
+        for module_name, owner_name, name, component in INSTRUMENTED:
+            module = importlib.import_module(module_name)
+            owner = module if owner_name is None else getattr(module, owner_name)
+            # a method inherited by a subclass is wrapped only once, in the class that defines it
+            if owner_name is not None and name not in vars(owner):
+                continue
+            original = getattr(owner, name)
+            self._originals.append((owner, name, original))
+            setattr(owner, name, self._wrap(original, component))
+        self._enabled = True
+
+    def disable(self):
+        """ Restores the instrumented functions, the recorded calls are kept """
+        for owner, name, original in reversed(self._originals):
+            setattr(owner, name, original)
+        self._originals = []
+        self._enabled = False
+
+    def _wrap(self, func, component):
+        record = self.record
+        local = self._local
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            active = getattr(local, 'active', None)
+            if active is None:
+                active = local.active = set()
+            if component in active:
+                return func(*args, **kwargs)
+            active.add(component)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(component, time.perf_counter() - start)
+                active.discard(component)
+        return wrapper
+
+    def start_step(self):
+        """ The calls recorded from now on belong to a new decision step """
+        if self._enabled:
+            self._steps.append(defaultdict(list))
+
+    def record(self, component: str, duration: float):
+        if not self._steps:
+            self._steps.append(defaultdict(list))
+        self._steps[-1][component].append(duration)
+
+    def clear(self):
+        self._steps = []
+
+    @staticmethod
+    def _statistics(durations: List[float]):
+        durations = np.asarray(durations)
+        res = dict(count=len(durations), total=float(durations.sum()), mean=float(durations.mean()))
+        for p, value in zip(PERCENTILES, np.percentile(durations, PERCENTILES)):
+            res[f'p{p}'] = float(value)
+        return res
+
+    def summary(self):
+        """
+        Returns the count, the total, the mean and the percentiles of the call durations in seconds,
+        of each component over all the decision steps and in each decision step
+        """
+        components = defaultdict(list)
+        for step in self._steps:
+            for component, durations in step.items():
+                components[component].extend(durations)
+        return dict(components={component: self._statistics(durations) for component, durations in components.items()},
+                    steps=[{component: self._statistics(durations) for component, durations in step.items()}
+                           for step in self._steps])
+
+    def print_summary(self):
+        """ Prints the statistics of each component over all the decision steps, the durations in milliseconds """
+        components = self.summary()['components']
+        print(f"Profile of {len(self._steps)} decision steps:")
+        print(f"{'component':<16}{'count':>10}{'total':>12}{'mean':>10}" + "".join(f"{f'p{p}':>10}" for p in PERCENTILES))
+        for component, stats in sorted(components.items(), key=lambda item: -item[1]['total']):
+            print(f"{component:<16}{stats['count']:>10}{stats['total'] * 1000:>12.1f}{stats['mean'] * 1000:>10.3f}" +
+                  "".join(f"{stats[f'p{p}'] * 1000:>10.3f}" for p in PERCENTILES))
+
+    def export_json(self, path: str):
+        """ Writes the summary to the JSON file `path` """
+        with open(path, 'w') as file:
+            json.dump(self.summary(), file, indent=2)
+
+
+# The profiler of the process
+profiler = Profiler()
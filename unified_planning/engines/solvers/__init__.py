@@ -1,7 +1,9 @@
 from unified_planning.engines.solvers.evaluate import evaluation_loop
+from unified_planning.engines.solvers.search_budget import SearchBudget
 
 
 
 __all__ = [
     "evaluation_loop",
+    "SearchBudget",
     ]
\ No newline at end of file
@@ -1,11 +1,15 @@
 import math
 import statistics
 
+import unified_planning as up
 
-def evaluation_loop(runs, plan_func, params):
+
+def evaluation_loop(runs, plan_func, params, profile_json=None):
     """
     perform runs times the planner on the domain
     Returns the statistics of the runs
+
+    If the profiler is enabled, its summary is printed at the end, and written to the JSON file `profile_json` if given
     """
     amount_success = 0
     time_round = []
@@ -28,4 +32,9 @@ def evaluation_loop(runs, plan_func, params):
     print(f'Amount of success = {amount_success}')
     print(f'Average success time = {avg_time}')
     print(f'STD success time = {std_time}')
+
+    if up.engines.profiler.enabled:
+        up.engines.profiler.print_summary()
+        if profile_json is not None:
+            up.engines.profiler.export_json(profile_json)
     return amount_success, avg_time, std_time
@@ -2,23 +2,38 @@ import numpy as np
 from unified_planning.shortcuts import *
 import unified_planning as up
 import math
-import time
 import random
+import threading
 from unified_planning.engines.utils import (
     create_init_stn,
     update_stn,
 )
 from unified_planning.engines.linked_list import LinkedListNode
+from unified_planning.engines.interval_map import IntervalMap
+from unified_planning.engines.solvers.parallel_mcts import parallel_search
+from unified_planning.engines.solvers.search_budget import as_budget
 
 
 class Base_MCTS:
     def __init__(self, mdp: "up.engines.MDP", search_depth: int,
-                 exploration_constant: float, k: int):
+                 exploration_constant: float, k: int, transpositions=False):
+        """
+        :param transpositions: if True, the state nodes with the same transposition key are shared by the action nodes
+            that reach them, see `transposition_key`
+        """
         self._mdp = mdp
         self._search_depth = search_depth
         self._exploration_constant = exploration_constant
         self._root_node = None
         self._k = k
+        self._iterations = 0
+        self._search_duration = 0.0
+        # Guards the tree statistics and the tree expansion in tree parallel search
+        self._lock = threading.Lock()
+        self._virtual_loss = 1
+        # The state nodes of the tree by their transposition key
+        self._transpositions = {} if transpositions else None
+        self._transposition_hits = 0
 
     @property
     def mdp(self):
@@ -43,24 +58,86 @@ class Base_MCTS:
     def exploration_constant(self):
         return self._exploration_constant
 
+    @property
+    def iterations(self):
+        """ The amount of selections performed in the last search """
+        return self._iterations
+
+    @property
+    def search_duration(self):
+        """ The wall-clock seconds the last search took """
+        return self._search_duration
+
+    @property
+    def transposition_hits(self):
+        """ The amount of state nodes shared through the transposition table """
+        return self._transposition_hits
+
+    @property
+    def virtual_loss(self):
+        """ The visits added to a node while a tree parallel search passes through it """
+        return self._virtual_loss
+
     def set_root_node(self, root_node):
         self._root_node = root_node
 
+    def set_virtual_loss(self, virtual_loss):
+        self._virtual_loss = virtual_loss
+
+    def set_search_statistics(self, iterations, search_duration):
+        self._iterations = iterations
+        self._search_duration = search_duration
+
+    def transposition_key(self, anode, state: "up.engines.State", depth: int):
+        """ Returns the key in the transposition table of the state node of `state` reached by `anode` at `depth` """
+        return depth, state
+
+    def find_transposition(self, anode, state: "up.engines.State", depth: int):
+        """
+        Adds to `anode` the state node of the transposition table with the key of `state`, if `state` is not a child
+        of `anode` yet.
+
+        :return: the transposition key of `state` if it is not in the table, None otherwise
+        """
+        if self._transpositions is None or state in anode.children:
+            return None
+        key = self.transposition_key(anode, state, depth)
+        snode = self._transpositions.get(key)
+        if snode is None:
+            return key
+        anode.add_child(snode)
+        self._transposition_hits += 1
+        return None
+
+    def add_transposition(self, key, snode):
+        """ Adds `snode` to the transposition table, if the table is used and the key of `snode` is given """
+        if key is not None:
+            self._transpositions[key] = snode
+
     def default_policy(self, state: "up.engines.State"):
         """ Choose a random action. Heustics can be used here to improve simulations. """
         return random.choice(self.mdp.legal_actions(state))
 
     def uct(self, snode: "up.engines.Snode", explore_constant: float):
-        anodes = snode.children
+        """
+        Chooses the action of `snode` with the highest upper confidence bound.
+        Virtual loss of searches currently passing through a node counts as visits with no reward,
+        so concurrent searches are steered away from the same action node.
+        """
         best_ub = -float('inf')
         best_action = -1
         possible_actions = snode.possible_actions
-        for action in possible_actions:
-            if anodes[action].count == 0:
+        snode_visits = snode.count + snode.virtual_loss
+        for index, action in enumerate(possible_actions):
+            count, value, virtual_loss = snode.child_statistics(index)
+            visits = count + virtual_loss
+            if visits == 0:
                 return action
 
-            ub = (anodes[action].value / anodes[action].count) + (
-                    explore_constant * math.sqrt(math.log(snode.count) / anodes[action].count))
+            # The visits in flight are counted as visits without reward
+            exploitation = value / visits if count > 0 else 0
+            ub = exploitation + (
+                    explore_constant * math.sqrt(math.log(snode_visits) / visits))
             # ub = anodes[action].value + (
             #         explore_constant * math.sqrt(math.log(snode.count + 1) / anodes[action].count))
             if ub > best_ub:
@@ -76,13 +153,13 @@ class Base_MCTS:
         :param root_node: the root node of the MCTS tree
         :return: returns the best action for the `root_node`
         """
-        anodes = root_node.children
         aStart_value = float("-inf")
         aStar = -1
 
-        for action in root_node.possible_actions:
-            if anodes[action].count > 0 and anodes[action].value > aStart_value:
-                aStart_value = anodes[action].value
+        for index, action in enumerate(root_node.possible_actions):
+            count, value, _ = root_node.child_statistics(index)
+            if count > 0 and value > aStart_value:
+                aStart_value = value
                 aStar = action
 
         if aStar == -1:
@@ -90,20 +167,54 @@ class Base_MCTS:
 
         return aStar
 
-    def search(self, timeout=1, selection_type='avg'):
+    def search(self, budget=1, selection_type='avg'):
+        """
+        Execute the MCTS algorithm from the root node until the budget is exhausted
+
+        :param budget: a SearchBudget, or the search time in seconds
+        :param selection_type: the selection type of the search
+        :return: the best action of the root node
         """
-        Execute the MCTS algorithm from the initial state given, with timeout in seconds
+        action, _ = self.anytime_search(budget, selection_type)
+        return action
+
+    def anytime_search(self, budget=1, selection_type='avg'):
+        """
+        Execute the MCTS algorithm from the root node until the budget is exhausted or stopped
+
+        :param budget: a SearchBudget, or the search time in seconds
+        :param selection_type: the selection type of the search
+        :return: the best action of the root node and the root statistics when the search stopped
         """
-        start_time = time.time()
-        current_time = time.time()
-        i = 0
+        budget = as_budget(budget)
         selection = self.selection if selection_type == 'avg' else (self.selection_root_interval if selection_type == 'rootInterval' else self.selection_max)
-        while current_time < start_time + timeout:
+        budget.start()
+        while not budget.exhausted():
             selection(self.root_node)
-            current_time = time.time()
-            i += 1
-        # print(f'i = {i}')
-        return self.best_action(self.root_node)
+            budget.step()
+        self._iterations = budget.iterations
+        self._search_duration = budget.elapsed()
+        return self.best_action(self.root_node), self.root_statistics()
+
+    def root_statistics(self):
+        """
+        Returns the statistics of the root action nodes
+
+        :return: a dictionary from the root action name to the visit count and the value of the action node
+        """
+        root_node = self.root_node
+        return {action.name: root_node.action_statistics(index) for index, action in enumerate(root_node.possible_actions)}
+
+    def merge_root_statistics(self, statistics):
+        """
+        Merges the root statistics of a tree grown from the same root in another search
+
+        :param statistics: root statistics as returned by `root_statistics`
+        """
+        for action in list(self.root_node.possible_actions):
+            count, value = statistics.get(action.name, (0, None))
+            if count > 0:
+                self.root_node.child(action).merge(count, value)
 
     def selection(self, snode: "up.engines.Snode"):
         raise NotImplementedError
@@ -113,6 +224,10 @@ class Base_MCTS:
 
     def selection_root_interval(self, snode: "up.engines.Snode"):
         raise NotImplementedError
+
+    def selection_tree_parallel(self, snode: "up.engines.Snode"):
+        raise NotImplementedError
+
     def selection_root_interval_max(self, snode: "up.engines.Snode"):
         raise NotImplementedError
 
@@ -126,12 +241,13 @@ class MCTS(Base_MCTS):
     """
     def __init__(self, mdp: "up.engines.MDP", split_mdp: "up.engines.MDP", root_node: "up.engines.SNode",
                  root_state: "up.engines.state.State", search_depth: int,
-                 exploration_constant: float, selection_type, k: int):
-        super().__init__(mdp, search_depth, exploration_constant, k)
+                 exploration_constant: float, selection_type, k: int, transpositions=False):
+        super().__init__(mdp, search_depth, exploration_constant, k, transpositions)
         self.split_mdp = split_mdp
-        create_snode = self.create_Snode_max if selection_type == 'max' else self.create_Snode
-        snode, _ = create_snode(root_state, 0)
-        self.set_root_node(root_node if root_node is not None else snode)
+        if root_node is None:
+            create_snode = self.create_Snode_max if selection_type == 'max' else self.create_Snode
+            root_node, _ = create_snode(root_state, 0)
+        self.set_root_node(root_node)
 
     def create_Snode(self, state: "up.engines.State", depth: int,
                      parent: "up.engines.ANode" = None):
@@ -148,17 +264,19 @@ class MCTS(Base_MCTS):
         snode = up.engines.SNode(state, depth, self.mdp.legal_actions(state), parent)
         best = -math.inf
 
-        actions_idx = list(range(len(snode.children)))
-        if self.k < len(snode.children):
+        actions = list(snode.possible_actions)
+        actions_idx = list(range(len(actions)))
+        if self.k < len(actions):
             # samples k children
-            actions_idx = random.sample(range(0, len(snode.children)), self.k)
+            actions_idx = random.sample(range(0, len(actions)), self.k)
 
         for action_idx in actions_idx:
             # perform each action and evaluate the next state with the heuristic function
-            action = list(snode.children.keys())[action_idx]
+            action = actions[action_idx]
             terminal, next_state, reward = self.mdp.step(snode.state, action)
             reward += self.mdp.discount_factor * self.heuristic(next_state)
-            snode.children[action].update(reward)
+            # the action node is created only when the action is visited
+            snode.update_child(action, reward)
             if reward > best:
                 best = reward
         if best == -math.inf:
@@ -167,12 +285,15 @@ class MCTS(Base_MCTS):
         snode.update(best)
         return snode, best
 
+    def transposition_key(self, anode: "up.engines.ANode", state: "up.engines.State", depth: int):
+        """ The state nodes of equal states at the same depth and time are shared """
+        return depth, state, state.current_time
+
     def heuristic(self, state: "up.engines.State"):
         current_time = 0
         if isinstance(state, up.engines.CombinationState):
             current_time = state.current_time
-        h = up.engines.heuristics.TRPG(self.split_mdp, state, current_time)
-        return h.get_heuristic()
+        return self.split_mdp.heuristic(state, current_time)
 
     def selection(self, snode: "up.engines.Snode"):
         """
@@ -190,8 +311,9 @@ class MCTS(Base_MCTS):
         # Choose a consistent action
         action = self.uct(snode, explore_constant)
         terminal, next_state, reward = self.mdp.step(snode.state, action)
-        anode = snode.children[action]
+        anode = snode.child(action)
         if not terminal:
+            key = self.find_transposition(anode, next_state, snode.depth + 1)
             snodes = anode.children
             if next_state in snodes:
                 reward += self.mdp.discount_factor * self.selection(snodes[next_state])
@@ -200,12 +322,57 @@ class MCTS(Base_MCTS):
                 next_snode, _ = self.create_Snode(next_state, snode.depth + 1, anode)
                 reward += self.mdp.discount_factor * self.heuristic(next_state)
                 anode.add_child(next_snode)
+                self.add_transposition(key, next_snode)
 
         snode.update(reward)
         anode.update(reward)
 
         return reward
 
+    def selection_tree_parallel(self, snode: "up.engines.Snode"):
+        """
+        Traverse the shared tree until reaching a leaf node, while other threads traverse it too.
+        The chosen action node holds a virtual loss until the reward is backed up.
+        """
+        if len(snode.possible_actions) == 0 or snode.state.current_time > self.mdp.deadline():
+            # Stop when there are no possible actions to take so the plan remains consistent
+            return -100
+
+        if snode.depth > self.search_depth:
+            return self.heuristic(snode.state)
+
+        with self._lock:
+            action = self.uct(snode, self.exploration_constant)
+            anode = snode.child(action)
+            snode.add_virtual_loss(self.virtual_loss)
+            anode.add_virtual_loss(self.virtual_loss)
+
+        terminal, next_state, reward = self.mdp.step(snode.state, action)
+        if not terminal:
+            with self._lock:
+                key = self.find_transposition(anode, next_state, snode.depth + 1)
+                next_snode = anode.children.get(next_state)
+
+            if next_snode is not None:
+                reward += self.mdp.discount_factor * self.selection_tree_parallel(next_snode)
+
+            else: # leaf
+                next_snode, _ = self.create_Snode(next_state, snode.depth + 1, anode)
+                reward += self.mdp.discount_factor * self.heuristic(next_state)
+                with self._lock:
+                    # Another thread may have expanded the same leaf meanwhile
+                    if next_state not in anode.children:
+                        anode.add_child(next_snode)
+                        self.add_transposition(key, next_snode)
+
+        with self._lock:
+            snode.remove_virtual_loss(self.virtual_loss)
+            anode.remove_virtual_loss(self.virtual_loss)
+            snode.update(reward)
+            anode.update(reward)
+
+        return reward
+
     def selection_max(self, snode: "up.engines.Snode"):
         """
         Traverse the tree until reaching a leaf node.
@@ -224,8 +391,9 @@ class MCTS(Base_MCTS):
         # Choose a consistent action
         action = self.uct(snode, explore_constant)
         terminal, next_state, reward = self.mdp.step(snode.state, action)
-        anode = snode.children[action]
+        anode = snode.child(action)
         if not terminal:
+            key = self.find_transposition(anode, next_state, snode.depth + 1)
             snodes = anode.children
             if next_state in snodes:
                 reward += self.mdp.discount_factor * self.selection_max(snodes[next_state])
@@ -234,6 +402,7 @@ class MCTS(Base_MCTS):
                 next_snode, snode_reward = self.create_Snode_max(next_state, snode.depth + 1, anode)
                 reward += snode_reward
                 anode.add_child(next_snode)
+                self.add_transposition(key, next_snode)
 
         anode.update(reward)
         max_v = snode.max_update()
@@ -268,14 +437,26 @@ class C_MCTS(Base_MCTS):
     """
     def __init__(self, mdp, root_node: "up.engines.C_SNode", root_state: "up.engines.state.State", search_depth: int,
                  exploration_constant: float, stn: "up.plans.stn.STNPlan", selection_type, k: int,
-                 previous_chosen_action_node: "up.plans.stn.STNPlanNode" = None):
-        super().__init__(mdp, search_depth, exploration_constant, k)
+                 previous_chosen_action_node: "up.plans.stn.STNPlanNode" = None, lazy_expansion=False,
+                 transpositions=False, interval_resolution=None, interval_coalesce=False):
+        """
+        :param interval_resolution: the time resolution of the interval values of the rootInterval selection type
+        :param interval_coalesce: if True, the adjacent intervals with equal values are merged
+        """
+        super().__init__(mdp, search_depth, exploration_constant, k, transpositions)
+        assert not transpositions or selection_type != 'rootInterval', \
+            "The interval values depend on the path to the node, the transpositions are not supported"
         self._previous_chosen_action_node = previous_chosen_action_node
-
-        create_snode = self.create_Snode_max if selection_type == 'max' else (self.create_Snode_root_interval if selection_type == 'rootInterval' else self.create_Snode)
-        snode, _ = create_snode(root_state, 0, stn,
-                                previous_chosen_action_node=previous_chosen_action_node)
-        self.set_root_node(root_node if root_node is not None else snode)
+        # The STN of an action node is checked only when the action is first selected
+        self._lazy_expansion = lazy_expansion
+        self._interval_resolution = interval_resolution
+        self._interval_coalesce = interval_coalesce
+
+        if root_node is None:
+            create_snode = self.create_Snode_max if selection_type == 'max' else (self.create_Snode_root_interval if selection_type == 'rootInterval' else self.create_Snode)
+            root_node, _ = create_snode(root_state, 0, stn,
+                                        previous_chosen_action_node=previous_chosen_action_node)
+        self.set_root_node(root_node)
         self._stn = stn
 
     @property
@@ -286,20 +467,40 @@ class C_MCTS(Base_MCTS):
     def stn(self):
         return self._stn
 
+    @property
+    def lazy_expansion(self):
+        return self._lazy_expansion
+
+    def uct(self, snode: "up.engines.C_SNode", explore_constant: float):
+        """
+        Chooses the consistent action of `snode` with the highest upper confidence bound.
+        An action node created lazily is expanded when it is chosen, and pruned if its STN is not consistent.
+        """
+        while True:
+            action = super().uct(snode, explore_constant)
+            if snode.expand_child(action):
+                return action
+
+    def has_possible_actions(self, snode: "up.engines.C_SNode"):
+        if self._lazy_expansion:
+            return snode.has_consistent_action()
+        return len(snode.possible_actions) > 0
+
     def create_Snode(self, state: "up.engines.State", depth: int, stn: "up.plans.stn.STNPlan",
                      parent: "up.engines.C_ANode" = None,
                      previous_chosen_action_node: "up.plans.stn.STNPlanNode" = None, isInterval=False):
         """ Create a new Snode for the state `state` with parent `parent`"""
         return up.engines.C_SNode(state, depth, self.mdp.legal_actions(state), stn, parent,
-                                  previous_chosen_action_node, isInterval), None
+                                  previous_chosen_action_node, isInterval, self._lazy_expansion), None
 
     def create_Snode_root_interval(self, state: "up.engines.State", depth: int, stn: "up.plans.stn.STNPlan",
                      parent: "up.engines.C_ANode" = None,
                      previous_chosen_action_node: "up.plans.stn.STNPlanNode" = None, isInterval=True):
         """ Create a new Snode for the state `state` with parent `parent`
         RootInterval approach """
+        intervals = IntervalMap(self._interval_resolution, self._interval_coalesce)
         return up.engines.C_SNode(state, depth, self.mdp.legal_actions(state), stn, parent,
-                                  previous_chosen_action_node, isInterval), None
+                                  previous_chosen_action_node, isInterval, self._lazy_expansion, intervals), None
 
     def create_Snode_max(self, state: "up.engines.State", depth: int, stn: "up.plans.stn.STNPlan",
                          parent: "up.engines.C_ANode" = None,
@@ -307,15 +508,18 @@ class C_MCTS(Base_MCTS):
         """ Create a new Snode for the state `state` with parent `parent`
          In this approach k children of snode are evaluated and the initiate value of snode is set to maximum value."""
         snode = up.engines.C_SNode(state, depth, self.mdp.legal_actions(state), stn, parent,
-                                   previous_chosen_action_node)
+                                   previous_chosen_action_node, lazy=self._lazy_expansion)
         best = -math.inf
 
-        actions_idx = list(range(len(snode.children)))
-        if self.k < len(snode.children):
-            actions_idx = random.sample(range(0, len(snode.children)), self.k)
+        actions = list(snode.possible_actions)
+        actions_idx = list(range(len(actions)))
+        if self.k < len(actions):
+            actions_idx = random.sample(range(0, len(actions)), self.k)
 
         for action_idx in actions_idx:
-            action = list(snode.children.keys())[action_idx]
+            action = actions[action_idx]
+            if not snode.expand_child(action):
+                continue
             terminal, next_state, reward = self.mdp.step(snode.state, action)
             reward += self.mdp.discount_factor * self.heuristic_init(next_state, snode.children[action].stn)
             snode.children[action].update(reward)
@@ -332,7 +536,7 @@ class C_MCTS(Base_MCTS):
         """
                 Traverse the tree until reaching a leaf node.
          """
-        if len(snode.possible_actions) == 0:
+        if not self.has_possible_actions(snode):
             # Stop when there are no possible actions to take so the plan remains consistent
             return -100
 
@@ -346,8 +550,9 @@ class C_MCTS(Base_MCTS):
         # Choose a consistent action
         action = self.uct(snode, explore_constant)
         terminal, next_state, reward = self.mdp.step(snode.state, action)
-        anode = snode.children[action]
+        anode = snode.child(action)
         if not terminal:
+            key = self.find_transposition(anode, next_state, snode.depth + 1)
             snodes = anode.children
             if next_state in snodes:
                 reward += self.mdp.discount_factor * self.selection(snodes[next_state])
@@ -356,6 +561,7 @@ class C_MCTS(Base_MCTS):
                 next_snode, _ = self.create_Snode(next_state, snode.depth + 1, anode.stn, anode)
                 reward += self.mdp.discount_factor * self.heuristic(next_snode)
                 anode.add_child(next_snode)
+                self.add_transposition(key, next_snode)
                 next_snode.update(reward)
 
         snode.update(reward)
@@ -363,13 +569,62 @@ class C_MCTS(Base_MCTS):
 
         return reward
 
+    def selection_tree_parallel(self, snode: "up.engines.C_Snode"):
+        """
+        Traverse the shared tree until reaching a leaf node, while other threads traverse it too.
+        The chosen action node holds a virtual loss until the reward is backed up.
+        """
+        with self._lock:
+            has_possible_actions = self.has_possible_actions(snode)
+        if not has_possible_actions:
+            # Stop when there are no possible actions to take so the plan remains consistent
+            return -100
+
+        if snode.depth > self.search_depth:
+            # Stop if the search depth is reached
+            return self.heuristic(snode)
+
+        with self._lock:
+            action = self.uct(snode, self.exploration_constant)
+            anode = snode.child(action)
+            snode.add_virtual_loss(self.virtual_loss)
+            anode.add_virtual_loss(self.virtual_loss)
+
+        terminal, next_state, reward = self.mdp.step(snode.state, action)
+        if not terminal:
+            with self._lock:
+                key = self.find_transposition(anode, next_state, snode.depth + 1)
+                next_snode = anode.children.get(next_state)
+
+            if next_snode is not None:
+                reward += self.mdp.discount_factor * self.selection_tree_parallel(next_snode)
+
+            else: # leaf
+                # The STNs of the children are built outside the lock
+                next_snode, _ = self.create_Snode(next_state, snode.depth + 1, anode.stn, anode)
+                reward += self.mdp.discount_factor * self.heuristic(next_snode)
+                with self._lock:
+                    # Another thread may have expanded the same leaf meanwhile
+                    if next_state not in anode.children:
+                        anode.add_child(next_snode)
+                        self.add_transposition(key, next_snode)
+                        next_snode.update(reward)
+
+        with self._lock:
+            snode.remove_virtual_loss(self.virtual_loss)
+            anode.remove_virtual_loss(self.virtual_loss)
+            snode.update(reward)
+            anode.update(reward)
+
+        return reward
+
     def selection_max(self, snode: "up.engines.C_Snode"):
         """
         Traverse the tree until reaching a leaf node.
         Selection with max logic -
         average between states and maximum between possible actions
         """
-        if len(snode.possible_actions) == 0:
+        if not self.has_possible_actions(snode):
             # Stop when there are no possible actions to take so the plan remains consistent
             return -100
 
@@ -381,8 +636,9 @@ class C_MCTS(Base_MCTS):
         # Choose a consistent action
         action = self.uct(snode, explore_constant)
         terminal, next_state, reward = self.mdp.step(snode.state, action)
-        anode = snode.children[action]
+        anode = snode.child(action)
         if not terminal:
+            key = self.find_transposition(anode, next_state, snode.depth + 1)
             snodes = anode.children
             if next_state in snodes:
                 reward += self.mdp.discount_factor * self.selection_max(snodes[next_state])
@@ -391,6 +647,7 @@ class C_MCTS(Base_MCTS):
                 next_snode, snode_reward = self.create_Snode_max(next_state, snode.depth + 1, anode.stn, anode)
                 reward += snode_reward
                 anode.add_child(next_snode)
+                self.add_transposition(key, next_snode)
 
         anode.update(reward)
         max_v = snode.max_update()
@@ -404,7 +661,7 @@ class C_MCTS(Base_MCTS):
         set the value per root action legal interval.
         The value is propagated and updated according the legal interval
         """
-        if len(snode.possible_actions) == 0:
+        if not self.has_possible_actions(snode):
             # Stop when there are no possible actions to take so the plan remains consistent
             if root_STNnode is None:
                 return 0
@@ -419,7 +676,7 @@ class C_MCTS(Base_MCTS):
         action = self.uct(snode, explore_constant)
         terminal, next_state, reward = self.mdp.step(snode.state, action)
 
-        anode = snode.children[action]
+        anode = snode.child(action)
         if root_STNnode is None:
             root_STNnode = anode.STNNode
 
@@ -447,7 +704,7 @@ class C_MCTS(Base_MCTS):
 
 
     def selection_root_interval_max(self, snode: "up.engines.C_Snode", root_STNnode: "up.plans.stn.STNPlanNode" = None):
-        if len(snode.possible_actions) == 0:
+        if not self.has_possible_actions(snode):
             if root_STNnode is None:
                 return -100
             # Stop when there are no possible actions to take so the plan remains consistent
@@ -460,7 +717,7 @@ class C_MCTS(Base_MCTS):
         # Choose a consistent action
         action = self.uct(snode, explore_constant)
         terminal, next_state, reward = self.mdp.step(snode.state, action)
-        anode = snode.children[action]
+        anode = snode.child(action)
         if root_STNnode is None:
             root_STNnode = anode.STNNode
 
@@ -482,27 +739,38 @@ class C_MCTS(Base_MCTS):
         backup_node = snode.max_update(backup_node)
         return backup_node
 
+    def transposition_key(self, anode: "up.engines.C_ANode", state: "up.engines.State", depth: int):
+        """ The state nodes of equal states at the same depth are shared if their STNs have the same signature """
+        return depth, state, anode.stn.signature(anode.STNNode)
+
     def heuristic(self, snode: "up.engines.C_SNode"):
         current_time = 0
         lower_bounds = None
         if snode.parent:
             current_time = snode.parent.stn.get_current_end_time()
             lower_bounds = snode.parent.stn.get_lower_bound_potential_end_action()
-        h = up.engines.heuristics.TRPG(self.mdp, snode.state, current_time)
-        return h.get_heuristic(lower_bounds)
+        return self.mdp.heuristic(snode.state, current_time, lower_bounds)
 
     def heuristic_init(self, state, stn):
         current_time = stn.get_current_end_time()
-        h = up.engines.heuristics.TRPG(self.mdp, state, current_time)
-        return h.get_heuristic()
+        return self.mdp.heuristic(state, current_time)
 
 
-def plan(mdp: "up.engines.MDP", steps: int, search_time: int, search_depth: int, exploration_constant: float,
-         selection_type='avg', k=10):
-    stn = create_init_stn(mdp)
+def plan(mdp: "up.engines.MDP", steps: int, search_budget: "up.engines.SearchBudget", search_depth: int, exploration_constant: float,
+         selection_type='avg', k=10, workers=1, parallel='root', virtual_loss=1, lazy_expansion=False,
+         stn_bounds='auto', stn_type='delta', reuse=False, transpositions=False, interval_resolution=None,
+         interval_coalesce=False):
+    """
+    :param reuse: if True, the search of each step continues the subtree of the chosen action and the realized state,
+        its STNs are rebuilt on the STN of the plan. Not supported by the rootInterval selection type.
+    :param transpositions: if True, the searches share the state nodes of equal states with the same STN signature
+    :param interval_resolution: the time resolution of the interval values of the rootInterval selection type
+    :param interval_coalesce: if True, the adjacent intervals with equal values are merged
+    """
+    stn = create_init_stn(mdp, stn_bounds, stn_type)
     root_state = mdp.initial_state()
 
-    reuse = False
+    reuse = reuse and selection_type != 'rootInterval'
     history = []
     previous_action_node = None
     step = 0
@@ -510,11 +778,17 @@ def plan(mdp: "up.engines.MDP", steps: int, search_time: int, search_depth: int,
 
     while stn.get_current_end_time() <= mdp.deadline():
         print(f"started step {step}")
+        up.engines.profiler.start_step()
         mcts = C_MCTS(mdp, root_node, root_state, search_depth, exploration_constant, stn, selection_type, k,
-                      previous_action_node)
-        action = mcts.search(search_time, selection_type)
-
-        if action == -1:
+                      previous_action_node, lazy_expansion, transpositions, interval_resolution, interval_coalesce)
+        action, iteration_rates = parallel_search(mcts, workers, search_budget, selection_type, parallel, virtual_loss)
+        print(f"Iterations per second per worker: {[round(rate, 1) for rate in iteration_rates]}")
+        print(f"Iterations per second: {round(sum(iteration_rates), 1)}")
+        if transpositions:
+            print(f"Transposition hits: {mcts.transposition_hits}")
+
+        # The root statistics of root parallel workers may choose an action not expanded in this tree
+        if action == -1 or not mcts.root_node.expand_child(action):
             print("A valid plan is not found")
             return 0, -math.inf
 
@@ -523,17 +797,20 @@ def plan(mdp: "up.engines.MDP", steps: int, search_time: int, search_depth: int,
 
         terminal, root_state, reward = mcts.mdp.step(root_state, action)
 
-        if reuse and root_state in mcts.root_node.children[action].children:
-            root_node = mcts.root_node.children[action].children[root_state]
-            root_node.set_depth(0)
-
         # update STN to include the action
         action_node = mcts.root_node.children[action] if selection_type == 'rootInterval' else None
 
         previous_action_node = update_stn(stn, action, previous_action_node, type='SetTime', action_node=action_node)
+        # the fixed actions are folded into the start of the plan, only the last one is still referenced
+        stn.compact(keep=[previous_action_node])
 
         assert stn.is_consistent()
 
+        if reuse:
+            root_node = mcts.root_node.pop_subtree(action, root_state)
+            if root_node is not None:
+                root_node.rebase(stn, previous_action_node)
+
         print(f"The time of the plan so far: {stn.get_current_end_time()}")
         history.append(previous_action_node)
 
@@ -548,9 +825,14 @@ def plan(mdp: "up.engines.MDP", steps: int, search_time: int, search_depth: int,
     return 0, -math.inf
 
 
-def combination_plan(mdp: "up.engines.MDP", split_mdp: "up.engines.MDP", steps: int, search_time: int,
+def combination_plan(mdp: "up.engines.MDP", split_mdp: "up.engines.MDP", steps: int, search_budget: "up.engines.SearchBudget",
                      search_depth: int, exploration_constant: float,
-                     selection_type='avg', k=10):
+                     selection_type='avg', k=10, workers=1, parallel='root', virtual_loss=1, reuse=False,
+                     transpositions=False):
+    """
+    :param reuse: if True, the search of each step continues the subtree of the chosen action and the realized state
+    :param transpositions: if True, the searches share the state nodes of equal states
+    """
     root_state = mdp.initial_state()
     history = []
     step = 0
@@ -558,14 +840,22 @@ def combination_plan(mdp: "up.engines.MDP", split_mdp: "up.engines.MDP", steps:
 
     while root_state.current_time < mdp.deadline():
         print(f"started step {step}")
+        up.engines.profiler.start_step()
 
-        mcts = MCTS(mdp, split_mdp, root_node, root_state, search_depth, exploration_constant, selection_type, k)
-        action = mcts.search(search_time, selection_type)
+        mcts = MCTS(mdp, split_mdp, root_node, root_state, search_depth, exploration_constant, selection_type, k,
+                    transpositions)
+        action, iteration_rates = parallel_search(mcts, workers, search_budget, selection_type, parallel, virtual_loss)
+        print(f"Iterations per second per worker: {[round(rate, 1) for rate in iteration_rates]}")
+        print(f"Iterations per second: {round(sum(iteration_rates), 1)}")
+        if transpositions:
+            print(f"Transposition hits: {mcts.transposition_hits}")
 
         print(f"Current state is {root_state}")
         print(f"The chosen action is {action.name}")
 
         terminal, root_state, reward = mcts.mdp.step(root_state, action)
+        if reuse:
+            root_node = mcts.root_node.pop_subtree(action, root_state)
 
         history.append(action)
         print(f'current time = {root_state.current_time}')
@@ -0,0 +1,141 @@
+import multiprocessing
+import random
+import threading
+
+import numpy as np
+import unified_planning as up
+from unified_planning.engines.solvers.search_budget import as_budget
+
+# The search and the budget each forked worker continues, set right before the workers are forked
+_worker_mcts = None
+_worker_budget = None
+
+
+def _root_worker(params):
+    """
+    Grows the inherited tree until the inherited budget is exhausted and returns its root statistics.
+    Runs inside a forked worker process.
+    """
+    selection_type, seed = params
+    random.seed(seed)
+    np.random.seed(seed)
+
+    mcts = _worker_mcts
+    # the forked workers inherit the random generators of the mdps
+    mcts.mdp.seed(seed)
+    if getattr(mcts, 'split_mdp', None) is not None:
+        mcts.split_mdp.seed(seed)
+    _, statistics = mcts.anytime_search(_worker_budget, selection_type)
+    return mcts.iterations, mcts.search_duration, statistics
+
+
+def root_parallel_search(mcts: "up.engines.solvers.mcts.Base_MCTS", workers: int, budget=1, selection_type='avg'):
+    """
+    Root parallel MCTS.
+    Each worker grows its own tree from the root of `mcts` with its own copy of `budget`,
+    the parent process is one of the workers.
+    The root action nodes statistics of all the workers are merged into the tree of `mcts`
+    before the best action is chosen.
+
+    The workers are forked so the MDP, the root state and the root STN are inherited and not pickled.
+
+    :param mcts: the search holding the root node
+    :param workers: amount of parallel searches
+    :param budget: a SearchBudget of each worker, or the search time in seconds
+    :param selection_type: the selection type of the search
+    :return: the best action and the amount of iterations per second of each worker
+    """
+    global _worker_mcts, _worker_budget
+    budget = as_budget(budget)
+
+    if workers <= 1:
+        action = mcts.search(budget, selection_type)
+        return action, [_iterations_per_second(mcts.iterations, mcts.search_duration)]
+
+    seeds = [random.randrange(2 ** 32) for _ in range(workers - 1)]
+    _worker_mcts = mcts
+    _worker_budget = budget
+    context = multiprocessing.get_context('fork')
+    with context.Pool(workers - 1) as pool:
+        results = pool.map_async(_root_worker, [(selection_type, seed) for seed in seeds])
+        mcts.search(budget, selection_type)
+        worker_results = results.get()
+    _worker_mcts = None
+    _worker_budget = None
+
+    iteration_rates = [_iterations_per_second(mcts.iterations, mcts.search_duration)]
+    for iterations, duration, statistics in worker_results:
+        mcts.merge_root_statistics(statistics)
+        iteration_rates.append(_iterations_per_second(iterations, duration))
+
+    return mcts.best_action(mcts.root_node), iteration_rates
+
+
+def _tree_worker(mcts, budget, budget_lock, iterations, index):
+    """
+    Descends the shared tree of `mcts` until the shared `budget` is exhausted.
+    Runs inside a thread, the amount of selections is written to `iterations[index]`.
+    """
+    i = 0
+    while True:
+        with budget_lock:
+            if budget.exhausted():
+                break
+            budget.step()
+        mcts.selection_tree_parallel(mcts.root_node)
+        i += 1
+    iterations[index] = i
+
+
+def tree_parallel_search(mcts: "up.engines.solvers.mcts.Base_MCTS", threads: int, budget=1, virtual_loss=1):
+    """
+    Tree parallel MCTS.
+    All the threads descend the same tree of `mcts` until `budget` is exhausted, the iterations of the budget
+    are shared by the threads.
+    While a thread passes through a node, the node holds a virtual loss of `virtual_loss` visits,
+    so the other threads prefer other actions and the search grows one deeper tree.
+
+    Only the average selection type is supported.
+    The threads share the interpreter lock, so the gain is bounded by the time spent outside the interpreter.
+
+    :param mcts: the search holding the root node
+    :param threads: amount of threads descending the tree
+    :param budget: a SearchBudget, or the search time in seconds
+    :param virtual_loss: the visits added to a node while a thread passes through it
+    :return: the best action and the amount of iterations per second of each thread
+    """
+    mcts.set_virtual_loss(virtual_loss)
+    budget = as_budget(budget)
+    budget_lock = threading.Lock()
+    iterations = [0] * threads
+    budget.start()
+    workers = [threading.Thread(target=_tree_worker, args=(mcts, budget, budget_lock, iterations, i))
+               for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    duration = budget.elapsed()
+    mcts.set_search_statistics(sum(iterations), duration)
+
+    return mcts.best_action(mcts.root_node), [_iterations_per_second(i, duration) for i in iterations]
+
+
+def parallel_search(mcts: "up.engines.solvers.mcts.Base_MCTS", workers: int, budget=1, selection_type='avg',
+                    parallel='root', virtual_loss=1):
+    """
+    Searches from the root of `mcts` with `workers` parallel searches
+
+    :param parallel: 'root' for root parallel search, 'tree' for tree parallel search
+    :return: the best action and the amount of iterations per second of each worker
+    """
+    if parallel == 'tree' and workers > 1:
+        if selection_type != 'avg':
+            raise up.exceptions.UPUsageError("Tree parallel search supports only the avg selection type")
+        return tree_parallel_search(mcts, workers, budget, virtual_loss)
+    return root_parallel_search(mcts, workers, budget, selection_type)
+
+
+def _iterations_per_second(iterations, duration):
+    return iterations / duration if duration > 0 else 0.0
@@ -1,12 +1,19 @@
 import unified_planning as up
 import math
-import time
 import random
+from unified_planning.engines.solvers.search_budget import as_budget
 
 
 class RTDP:
-    def __init__(self, mdp, split_mdp, root_state: "up.engines.state.State", search_depth: int):
+    def __init__(self, mdp, split_mdp, root_state: "up.engines.state.State", search_depth: int,
+                 outcome_threshold: float = 0, outcome_mass: float = 1):
+        """
+        :param outcome_threshold: the outcomes less likely than it are left out of the Bellman backups
+        :param outcome_mass: the Bellman backups take the most likely outcomes until they cover this probability mass
+        """
         self._mdp = mdp
+        self._outcome_threshold = outcome_threshold
+        self._outcome_mass = outcome_mass
         self._root_state = root_state
         self._search_depth = search_depth
         self.Q = {}
@@ -28,37 +35,54 @@ class RTDP:
     def update_root(self, root_state):
         self._root_state = root_state
 
-    def search(self, timeout):
-        start_time = time.time()
-        current_time = time.time()
-        while current_time < start_time + timeout:
-            self.trial(timeout, start_time)
-            current_time = time.time()
+    def search(self, budget=1):
+        """
+        Performs RTDP trials from the root state until the budget is exhausted
 
-        best_action, _ = self.best_action(self.root_state)
+        :param budget: a SearchBudget, or the search time in seconds
+        :return: the best action of the root state
+        """
+        best_action, _ = self.anytime_search(budget)
         return best_action
 
-    def trial(self, timeout, start_time):
+    def anytime_search(self, budget=1):
+        """
+        Performs RTDP trials from the root state until the budget is exhausted or stopped,
+        each trial is an iteration of the budget
+
+        :param budget: a SearchBudget, or the search time in seconds
+        :return: the best action of the root state and the Q values of the root state actions by action name
+        """
+        budget = as_budget(budget)
+        budget.start()
+        while not budget.exhausted():
+            self.trial(budget)
+            budget.step()
+
+        best_action, _ = self.best_action(self.root_state)
+        return best_action, {action.name: value for action, value in self.Q[self.root_state].items()}
+
+    def trial(self, budget: "up.engines.SearchBudget"):
         """
+        Performs a single trial from the root state, the trial is interrupted when the budget is interrupted
         """
         state = self.root_state
         terminal = False
         depth = 0
         while state.current_time < self.mdp.deadline() and (not terminal) and (depth < self.search_depth):  # TODO: add another stopping criteria (number of steps or time)
-            best_action, best_action_value = self.evaluate(state, timeout, start_time)
+            best_action, best_action_value = self.evaluate(state, budget)
 
             terminal, state, reward = self.mdp.step(state, best_action)
             depth += 1
 
-            current_time = time.time()
-            if current_time > start_time + timeout:
+            if budget.interrupted():
                 return
 
     def eval_action(self, state: "up.engines.State", action: "up.engines.Action"):
         # Heuristic value if the state is not stored in V table else V[state]
 
         _, _, reward = self.mdp.step(state, action)
-        trans = self.mdp.transition_function(state, action)
+        trans, covered = self.mdp.successors(state, action, self._outcome_threshold, self._outcome_mass)
         nextV = 0
         for state, prob in trans:
             if state in self.Q and len(self.Q[state]) > 0:
@@ -67,10 +91,14 @@ class RTDP:
                 value = self.heuristic(state)
             nextV += prob * value
 
+        if (self._outcome_threshold > 0 or self._outcome_mass < 1) and covered > 0:
+            # the pruned outcomes are assumed to be as valuable as the enumerated ones
+            nextV /= covered
+
         Q_s_a = reward + self.mdp.discount_factor * nextV   # TODO: multiply be sum of probability function multiply by V or H
         return Q_s_a
 
-    def evaluate(self, state: "up.engines.State", timeout, start_time):
+    def evaluate(self, state: "up.engines.State", budget: "up.engines.SearchBudget"):
         best_a = []
         best_value = -math.inf
         if state not in self.Q:
@@ -85,8 +113,7 @@ class RTDP:
             elif Q_s_a == best_value:
                 best_a.append(action)
 
-            current_time = time.time()
-            if current_time > start_time + timeout:
+            if budget.interrupted():
                 break
 
         best_a = random.choice(best_a)
@@ -112,20 +139,21 @@ class RTDP:
         current_time = 0
         if isinstance(state, up.engines.CombinationState):
             current_time = state.current_time
-        h = up.engines.heuristics.TRPG(self.split_mdp, state, current_time)
-        return h.get_heuristic()
+        return self.split_mdp.heuristic(state, current_time)
 
 
-def plan(mdp: "up.engines.MDP", split_mdp: "up.engines.MDP", steps: int, search_time: int, search_depth: int):
+def plan(mdp: "up.engines.MDP", split_mdp: "up.engines.MDP", steps: int, search_budget: "up.engines.SearchBudget",
+         search_depth: int, outcome_threshold: float = 0, outcome_mass: float = 1):
     root_state = mdp.initial_state()
 
     step = 0
     history = []
-    rtdp = RTDP(mdp, split_mdp, root_state, search_depth)
+    rtdp = RTDP(mdp, split_mdp, root_state, search_depth, outcome_threshold, outcome_mass)
 
     while root_state.current_time < mdp.deadline():
         print(f"started step {step}")
-        action = rtdp.search(search_time)
+        up.engines.profiler.start_step()
+        action = rtdp.search(search_budget)
 
         print(f"Current state is {root_state}")
         print(f"The chosen action is {action.name}")
@@ -0,0 +1,118 @@
+import time
+
+
+class SearchBudget:
+    """
+    The stopping rule of a search.
+    A search is stopped when it performed `iterations` iterations, when `timeout` seconds passed,
+    when `stop_event` is set, when `stop_callback` returns True or when `stop` is called - the first of them.
+
+    The clock is not read after every iteration, but in a stride adapted to the iteration rate of the search,
+    so a search overshoots its timeout by a fraction of the remaining time at most.
+
+    :param iterations: maximal amount of iterations, None for no iteration limit
+    :param timeout: maximal search time in seconds, None for no time limit
+    :param time_check_stride: maximal amount of iterations between two clock reads
+    :param stop_event: an object with `is_set()`, such as `threading.Event`, that stops the search once set
+    :param stop_callback: a function that gets the budget and returns True to stop the search,
+                          called when the clock is read
+    """
+    def __init__(self, iterations: int = None, timeout: float = None, time_check_stride: int = 64,
+                 stop_event=None, stop_callback=None):
+        assert iterations is not None or timeout is not None or stop_event is not None or stop_callback is not None, \
+            "A search budget must be bounded"
+        self._max_iterations = iterations
+        self._timeout = timeout
+        self._time_check_stride = max(1, time_check_stride)
+        self._stop_event = stop_event
+        self._stop_callback = stop_callback
+        self.start()
+
+    def __repr__(self):
+        return f"SearchBudget(iterations={self._max_iterations}, timeout={self._timeout})"
+
+    @property
+    def max_iterations(self):
+        return self._max_iterations
+
+    @property
+    def timeout(self):
+        return self._timeout
+
+    @property
+    def iterations(self):
+        """ The amount of iterations performed since the budget started """
+        return self._iterations
+
+    def elapsed(self):
+        """ The seconds passed since the budget started """
+        return time.time() - self._start_time
+
+    def start(self):
+        """ Starts the budget, called at the beginning of every search """
+        self._iterations = 0
+        self._start_time = time.time()
+        self._end_time = None if self._timeout is None else self._start_time + self._timeout
+        self._next_check = 0
+        self._stopped = False
+
+    def stop(self):
+        """ Stops the search after the current iteration """
+        self._stopped = True
+
+    def step(self):
+        """ Counts a performed iteration """
+        self._iterations += 1
+
+    def exhausted(self):
+        """
+        Checks if the search should stop, called before every iteration.
+        The clock, the event and the callback are checked only when the stride is reached.
+        """
+        if self._stopped:
+            return True
+        if self._max_iterations is not None and self._iterations >= self._max_iterations:
+            return True
+        if self._iterations < self._next_check:
+            return False
+
+        if self.interrupted():
+            self._stopped = True
+            return True
+
+        self._next_check = self._iterations + self._stride()
+        return False
+
+    def interrupted(self):
+        """
+        Checks the clock, the event and the callback immediately.
+        Used inside long iterations, such as an RTDP trial.
+        """
+        if self._stopped:
+            return True
+        if self._end_time is not None and time.time() >= self._end_time:
+            return True
+        if self._stop_event is not None and self._stop_event.is_set():
+            return True
+        if self._stop_callback is not None and self._stop_callback(self):
+            return True
+        return False
+
+    def _stride(self):
+        """ The amount of iterations until the next check, at most half of the estimated remaining iterations """
+        if self._end_time is None or self._iterations == 0:
+            return 1 if self._iterations == 0 else self._time_check_stride
+
+        now = time.time()
+        rate = self._iterations / max(now - self._start_time, 1e-9)
+        remaining_iterations = int((self._end_time - now) * rate / 2)
+        return max(1, min(self._time_check_stride, remaining_iterations))
+
+
+def as_budget(budget) -> SearchBudget:
+    """
+    Returns `budget` as a SearchBudget, a number is treated as a timeout in seconds
+    """
+    if isinstance(budget, SearchBudget):
+        return budget
+    return SearchBudget(timeout=budget)
@@ -5,19 +5,34 @@ import numpy as np
 
 
 class State(up.model.state.ROState):
-    def __init__(self, predicates: Set["up.model.fnode.Fnode"] = None):
-        self._predicates = predicates if predicates else set()
+    """
+    A state of the MDP.
+    With a `fluent_index` the predicates are held as an int bitmask of the index
+    and the predicates set is derived from the mask only when it is accessed.
+    The hash is computed once, a state is not changed after it is created.
+    """
+    def __init__(self, predicates: Set["up.model.fnode.Fnode"] = None, mask: int = None,
+                 fluent_index: "up.engines.FluentIndex" = None):
+        self._fluent_index = fluent_index
+        self._mask = mask
+        if mask is None:
+            self._predicates = predicates if predicates else set()
+            if fluent_index is not None:
+                self._mask = fluent_index.mask(self._predicates)
+        else:
+            assert fluent_index is not None
+            self._predicates = predicates
+        self._hash = None
 
     def __eq__(self, other):
         if isinstance(other, State):
-            return self.predicates == other.predicates
+            return self._equal_predicates(other)
         return False
 
     def __hash__(self):
-        res = hash("")
-        for p in self._predicates:
-            res += hash(p)
-        return res
+        if self._hash is None:
+            self._hash = hash("") + self.predicates_hash()
+        return self._hash
 
     def __repr__(self):
         s = []
@@ -29,33 +44,59 @@ class State(up.model.state.ROState):
 
     @property
     def predicates(self):
+        if self._predicates is None:
+            self._predicates = self._fluent_index.fluents(self._mask)
         return self._predicates
 
+    @property
+    def mask(self):
+        """ The predicates as a bitmask of the fluent index, None if the state has no fluent index """
+        return self._mask
+
+    @property
+    def fluent_index(self):
+        return self._fluent_index
+
     def set_predicates(self, new_predicates: Set):
         self._predicates = new_predicates
+        self._mask = self._fluent_index.mask(new_predicates) if self._fluent_index is not None else None
+        self._hash = None
+
+    def predicates_hash(self):
+        """ The sum of the hashes of the predicates """
+        if self._mask is not None:
+            return self._fluent_index.hash_sum(self._mask)
+        res = 0
+        for p in self._predicates:
+            res += hash(p)
+        return res
+
+    def _equal_predicates(self, other: "State"):
+        if self._mask is not None and self._fluent_index is other._fluent_index:
+            return self._mask == other._mask
+        return self.predicates == other.predicates
 
     def get_value(self):
         return 0
 
 
 class CombinationState(State):
-    def __init__(self, predicates: Set["up.model.fnode.Fnode"] = None, active_actions: "up.engines.ActionQueue" = None, current_time: int = None):
-        super().__init__(predicates)
+    def __init__(self, predicates: Set["up.model.fnode.Fnode"] = None, active_actions: "up.engines.ActionQueue" = None,
+                 current_time: int = None, mask: int = None, fluent_index: "up.engines.FluentIndex" = None):
+        super().__init__(predicates, mask, fluent_index)
         self._active_actions = active_actions if active_actions else ActionQueue()
         self._current_time = current_time if current_time else 0
 
     def __eq__(self, other):
         if isinstance(other, State):
-            return self.predicates == other.predicates \
+            return self._equal_predicates(other) \
                 and self.active_actions == other.active_actions
         return False
 
     def __hash__(self):
-        res = hash("")
-        for p in self._predicates:
-            res += hash(p)
-        res += hash(self._active_actions)
-        return res
+        if self._hash is None:
+            self._hash = hash("") + self.predicates_hash() + hash(self._active_actions)
+        return self._hash
 
     def __repr__(self):
         s = []
@@ -84,12 +125,15 @@ class CombinationState(State):
 
     def add_action(self, action: "up.engines.DurativeAction"):
         self.active_actions.add_action(QueueNode(action, action.duration.lower.int_constant_value()))
+        self._hash = None
 
     def get_next_actions(self):
+        self._hash = None
         return self.active_actions.get_next_actions()
 
     def update_actions_delta(self, delta: int):
         self.active_actions.update_delta(delta)
+        self._hash = None
 
     def add_to_time(self, delta):
         self._current_time += delta
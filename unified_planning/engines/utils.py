@@ -1,12 +1,14 @@
 import unified_planning as up
 from typing import List
-def create_init_stn(mdp: "up.engines.MDP"):
+def create_init_stn(mdp: "up.engines.MDP", bound_type: str = "auto", stn_type: str = "delta"):
     """
     Initiate a new STN with StartPlan and EndPlan nodes
     :param mdp:
+    :param bound_type: the number type of the STN bounds, one of "auto", "fraction" and "float"
+    :param stn_type: the implementation of the STN, one of "delta" and "array"
     :return:
     """
-    stn = up.plans.stn.STNPlan([])
+    stn = up.plans.stn.STNPlan([], bound_type=bound_type, stn_type=stn_type)
 
     if mdp.problem.deadline:  # Add the deadline to the STN
         deadline = mdp.problem.deadline
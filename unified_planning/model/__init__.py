@@ -19,7 +19,7 @@ from unified_planning.model.action import (
     InstantaneousAction,
     DurativeAction,
 )
-from unified_planning.model.effect import Effect, ProbabilisticEffect
+from unified_planning.model.effect import Effect, ProbabilisticEffect, to_outcomes
 from unified_planning.model.expression import (
     BoolExpression,
     Expression,
@@ -72,6 +72,7 @@ __all__ = [
     "InstantaneousAction",
     "Effect",
     "ProbabilisticEffect",
+    "to_outcomes",
     "Precondition",
     "BoolExpression",
     "Expression",
@@ -321,13 +321,15 @@ class InstantaneousAction(Action):
                     Dict["up.model.parameter.Parameter", "up.model.fnode.FNode"],
                 ],
                 Dict[float, Dict["up.model.fnode.FNode", "up.model.fnode.FNode"]],
-            ]
+            ],
+            static: bool = False
     ):
         """
         Adds the given `assignment` to the `action's probabilistic_effects`.
 
         :param fluents: The `fluents` of which `value` is modified by the `assignment`.
         :param probability_func: based on the probability function a value is chosen from the values param
+        :param static: True if the probability function does not read the state
         """
 
         fluents_exp = self._environment.expression_manager.auto_promote(fluents)
@@ -339,7 +341,7 @@ class InstantaneousAction(Action):
                 )
 
         self._add_probabilistic_effect_instance(
-            up.model.effect.ProbabilisticEffect(fluents_exp, probability_func)
+            up.model.effect.ProbabilisticEffect(fluents_exp, probability_func, static)
         )
 
     def _add_probabilistic_effect_instance(self, probabilistic_effect: "up.model.effect.ProbabilisticEffect"):
@@ -657,13 +659,15 @@ class DurativeAction(Action):
                     Dict["up.model.parameter.Parameter", "up.model.fnode.FNode"],
                 ],
                 Dict[float, Dict["up.model.fnode.FNode", "up.model.fnode.FNode"]],
-            ]
+            ],
+            static: bool = False
     ):
         """
         Adds the given `assignment` to the `action's probabilistic_effects`.
 
         :param fluents: The `fluents` of which `value` is modified by the `assignment`.
         :param probability_func: based on the probability function a value is chosen from the values param
+        :param static: True if the probability function does not read the state
         """
 
         fluents_exp = self._environment.expression_manager.auto_promote(fluents)
@@ -675,7 +679,7 @@ class DurativeAction(Action):
                 )
 
         self._add_probabilistic_effect_instance(
-            up.model.effect.ProbabilisticEffect(fluents_exp, probability_func)
+            up.model.effect.ProbabilisticEffect(fluents_exp, probability_func, static)
         )
 
     def _add_probabilistic_effect_instance(self, probabilistic_effect: "up.model.effect.ProbabilisticEffect"):
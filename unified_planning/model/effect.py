@@ -8,7 +8,7 @@ A `condition` can be added to make it a `conditional effect`.
 import unified_planning as up
 from unified_planning.exceptions import UPConflictingEffectsException
 from enum import Enum, auto
-from typing import List, Callable, Dict, Optional, Set, Tuple, Union
+from typing import List, Callable, Dict, FrozenSet, Iterable, Optional, Set, Tuple, Union
 import numpy as np
 import inspect as i
 
@@ -84,7 +84,11 @@ class ProbabilisticEffect:
     This class represents a `probabilistic effect` over a list of :class:`~unified_planning.model.Fluent` expressions.
     The `fluent's parameters` must be constants or :class:`~unified_planning.model.Action` `parameters`.
     The callable probability_func must return the result of the `probabilistic effects` applied
-    in the given :class:`~unified_planning.model.State` for the specified `fluent` expressions.
+    in the given :class:`~unified_planning.model.State` for the specified `fluent` expressions,
+    either as a list of `(probability, added fluents, deleted fluents)` outcomes
+    or as a dict of the fluent values of each outcome keyed by its probability, see `to_outcomes`.
+    An effect declared static has a probability function that does not read the state,
+    so the outcomes of its grounded effects are computed once.
     """
 
     def __init__(
@@ -95,9 +99,13 @@ class ProbabilisticEffect:
                 "up.model.state.ROState",
                 Dict["up.model.parameter.Parameter", "up.model.fnode.FNode"],
             ],
-            Dict[float, Dict["up.model.fnode.FNode", "up.model.fnode.FNode"]],
-        ]
+            Union[Dict[float, Dict["up.model.fnode.FNode", bool]], List[Tuple[float, Iterable, Iterable]]],
+        ],
+        static: bool = False
     ):
+        """
+        :param static: True if the probability function does not read the state
+        """
         for f in fluents:
             if not f.is_fluent_exp():
                 raise up.exceptions.UPUsageError(
@@ -106,6 +114,8 @@ class ProbabilisticEffect:
 
         self._fluents = fluents
         self._probability_func = probability_func
+        self._static = static
+        self._outcomes = None
 
 
     def __repr__(self) -> str:
@@ -133,7 +143,8 @@ class ProbabilisticEffect:
         return self._fluents[0].environment
 
     def clone(self):
-        new_probabilistic_effect = ProbabilisticEffect(self._fluents, self._probability_func)
+        new_probabilistic_effect = ProbabilisticEffect(self._fluents, self._probability_func, self._static)
+        new_probabilistic_effect._outcomes = self._outcomes
         return new_probabilistic_effect
 
     @property
@@ -156,6 +167,48 @@ class ProbabilisticEffect:
         """
         return self._probability_func
 
+    @property
+    def static(self) -> bool:
+        """ Returns True if the probability function of this effect does not read the state """
+        return self._static
+
+    @property
+    def static_outcomes(self) -> Optional["Outcomes"]:
+        """
+        Returns the outcomes of the grounded effect, computed on the first call, if the effect is static,
+        None if they depend on the state
+        """
+        if self._static and self._outcomes is None:
+            self._outcomes = to_outcomes(self._probability_func(None, None))
+        return self._outcomes
+
+    def outcomes(self, state: "up.model.state.ROState",
+                 actual_params: Optional[Dict["up.model.parameter.Parameter", "up.model.fnode.FNode"]] = None) -> "Outcomes":
+        """ Returns the `(probability, added fluents, deleted fluents)` outcomes of the effect in `state` """
+        if self._outcomes is not None:
+            return self._outcomes
+        return to_outcomes(self._probability_func(state, actual_params))
+
+
+# The outcomes of a probabilistic effect, (probability, added fluents, deleted fluents) of each outcome
+Outcomes = List[Tuple[float, FrozenSet["up.model.fnode.FNode"], FrozenSet["up.model.fnode.FNode"]]]
+
+
+def to_outcomes(prob_outcomes) -> Outcomes:
+    """
+    Returns the outcomes returned by a probability function as a list of
+    `(probability, added fluents, deleted fluents)` tuples.
+
+    :param prob_outcomes: a list of `(probability, added fluents, deleted fluents)`,
+        or the legacy dict of the fluent values of each outcome keyed by its probability,
+        where outcomes with equal probabilities collide
+    """
+    if isinstance(prob_outcomes, dict):
+        return [(probability, frozenset(f for f, v in values.items() if v),
+                 frozenset(f for f, v in values.items() if not v))
+                for probability, values in prob_outcomes.items()]
+    return [(probability, frozenset(add), frozenset(delete)) for probability, add, delete in prob_outcomes]
+
 
 def check_conflicting_effects(
     effect: Effect,
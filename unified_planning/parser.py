@@ -2,7 +2,8 @@ import argparse
 
 parser = argparse.ArgumentParser(description='Description of your script')
 parser.add_argument('-d', '--deadline', help='deadline of the problem', nargs='?', default=None, type=int)
-parser.add_argument('-st', '--search_time', help='amount of time in each step', nargs='?', default=1, type=int)
+parser.add_argument('-st', '--search_time', help='amount of time in each step', nargs='?', default=None, type=int)
+parser.add_argument('-si', '--search_iterations', help='amount of iterations in each step', nargs='?', default=None, type=int)
 parser.add_argument('-sd', '--search_depth', help='search depth of ', nargs='?', default=40, type=int)
 parser.add_argument('-se', '--selection_type', help='selection type in MCTS algorithm', nargs='?', default='avg')
 parser.add_argument('-r', '--runs', help='how many runs to run the script', nargs='?', default=1, type=int)
@@ -14,4 +15,25 @@ parser.add_argument('-ge', '--garbage_amount', help='how many garbage actions to
 parser.add_argument('-oe', '--object_amount', help='how many different objects in the domain', nargs='?', default=1, type=int)
 parser.add_argument('-k', '--k', help='K random actions in the max planner', nargs='?', default=10, type=int)
 
+parser.add_argument('-w', '--workers', help='amount of parallel searches', nargs='?', default=1, type=int)
+parser.add_argument('-p', '--parallel', help='root or tree parallel search', nargs='?', default='root', choices=['root', 'tree'])
+parser.add_argument('-sr', '--seed', help='random seed of the runs', nargs='?', default=None, type=int)
+parser.add_argument('-vl', '--virtual_loss', help='virtual loss of the tree parallel search', nargs='?', default=1, type=int)
+parser.add_argument('-cs', '--cache_size', help='size of the legal actions and step caches of the mdp', nargs='?', default=0, type=int)
+parser.add_argument('-hc', '--heuristic_cache_size', help='size of the heuristic cache of the mdp', nargs='?', default=0, type=int)
+parser.add_argument('-hs', '--heuristic_samples', help='heuristic evaluations averaged by the heuristic cache', nargs='?', default=1, type=int)
+parser.add_argument('-hm', '--heuristic_mode', help='how the heuristic applies probabilistic effects', nargs='?', default='sample', choices=['sample', 'union', 'most_likely'])
+parser.add_argument('-le', '--lazy_expansion', help='check the STN of an action node only when it is first selected', action='store_true')
+parser.add_argument('-sb', '--stn_bounds', help='number type of the STN bounds', nargs='?', default='auto', choices=['auto', 'fraction', 'float'])
+parser.add_argument('-sy', '--stn_type', help='implementation of the STN', nargs='?', default='delta', choices=['delta', 'array'])
+parser.add_argument('-tr', '--tree_reuse', help='continue the search tree of the chosen action in the next step', action='store_true')
+parser.add_argument('-tt', '--transpositions', help='share the search nodes of equal states reached by different action orders', action='store_true')
+parser.add_argument('-ir', '--interval_resolution', help='time resolution of the interval values of the rootInterval selection type', nargs='?', default=None, type=float)
+parser.add_argument('-ic', '--interval_coalesce', help='merge the adjacent intervals with equal values in the rootInterval selection type', action='store_true')
+parser.add_argument('-ot', '--outcome_threshold', help='probability below which RTDP leaves the outcomes out of its backups', nargs='?', default=0, type=float)
+parser.add_argument('-om', '--outcome_mass', help='probability mass of the most likely outcomes the backups of RTDP cover', nargs='?', default=1, type=float)
+parser.add_argument('-pr', '--profile', help='print the time spent in each component of the search', action='store_true')
+parser.add_argument('-pj', '--profile_json', help='JSON file the profile of the search is written to', nargs='?', default=None)
+parser.add_argument('-mb', '--memory_benchmark', help='print the memory per node of one search instead of running the domain', action='store_true')
+
 args = parser.parse_args()
\ No newline at end of file
@@ -1,13 +1,16 @@
 
 
 from unified_planning.plans.stn.delta_stn import DeltaSimpleTemporalNetwork
-from unified_planning.plans.stn.stn_plan import STNPlanNode, STNPlan
+from unified_planning.plans.stn.array_stn import ArraySimpleTemporalNetwork
+from unified_planning.plans.stn.stn_plan import STNPlanNode, STNPlan, STNSignature
 from unified_planning.plans.stn.bellman_ford import Graph
 
 __all__ = [
 
     "DeltaSimpleTemporalNetwork",
+    "ArraySimpleTemporalNetwork",
     "STNPlanNode",
     "STNPlan",
+    "STNSignature",
     "Graph",
     ]
\ No newline at end of file
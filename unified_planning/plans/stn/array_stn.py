@@ -0,0 +1,304 @@
+import math
+from array import array
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+INF = math.inf
+
+
+class ArraySimpleTemporalNetwork:
+    """
+    A SimpleTemporalNetwork with the interface of the `DeltaSimpleTemporalNetwork`
+    that interns its `Events` as consecutive ints.
+    The bounds are kept in a flat matrix, the distances and the latest times in
+    arrays of doubles and the constraints of every event as tuples of ids, so
+    a copy copies a few buffers and the relaxation loops index arrays instead
+    of hashing the events.
+
+    The bounds are stored as floats and compared with the `epsilon` tolerance.
+
+    :param epsilon: the tolerance of the comparisons of the bounds.
+    :param origin: the event the latest times are relative to, None to not maintain them.
+    :param capacity: the amount of events the arrays hold before they grow.
+    """
+
+    def __init__(self, epsilon: float = 1e-9, origin: Any = None, capacity: int = 16):
+        assert capacity > 0
+        self._ids: Dict[Any, int] = {}
+        self._events: List[Any] = []
+        self._capacity = capacity
+        # _bounds[x * capacity + y] is the bound b of the constraint x - y <= b
+        self._bounds = array('d', [INF]) * (capacity * capacity)
+        # the ids y of the constraints x - y <= b of every event x
+        self._neighbors: List[Tuple[int, ...]] = []
+        # the ids x of the constraints x - y <= b of every event y
+        self._successors: List[Tuple[int, ...]] = []
+        self._distances = array('d')
+        self._latest = array('d')
+        self._is_sat = True
+        self._epsilon = epsilon
+        self._origin = origin
+        self._latest_valid = True
+        if origin is not None:
+            # the origin is always the event 0
+            self._intern(origin)
+
+    def __repr__(self) -> str:
+        res = []
+        for x, ys in enumerate(self._neighbors):
+            for y in ys:
+                res.append(f"{self._events[x]} - {self._events[y]} <= {self._bounds[x * self._capacity + y]}")
+        return "\n".join(res)
+
+    def __contains__(self, value: Any) -> bool:
+        return value in self._ids
+
+    @property
+    def epsilon(self) -> float:
+        """ The tolerance of the comparisons of the bounds """
+        return self._epsilon
+
+    @property
+    def origin(self) -> Any:
+        """ The event the latest times are relative to, None if they are not maintained """
+        return self._origin
+
+    @property
+    def distances(self) -> Dict[Any, float]:
+        """
+        Return the mapping from an event to his distance.
+        The distance of an event is the negative of the minimum consistent time that can
+        be assigned to said event.
+        """
+        return dict(zip(self._events, self._distances))
+
+    def copy_stn(self) -> "ArraySimpleTemporalNetwork":
+        """
+        Returns another `ArraySimpleTemporalNetwork` with all the constraints
+        already present in self.
+        """
+        new_stn = ArraySimpleTemporalNetwork.__new__(ArraySimpleTemporalNetwork)
+        new_stn._ids = self._ids.copy()
+        new_stn._events = self._events.copy()
+        new_stn._capacity = self._capacity
+        new_stn._bounds = self._bounds[:]
+        new_stn._neighbors = self._neighbors.copy()
+        new_stn._successors = self._successors.copy()
+        new_stn._distances = self._distances[:]
+        new_stn._latest = self._latest[:]
+        new_stn._is_sat = self._is_sat
+        new_stn._epsilon = self._epsilon
+        new_stn._origin = self._origin
+        new_stn._latest_valid = self._latest_valid
+        return new_stn
+
+    def _intern(self, event: Any) -> int:
+        """ Returns the id of `event`, the next free id if it is not in the STN yet """
+        i = self._ids.get(event, None)
+        if i is None:
+            i = len(self._events)
+            if i == self._capacity:
+                self._grow()
+            self._ids[event] = i
+            self._events.append(event)
+            self._neighbors.append(())
+            self._successors.append(())
+            self._distances.append(0.0)
+            self._latest.append(0.0 if i == 0 and self._origin is not None else INF)
+        return i
+
+    def _grow(self):
+        """ Doubles the capacity of the bounds matrix """
+        capacity = self._capacity
+        new_capacity = 2 * capacity
+        bounds = array('d', [INF]) * (new_capacity * new_capacity)
+        for x in range(len(self._events)):
+            bounds[x * new_capacity: x * new_capacity + capacity] = self._bounds[x * capacity: (x + 1) * capacity]
+        self._bounds = bounds
+        self._capacity = new_capacity
+
+    def add(self, x: Any, y: Any, b: float):
+        """
+        Adds the constraint `x - y <= b`. This gives an upper bound to the time
+        that can elapse from the event `y` to the event `x`.
+
+        :param x: The element to the left of the minus in the added constraint.
+        :param y: The element to the right of the minus in the added constraint.
+        :param b: The upper bound to the time lapsed from the event `y` to the
+            event `x`.
+        """
+        if self._is_sat:
+            xi = self._intern(x)
+            yi = self._intern(y)
+            k = xi * self._capacity + yi
+            previous = self._bounds[k]
+            # the constraint is subsumed by a harder constraint from x to y
+            if previous <= b:
+                return
+            if previous == INF:
+                self._neighbors[xi] += (yi,)
+                self._successors[yi] += (xi,)
+            self._bounds[k] = b
+            self._is_sat = self._inc_check(xi, yi, b)
+            if self._origin is not None and self._is_sat and self._latest_valid:
+                self._inc_latest(yi, xi, b)
+
+    def check_stn(self) -> bool:
+        """Checks the consistency of this STN."""
+        return self._is_sat
+
+    def get_stn_model(self, x: Any) -> float:
+        """
+        Returns the assignment to the given event in the minimal-makespan consistent solution.
+
+        :param x: The event of which the time assignment, in the minimal-makespan consistent
+            solution, must be returned.
+        :return: The minimal possible time assignment for the given event.
+        """
+        return -self._distances[self._ids[x]]
+
+    def get_latest_time(self, x: Any) -> Optional[float]:
+        """
+        Returns the latest time that can be assigned to the given event in a
+        consistent solution, relative to the origin of this STN.
+        The STN must be consistent and created with an origin.
+
+        :param x: The event of which the latest time must be returned.
+        :return: The maximal possible time assignment for the given event, None
+            if the event is not bounded by the origin.
+        """
+        assert self._origin is not None, "The latest times are kept only by an STN with an origin"
+        if not self._latest_valid and self._is_sat:
+            self._latest = array('d', [INF]) * len(self._events)
+            self._latest[0] = 0.0
+            self._propagate_latest(self._latest, deque([0]))
+            self._latest_valid = True
+        i = self._ids.get(x, None)
+        if i is None or self._latest[i] == INF:
+            return None
+        return self._latest[i]
+
+    def get_distances_from(self, x: Any) -> Dict[Any, float]:
+        """
+        Returns the latest time of every event relative to the given event, the
+        length of the shortest path from it, for the events it bounds.
+        The STN must be consistent and created with an origin.
+
+        :param x: The event the returned times are relative to.
+        :return: The mapping from an event to its latest time after `x`.
+        """
+        assert self._origin is not None, "The successors are kept only by an STN with an origin"
+        assert self._is_sat, "The distances are defined only for a consistent STN"
+        xi = self._ids[x]
+        latest = array('d', [INF]) * len(self._events)
+        latest[xi] = 0.0
+        self._propagate_latest(latest, deque([xi]))
+        events = self._events
+        return {events[i]: d for i, d in enumerate(latest) if d != INF}
+
+    def _inc_check(self, x: int, y: int, b: float) -> bool:
+        distances = self._distances
+        bounds = self._bounds
+        neighbors = self._neighbors
+        capacity = self._capacity
+        epsilon = self._epsilon
+        x_plus_b = distances[x] + b
+        if x_plus_b < distances[y] - epsilon:
+            distances[y] = x_plus_b
+            queue: Deque[int] = deque()
+            queue.append(y)
+            while queue:
+                c = queue.popleft()
+                c_distance = distances[c]
+                row = c * capacity
+                for n in neighbors[c]:
+                    n_distance = c_distance + bounds[row + n]
+                    if n_distance < distances[n] - epsilon:
+                        # the added constraint is relaxed again, so it closes a negative cycle
+                        if c == x and n == y:
+                            return False
+                        distances[n] = n_distance
+                        queue.append(n)
+        return True
+
+    def _inc_latest(self, y: int, x: int, b: float):
+        """ Updates the latest times after the constraint `x - y <= b` is added """
+        y_plus_b = self._latest[y] + b
+        if y_plus_b < self._latest[x] - self._epsilon:
+            self._latest[x] = y_plus_b
+            self._propagate_latest(self._latest, deque([x]))
+
+    def _propagate_latest(self, latest: array, queue: Deque[int]):
+        """ Propagates the latest times of the events in `queue` to their successors """
+        bounds = self._bounds
+        successors = self._successors
+        capacity = self._capacity
+        epsilon = self._epsilon
+        while queue:
+            c = queue.popleft()
+            c_latest = latest[c]
+            for n in successors[c]:
+                n_latest = c_latest + bounds[n * capacity + c]
+                if n_latest < latest[n] - epsilon:
+                    latest[n] = n_latest
+                    queue.append(n)
+
+    def insert_interval(
+        self,
+        left_event: Any,
+        right_event: Any,
+        *,
+        left_bound: Optional[float] = None,
+        right_bound: Optional[float] = None,
+    ):
+        """
+        Inserts in this STN the constraints to represent both a lower bound and
+        an upper bound to the arc from left_event to right_event.
+
+        If one of the 2 bounds is not given, it is considered to be +infinity for
+        the upper bound and - infinity for the lower bound.
+
+        :param left_event: The event to the left of the bound.
+        :param right_event: The event to the right of the bound.
+        :param left_bound: Sets the minimum length of the arc from the left_event
+            to the right_event. If None the minimum length is set to -infinity.
+        :param right_bound: Sets the maximum length of the arc from the left_event
+            to the right_event. If None the maximum length is set to +infinity.
+        """
+        if left_bound is not None:
+            self.add(left_event, right_event, -left_bound)
+        if right_bound is not None:
+            self.add(right_event, left_event, right_bound)
+        if left_bound is None and right_bound is None:
+            self._intern(left_event)
+            self._intern(right_event)
+
+    def get_constraints(self) -> Dict[Any, List[Tuple[float, Any]]]:
+        """
+        Returns the mapping from a node to the list of it's constraints.
+        A constraint from node K (the one as key) and V (the one in the
+        constraints List) with bound B represents an arc from V to K with
+        maximum length B.
+        """
+        events = self._events
+        capacity = self._capacity
+        return {events[x]: [(self._bounds[x * capacity + y], events[y]) for y in ys]
+                for x, ys in enumerate(self._neighbors)}
+
+    def remove_endPlan_constraint(self, x: Any, end_plan):
+        xi = self._ids[x]
+        ei = self._ids.get(end_plan, None)
+        if ei is None:
+            return
+        k = xi * self._capacity + ei
+        b = self._bounds[k]
+        if b == INF:
+            return
+        self._bounds[k] = INF
+        self._neighbors[xi] = tuple(y for y in self._neighbors[xi] if y != ei)
+        self._successors[ei] = tuple(n for n in self._successors[ei] if n != xi)
+
+        # If the removed constraint bounded the latest time of x, the latest times are recomputed when queried
+        if self._origin is not None and xi != 0 and self._latest[ei] != INF and \
+                self._latest[ei] + b <= self._latest[xi] + self._epsilon:
+            self._latest_valid = False
@@ -18,7 +18,6 @@ from collections import deque
 from dataclasses import dataclass
 from numbers import Real
 from typing import Deque, Dict, List, Optional, Any, Generic, Set, Tuple, TypeVar, cast
-import networkx as nx
 
 import unified_planning
 
@@ -26,6 +25,103 @@ import unified_planning
 
 T = TypeVar("T", bound=Real)
 
+_MISSING = object()
+
+
+class DeltaDict:
+    """
+    A copy-on-write mapping used by the `DeltaSimpleTemporalNetwork`.
+
+    A `DeltaDict` holds only the entries written to it (its delta) over a
+    parent layer that is frozen and shared with its copies, so a copy costs
+    O(1) instead of copying all the entries.
+    When the chain of layers gets deeper than `max_depth` the layers are
+    merged into one, so a lookup visits `max_depth` layers at most.
+    """
+
+    __slots__ = ("_local", "_parent", "_depth")
+
+    max_depth = 2
+
+    def __init__(self, local: Optional[Dict] = None, parent: Optional["DeltaDict"] = None):
+        self._local: Dict = local if local is not None else {}
+        self._parent = parent
+        self._depth: int = 0 if parent is None else parent._depth + 1
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        layer: Optional[DeltaDict] = self
+        while layer is not None:
+            value = layer._local.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            layer = layer._parent
+        return default
+
+    def __getitem__(self, key: Any) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Any, value: Any):
+        self._local[key] = value
+
+    def __contains__(self, key: Any) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            self._local[key] = default
+            return default
+        return value
+
+    def merged(self) -> Dict:
+        """ Returns the entries of all the layers as one dict, in the order of their first insertion """
+        if self._parent is None:
+            return self._local
+        layers = []
+        layer: Optional[DeltaDict] = self
+        while layer is not None:
+            layers.append(layer._local)
+            layer = layer._parent
+        merged: Dict = {}
+        for local in reversed(layers):
+            merged.update(local)
+        return merged
+
+    def __iter__(self):
+        return iter(self.merged())
+
+    def __len__(self) -> int:
+        return len(self.merged())
+
+    def keys(self):
+        return self.merged().keys()
+
+    def items(self):
+        return self.merged().items()
+
+    def values(self):
+        return self.merged().values()
+
+    def copy(self) -> "DeltaDict":
+        """
+        Returns a copy that shares the entries of self.
+        The delta of self is frozen as the parent of both self and the copy.
+        """
+        if self._depth >= self.max_depth:
+            self._local = dict(self.merged())
+            self._parent = None
+            self._depth = 0
+        if self._local:
+            frozen = DeltaDict(self._local, self._parent)
+            self._local = {}
+            self._parent = frozen
+            self._depth = frozen._depth + 1
+        copy = DeltaDict(None, self._parent)
+        return copy
+
 
 @dataclass
 class DeltaNeighbors(Generic[T]):
@@ -57,6 +153,10 @@ class DeltaSimpleTemporalNetwork(Generic[T]):
     with small differences one-another are created and used to check for
     consistency, in order to determine if it exists a scheduling of all the
     given `Events` or not.
+
+    When an `origin` event is given, the latest time of every event relative to
+    the origin (the shortest path from the origin) is also maintained
+    incrementally, in the opposite direction of the distances.
     """
 
     def __init__(
@@ -65,14 +165,32 @@ class DeltaSimpleTemporalNetwork(Generic[T]):
         distances: Optional[Dict[Any, T]] = None,
         is_sat: bool = True,
         epsilon: T = cast(T, 0),
+        origin: Any = None,
+        successors: Optional[Dict[Any, Optional[DeltaNeighbors[T]]]] = None,
+        latest: Optional[Dict[Any, T]] = None,
+        latest_valid: bool = True,
     ):
-        self._constraints: Dict[Any, Optional[DeltaNeighbors[T]]] = (
-            constraints if constraints is not None else {}
-        )
-        self._distances: Dict[Any, T] = distances if distances is not None else {}
+        if not isinstance(constraints, DeltaDict):
+            constraints = DeltaDict(constraints)
+        if not isinstance(distances, DeltaDict):
+            distances = DeltaDict(distances)
+        self._constraints: DeltaDict = constraints
+        self._distances: DeltaDict = distances
         self._is_sat = is_sat
         self._epsilon: T = epsilon
 
+        # The constraints by their smaller event and the latest times, kept only with an origin
+        self._origin = origin
+        if latest is None and origin is not None:
+            latest = {origin: cast(T, 0)}
+        if not isinstance(successors, DeltaDict):
+            successors = DeltaDict(successors)
+        if not isinstance(latest, DeltaDict):
+            latest = DeltaDict(latest)
+        self._successors: DeltaDict = successors
+        self._latest: DeltaDict = latest
+        self._latest_valid = latest_valid
+
     def __repr__(self) -> str:
         res = []
         for k, v in self._constraints.items():
@@ -84,6 +202,16 @@ class DeltaSimpleTemporalNetwork(Generic[T]):
     def __contains__(self, value: Any) -> bool:
         return value in self._distances
 
+    @property
+    def epsilon(self) -> T:
+        """ The tolerance of the negative cycle detection """
+        return self._epsilon
+
+    @property
+    def origin(self) -> Any:
+        """ The event the latest times are relative to, None if they are not maintained """
+        return self._origin
+
     @property
     def distances(self) -> Dict[Any, T]:
         """
@@ -97,12 +225,18 @@ class DeltaSimpleTemporalNetwork(Generic[T]):
         """
         Returns another `DeltaSimpleTemporalNetwork` with all the constraints
         already present in self.
+        The copy shares the constraints and the distances of self and stores
+        only its own changes, see `DeltaDict`.
         """
         return DeltaSimpleTemporalNetwork(
             self._constraints.copy(),
             self._distances.copy(),
             self._is_sat,
             self._epsilon,
+            self._origin,
+            self._successors.copy(),
+            self._latest.copy(),
+            self._latest_valid,
         )
 
     def add(self, x: Any, y: Any, b: T):
@@ -126,6 +260,10 @@ class DeltaSimpleTemporalNetwork(Generic[T]):
                 neighbor = DeltaNeighbors(y, b, x_constraints)
                 self._constraints[x] = neighbor
                 self._is_sat = self._inc_check(x, y, b)
+                if self._origin is not None:
+                    self._successors[y] = DeltaNeighbors(x, b, self._successors.get(y, None))
+                    if self._is_sat and self._latest_valid:
+                        self._inc_latest(y, x, b)
 
     def check_stn(self) -> bool:
         """Checks the consistency of this STN."""
@@ -141,6 +279,39 @@ class DeltaSimpleTemporalNetwork(Generic[T]):
         """
         return cast(T, -1 * self._distances[x])
 
+    def get_latest_time(self, x: Any) -> Optional[T]:
+        """
+        Returns the latest time that can be assigned to the given event in a
+        consistent solution, relative to the origin of this STN.
+        The STN must be consistent and created with an origin.
+
+        :param x: The event of which the latest time must be returned.
+        :return: The maximal possible time assignment for the given event, None
+            if the event is not bounded by the origin.
+        """
+        assert self._origin is not None, "The latest times are kept only by an STN with an origin"
+        if not self._latest_valid and self._is_sat:
+            latest = {self._origin: cast(T, 0)}
+            self._propagate_latest(latest, deque([self._origin]))
+            self._latest = DeltaDict(latest)
+            self._latest_valid = True
+        return self._latest.get(x, None)
+
+    def get_distances_from(self, x: Any) -> Dict[Any, T]:
+        """
+        Returns the latest time of every event relative to the given event, the
+        length of the shortest path from it, for the events it bounds.
+        The STN must be consistent and created with an origin.
+
+        :param x: The event the returned times are relative to.
+        :return: The mapping from an event to its latest time after `x`.
+        """
+        assert self._origin is not None, "The successors are kept only by an STN with an origin"
+        assert self._is_sat, "The distances are defined only for a consistent STN"
+        distances = {x: cast(T, 0)}
+        self._propagate_latest(distances, deque([x]))
+        return distances
+
     def _is_subsumed(self, x: Any, y: Any, b: T) -> bool:
         """
         Check if there is a harder constraint from x to y
@@ -153,24 +324,56 @@ class DeltaSimpleTemporalNetwork(Generic[T]):
         return False
 
     def _inc_check(self, x: Any, y: Any, b: T) -> bool:
-        x_dist = self._distances[x]
+        distances = self._distances
+        epsilon = self._epsilon
+        x_dist = distances[x]
         x_plus_b = x_dist + b
-        if x_plus_b < self._distances[y]:
-            self._distances[y] = x_plus_b
+        # with float bounds only an improvement larger than epsilon is propagated
+        if x_plus_b < distances[y] - epsilon:
+            distances[y] = x_plus_b
             queue: Deque[Any] = deque()
             queue.append(y)
             while queue:
                 c = queue.popleft()
                 n = self._constraints[c]
                 while n is not None:
-                    if self._distances[c] + n.bound < self._distances[n.dst]:
-                        if n.dst == y and abs(n.bound - b) <= self._epsilon:
+                    if distances[c] + n.bound < distances[n.dst] - epsilon:
+                        if n.dst == y and abs(n.bound - b) <= epsilon:
                             return False
-                        self._distances[n.dst] = self._distances[c] + n.bound
+                        distances[n.dst] = distances[c] + n.bound
                         queue.append(n.dst)
                     n = n.next
         return True
 
+    def _inc_latest(self, y: Any, x: Any, b: T):
+        """ Updates the latest times after the constraint `x - y <= b` is added """
+        latest = self._latest
+        y_latest = latest.get(y, None)
+        if y_latest is None:
+            return
+        x_latest = latest.get(x, None)
+        y_plus_b = y_latest + b
+        if x_latest is None or y_plus_b < x_latest - self._epsilon:
+            latest[x] = y_plus_b
+            queue: Deque[Any] = deque()
+            queue.append(x)
+            self._propagate_latest(latest, queue)
+
+    def _propagate_latest(self, latest: Dict[Any, T], queue: Deque[Any]):
+        """ Propagates the latest times of the events in `queue` to their successors """
+        epsilon = self._epsilon
+        successors = self._successors
+        while queue:
+            c = queue.popleft()
+            c_latest = latest[c]
+            n = successors.get(c, None)
+            while n is not None:
+                dst_latest = latest.get(n.dst, None)
+                if dst_latest is None or c_latest + n.bound < dst_latest - epsilon:
+                    latest[n.dst] = c_latest + n.bound
+                    queue.append(n.dst)
+                n = n.next
+
     def insert_interval(
         self,
         left_event: Any,
@@ -230,12 +433,31 @@ class DeltaSimpleTemporalNetwork(Generic[T]):
     def remove_endPlan_constraint(self, x: Any, end_plan):
         neighbor = self._constraints[x]
         new_constraints: DeltaNeighbors = None
+        removed_bounds = []
         while neighbor is not None:
             if neighbor.dst != end_plan:
                 new_constraints = DeltaNeighbors(neighbor.dst, neighbor.bound, new_constraints)
+            else:
+                removed_bounds.append(neighbor.bound)
             neighbor = neighbor.next
         self._constraints[x] = new_constraints
 
+        if self._origin is not None and removed_bounds:
+            neighbor = self._successors.get(end_plan, None)
+            new_successors: DeltaNeighbors = None
+            while neighbor is not None:
+                if neighbor.dst != x:
+                    new_successors = DeltaNeighbors(neighbor.dst, neighbor.bound, new_successors)
+                neighbor = neighbor.next
+            self._successors[end_plan] = new_successors
+
+            # If a removed constraint bounded the latest time of x, the latest times are recomputed when queried
+            end_latest = self._latest.get(end_plan, None)
+            x_latest = self._latest.get(x, None)
+            if end_latest is not None and x_latest is not None and x != self._origin and \
+                    any(end_latest + b <= x_latest + self._epsilon for b in removed_bounds):
+                self._latest_valid = False
+
     def calculate_shortest_path1(self, start_node):
         vertices = self._constraints.keys()
         g = unified_planning.plans.stn.Graph(vertices)
@@ -245,71 +467,3 @@ class DeltaSimpleTemporalNetwork(Generic[T]):
                 neighbor = neighbor.next
 
         return g.BellmanFord(start_node)
-
-
-
-    def calculate_shortest_path(self, start_node, target_node):
-        """
-        Calculate the shortest path between start_node and target_node using bellman Ford algorithm
-
-        :param start_node: starts the path from start_node
-        :param target_node: ends the path at target_node
-
-        :return: shortest path between start_node and target_node
-
-
-        Multiple occurrences of the same action can appear
-        (the node represent each action execution points to different memory point) in the STN.
-
-        To ensure that nodes with same logical meaning but different objects in the memory are treated as different vertex
-        unique identifiers are used for each node using the id() except Start_Plan and End_Plan nodes.
-
-        """
-        G = nx.DiGraph()
-
-        # Maintain a mapping between node identifiers and actual node objects
-        node_map = {}
-
-        # Add edges to the graph
-        for x, neighbor in self._constraints.items():
-            while neighbor is not None:
-
-                # use the node when it is end or start plan node
-                if x.kind.name == 'GLOBAL_END' or x.kind.name == 'GLOBAL_START':
-                    dest_id = x
-                else:
-                    # Generate unique identifiers for the nodes
-                    dest_id = id(x)
-                    # Add the nodes to the graph if not already added
-                    if dest_id not in node_map:
-                        node_map[dest_id] = x
-                        G.add_node(dest_id)
-
-                # use the node when it is end or start plan node
-                if neighbor.dst.kind.name == 'GLOBAL_END' or neighbor.dst.kind.name == 'GLOBAL_START':
-                    src_id = neighbor.dst
-                else:
-                    # Generate unique identifiers for the nodes
-                    src_id = id(neighbor.dst)
-                    # Add the nodes to the graph if not already added
-                    if src_id not in node_map:
-                        node_map[src_id] = neighbor.dst
-                        G.add_node(src_id)
-
-
-                # Add the edge to the graph
-                G.add_edge(src_id, dest_id, weight=neighbor.bound)
-                neighbor = neighbor.next
-
-        # Use the identifiers for start and target nodes
-        if start_node.kind.name == 'GLOBAL_END' or start_node.kind.name == 'GLOBAL_START':
-            start_id = start_node
-        else:
-            start_id = id(start_node)
-
-        if target_node.kind.name == 'GLOBAL_END' or target_node.kind.name == 'GLOBAL_START':
-            target_id = target_node
-        else:
-            target_id = id(target_node)
-
-        return nx.bellman_ford_path_length(G, source=start_id, target=target_id, weight='weight')
@@ -20,7 +20,7 @@ import unified_planning
 import unified_planning as up
 from unified_planning.environment import Environment
 from unified_planning.exceptions import UPUsageError
-from unified_planning.plans.stn import DeltaSimpleTemporalNetwork
+from unified_planning.plans.stn import DeltaSimpleTemporalNetwork, ArraySimpleTemporalNetwork
 from unified_planning.model import TimepointKind
 from unified_planning.plans.plan import ActionInstance
 from fractions import Fraction
@@ -28,6 +28,7 @@ from dataclasses import dataclass
 from typing import (
     Callable,
     Dict,
+    Iterable,
     Iterator,
     List,
     Optional,
@@ -117,6 +118,40 @@ def flatten_dict_structure(
             yield (k, *tup)
 
 
+def _auto_bound(value: Real) -> Union[int, Fraction]:
+    """ Returns `value` as an int if it is integral, as a Fraction otherwise """
+    if isinstance(value, int):
+        return value
+    value = float(value)
+    if value.is_integer():
+        return int(value)
+    return Fraction(value)
+
+
+# Converts a bound given to the STNPlan to the number type of the STN, by the bound type
+BOUND_TYPES: Dict[str, Callable[[Real], Real]] = {
+    "auto": _auto_bound,
+    "fraction": lambda value: Fraction(float(value)),
+    "float": float,
+}
+
+# The tolerance of the consistency check with float bounds
+FLOAT_EPSILON = 1e-9
+
+# The implementations of the STN of an STNPlan, by the STN type
+STN_TYPES = {
+    "delta": DeltaSimpleTemporalNetwork,
+    "array": ArraySimpleTemporalNetwork,
+}
+
+
+def _time(value: Real) -> int:
+    """ Returns a time of the STN as an int, the numerator of an int or a Fraction """
+    if isinstance(value, float):
+        return int(round(value))
+    return value.numerator
+
+
 class STNPlan(unified_planning.plans.plan.Plan):
     """
     Represents a `STNPlan`. A Simple Temporal Network plan is a generalization of
@@ -136,6 +171,8 @@ class STNPlan(unified_planning.plans.plan.Plan):
         ],
         environment: Optional["Environment"] = None,
         _stn: Optional[DeltaSimpleTemporalNetwork[Fraction]] = None,
+        bound_type: str = "auto",
+        stn_type: str = "delta",
     ):
         """
         Constructs the `STNPlan` with 2 different possible representations:
@@ -156,18 +193,29 @@ class STNPlan(unified_planning.plans.plan.Plan):
             constraints are created; this parameters is ignored if there is
             another environment in the action instances given in the constraints.
         :param _stn: Internal parameter, not to be used!
+        :param bound_type: The number type of the bounds in the STN; "auto" uses
+            ints for integral bounds and Fractions otherwise, "fraction" uses
+            Fractions only and "float" uses floats with a tolerance.
+        :param stn_type: The implementation of the STN; "delta" shares the
+            constraints between copies and keeps the bounds of `bound_type`,
+            "array" interns the nodes as ints and keeps float bounds in arrays.
         :return: The created `STNPlan`.
         """
         assert (
             _stn is None or not constraints
         ), "_stn and constraints can't be both given"
+        assert bound_type in BOUND_TYPES, f"Unknown bound type {bound_type}"
+        assert stn_type in STN_TYPES, f"Unknown STN type {stn_type}"
+        self._bound_type = bound_type
+        self._bound = BOUND_TYPES[bound_type]
         # if we have a specific env or we don't have any actions
         env = environment
         if (env is not None or not constraints) and _stn is None:
             unified_planning.plans.plan.Plan.__init__(self, unified_planning.plans.plan.PlanKind.STN_PLAN, env)
         # If we don't have a specific env, use the env of the first action
         elif _stn is not None:
-            for r_node, cl in _stn.get_constraints().items():
+            # The environment of a cloned STNPlan is given, so the constraints are not visited
+            for r_node, cl in ([] if env is not None else _stn.get_constraints().items()):
                 assert isinstance(r_node, STNPlanNode), "Given _stn is wrong"
                 if r_node.environment is not None:
                     env = r_node.environment
@@ -206,10 +254,11 @@ class STNPlan(unified_planning.plans.plan.Plan):
             unified_planning.plans.plan.Plan.__init__(self, unified_planning.plans.plan.PlanKind.STN_PLAN, env)
 
         # Create and populate the DeltaSTN
-        self._stn = DeltaSimpleTemporalNetwork()
         start_plan = STNPlanNode(TimepointKind.GLOBAL_START)
+        epsilon = FLOAT_EPSILON if bound_type == "float" or stn_type == "array" else 0
+        self._stn = STN_TYPES[stn_type](epsilon=epsilon, origin=start_plan)
         end_plan = STNPlanNode(TimepointKind.GLOBAL_END)
-        self._stn.insert_interval(start_plan, end_plan, left_bound=Fraction(0))
+        self._stn.insert_interval(start_plan, end_plan, left_bound=self._bound(0))
         if isinstance(constraints, List):
             gen: Iterator[
                 Tuple[STNPlanNode, Optional[Real], Optional[Real], STNPlanNode]
@@ -217,7 +266,7 @@ class STNPlan(unified_planning.plans.plan.Plan):
         else:
             assert isinstance(constraints, Dict), "Typing not respected"
             gen = flatten_dict_structure(constraints)
-        f0 = Fraction(0)
+        f0 = self._bound(0)
         for a_node, lower_bound, upper_bound, b_node in gen:
             if (
                 a_node.environment is not None
@@ -233,8 +282,8 @@ class STNPlan(unified_planning.plans.plan.Plan):
             self._stn.insert_interval(a_node, end_plan, left_bound=f0)
             self._stn.insert_interval(start_plan, b_node, left_bound=f0)
             self._stn.insert_interval(b_node, end_plan, left_bound=f0)
-            lb = None if lower_bound is None else Fraction(float(lower_bound))
-            ub = None if upper_bound is None else Fraction(float(upper_bound))
+            lb = None if lower_bound is None else self._bound(lower_bound)
+            ub = None if upper_bound is None else self._bound(upper_bound)
             self._stn.insert_interval(a_node, b_node, left_bound=lb, right_bound=ub)
 
         self._potential_end_actions = {}
@@ -277,7 +326,8 @@ class STNPlan(unified_planning.plans.plan.Plan):
             return False
 
     def clone(self):
-        new_stnPlan = STNPlan([], _stn=self._stn.copy_stn())
+        new_stnPlan = STNPlan([], environment=self._environment, _stn=self._stn.copy_stn(),
+                              bound_type=self._bound_type)
         new_stnPlan._potential_end_actions = self._potential_end_actions.copy()
         return new_stnPlan
 
@@ -406,14 +456,14 @@ class STNPlan(unified_planning.plans.plan.Plan):
                 if r_node in nodes_to_remove:
                     left_nodes.setdefault(r_node, set()).add((l_node, sum_dist))
 
-        new_stn: DeltaSimpleTemporalNetwork = DeltaSimpleTemporalNetwork()
+        new_stn = type(self._stn)(epsilon=self._stn.epsilon, origin=self._stn.origin)
         for r_node, constraints in new_constraints.items():
             if not r_node in nodes_to_remove:
                 for bound, l_node in constraints:
                     if not l_node in nodes_to_remove:
                         new_stn.add(r_node, l_node, bound)
 
-        return STNPlan(constraints={}, environment=self._environment, _stn=new_stn)
+        return STNPlan(constraints={}, environment=self._environment, _stn=new_stn, bound_type=self._bound_type)
 
     def convert_to(
         self,
@@ -448,40 +498,34 @@ class STNPlan(unified_planning.plans.plan.Plan):
         """
         Returns the end time according to the STN when the actions are performed in the erliest time possible
         """
-        return self._stn.get_stn_model(up.plans.stn.STNPlanNode(up.model.timing.TimepointKind.GLOBAL_END)).numerator
+        return _time(self._stn.get_stn_model(up.plans.stn.STNPlanNode(up.model.timing.TimepointKind.GLOBAL_END)))
 
     def get_current_time(self, node: "up.plans.stn.STNPlanNode"):
         """
             Returns the earliest tine node can be executed according to the STN constraints
         """
-        return self._stn.get_stn_model(node).numerator
+        return _time(self._stn.get_stn_model(node))
 
     def get_legal_interval(self, node: "up.plans.stn.STNPlanNode"):
         """
         Legal interval for this node in the current plan.
         """
-        lower = self._stn.get_stn_model(node).numerator
-        start_plan = STNPlanNode(TimepointKind.GLOBAL_START)
-        # apsp = self._stn.calculate_shortest_path1(start_plan)
-        # upper = apsp[node].numerator
-        sp = self._stn.calculate_shortest_path(start_plan, node)
-        upper = sp.numerator
+        lower = _time(self._stn.get_stn_model(node))
+        upper = _time(self._stn.get_latest_time(node))
         return lower, upper
 
     def get_lower_bound_potential_end_action(self):
         lower_bounds = {}
         for action_node in self._potential_end_actions:
             action = action_node.action_instance.action
-            lower_bounds[action] = self._stn.get_stn_model(action_node).numerator
+            lower_bounds[action] = _time(self._stn.get_stn_model(action_node))
         return lower_bounds
 
     def get_upper_bound_node(self, node: "up.plans.stn.STNPlanNode"):
         """
         Returns the latest tine node can be executed according to the STN constraints
         """
-        start_plan = STNPlanNode(TimepointKind.GLOBAL_START)
-        upper = self._stn.calculate_shortest_path(start_plan, node)
-        return upper
+        return self._stn.get_latest_time(node)
 
 
     def add_constrains_to_previous_chosen_action(self, constraints: Union[
@@ -495,7 +539,7 @@ class STNPlan(unified_planning.plans.plan.Plan):
         else:
             assert isinstance(constraints, Dict), "Typing not respected"
             gen = flatten_dict_structure(constraints)
-        f0 = Fraction(0)
+        f0 = self._bound(0)
         for a_node, lower_bound, upper_bound, b_node in gen:
             if (
                 a_node.environment is not None
@@ -517,8 +561,8 @@ class STNPlan(unified_planning.plans.plan.Plan):
 
             self._stn.remove_endPlan_constraint(a_node, end_plan) # TODO: remove?
             self._stn.insert_interval(b_node, end_plan, left_bound=f0)
-            lb = None if lower_bound is None else Fraction(float(lower_bound))
-            ub = None if upper_bound is None else Fraction(float(upper_bound))
+            lb = None if lower_bound is None else self._bound(lower_bound)
+            ub = None if upper_bound is None else self._bound(upper_bound)
             self._stn.insert_interval(a_node, b_node, left_bound=lb, right_bound=ub)
 
             for potential in self._potential_end_actions.keys():
@@ -529,7 +573,7 @@ class STNPlan(unified_planning.plans.plan.Plan):
         """ Adds the end action as a chosen action
          - The end action must be before the end plan
          - and before all potential end action not yet chosen"""
-        f0 = Fraction(0)
+        f0 = self._bound(0)
         for a_node, b_node in constraints:
             if (
                 a_node.environment is not None
@@ -558,7 +602,7 @@ class STNPlan(unified_planning.plans.plan.Plan):
                 "End action can not be inserted in this action to the STNPlan!"
             )
 
-        f0 = Fraction(0)
+        f0 = self._bound(0)
         if (action.environment is not None
                     and action.environment != self._environment ):
                 raise UPUsageError(
@@ -577,7 +621,7 @@ class STNPlan(unified_planning.plans.plan.Plan):
         frac, whole = math.modf(fix_time)
         fix_time = whole if frac < 0.002 else fix_time
 
-        f_fix_time = Fraction(fix_time)
+        f_fix_time = self._bound(fix_time)
         if (action.environment is not None
                     and action.environment != self._environment ):
                 raise UPUsageError(
@@ -587,6 +631,125 @@ class STNPlan(unified_planning.plans.plan.Plan):
         self._stn.insert_interval(start_plan, action, left_bound=f_fix_time)
         self._stn.insert_interval(start_plan, action, right_bound=f_fix_time)
 
+    def compact(self, keep: Iterable[STNPlanNode] = ()):
+        """
+        Removes from the STN the action nodes whose time is fixed, their constraints with the other nodes become
+        constraints with the start of the plan at their fixed offset, and keeps only the hardest constraint of
+        every pair of nodes.
+        The earliest and the latest times of the remaining nodes do not change.
+
+        :param keep: the fixed nodes that are still referenced and are not removed
+        """
+        assert self._stn.origin is not None, "The STN must have an origin to be compacted"
+        if not self._stn.check_stn():
+            return
+        start_plan = self._stn.origin
+        epsilon = self._stn.epsilon
+        start_time = self._stn.get_stn_model(start_plan)
+        keep = set(keep)
+
+        # The offset from the start of the plan of every node removed from the STN
+        offsets = {}
+        for node in self._stn.distances:
+            if node.action_instance is None or node in keep or node in self._potential_end_actions:
+                continue
+            earliest = self._stn.get_stn_model(node) - start_time
+            latest = self._stn.get_latest_time(node)
+            if latest is not None and abs(latest - earliest) <= epsilon:
+                offsets[node] = earliest
+
+        if not offsets:
+            return
+
+        # x - y <= b, the hardest bound of every pair of nodes
+        bounds: Dict[Tuple[STNPlanNode, STNPlanNode], Real] = {}
+        for x, constraints in self._stn.get_constraints().items():
+            x_offset = offsets.get(x, None)
+            for b, y in constraints:
+                y_offset = offsets.get(y, None)
+                if x_offset is not None and y_offset is not None:
+                    continue
+                if x_offset is not None:
+                    key, b = (start_plan, y), b - x_offset
+                elif y_offset is not None:
+                    key, b = (x, start_plan), b + y_offset
+                else:
+                    key = (x, y)
+                if key not in bounds or b < bounds[key]:
+                    bounds[key] = b
+
+        new_stn = type(self._stn)(epsilon=epsilon, origin=start_plan)
+        for node in self._stn.distances:
+            if node not in offsets:
+                new_stn.insert_interval(start_plan, node)
+        for (x, y), b in bounds.items():
+            new_stn.add(x, y, b)
+        self._stn = new_stn
+
+    def consistent_actions(self, actions: List["up.engines.Action"],
+                           previous_node: Optional[STNPlanNode] = None) -> List["up.engines.Action"]:
+        """
+        Returns the actions of `actions` whose constraints, as added by `update_stn` after `previous_node`,
+        keep the STN consistent, without adding them.
+
+        The constraints of an action are all incident to one node: the new node of a start action
+        (or of an instantaneous action), or the pending node of an end action. So an inconsistent action
+        closes a negative cycle through that node, which is found with the shortest paths of this STN from
+        `previous_node` and from the node of the end action.
+
+        :param actions: the candidate actions
+        :param previous_node: the node of the action chosen before the candidates, None for the first action
+        :return: the consistent actions, in the order of `actions`
+        """
+        if not self._stn.check_stn():
+            return []
+        start_plan = self._stn.origin
+        end_plan = STNPlanNode(TimepointKind.GLOBAL_END)
+        epsilon = self._stn.epsilon
+        source = start_plan if previous_node is None else previous_node
+        from_source = self._stn.get_distances_from(source)
+
+        def before(distances, node):
+            """ Returns True if `node` is always earlier than the source of `distances` """
+            distance = distances.get(node, None)
+            return distance is not None and distance < -epsilon
+
+        # The node of the action is after the source and before the end of the plan,
+        # and before the potential end actions if it follows a chosen action
+        upper_nodes = [end_plan]
+        if previous_node is not None:
+            upper_nodes.extend(self._potential_end_actions)
+        new_node_consistent = not any(before(from_source, node) for node in upper_nodes)
+
+        end_nodes = {}
+        for node in self._potential_end_actions:
+            end_nodes.setdefault(node.action_instance.action, node)
+
+        consistent = []
+        for action in actions:
+            if not isinstance(action, up.engines.action.InstantaneousEndAction):
+                if new_node_consistent:
+                    consistent.append(action)
+                continue
+            end_node = end_nodes.get(action, None)
+            if end_node is None or before(from_source, end_node):
+                continue
+            other_nodes = [node for node in upper_nodes if node is not end_node]
+            if any(before(from_source, node) for node in other_nodes):
+                continue
+            from_end = self._stn.get_distances_from(end_node)
+            if not any(before(from_end, node) for node in other_nodes):
+                consistent.append(action)
+        return consistent
+
+    def signature(self, previous_node: Optional[STNPlanNode] = None) -> "STNSignature":
+        """
+        Returns a canonical summary of the STN as seen by the actions added after `previous_node`, see `STNSignature`.
+
+        :param previous_node: the node of the last chosen action, None if no action is chosen
+        """
+        return STNSignature(self, previous_node)
+
     def add_deadline(self, deadline: int):
         """
         add a deadline to the STN: end plan - start plan <= deadline
@@ -595,7 +758,7 @@ class STNPlan(unified_planning.plans.plan.Plan):
         """
         start_plan = STNPlanNode(TimepointKind.GLOBAL_START)
         end_plan = STNPlanNode(TimepointKind.GLOBAL_END)
-        f_deadline = Fraction(deadline)
+        f_deadline = self._bound(deadline)
         self._stn.insert_interval(start_plan, end_plan, right_bound=f_deadline)
 
     def add_potential_end_action(self, constraints: Union[
@@ -621,7 +784,7 @@ class STNPlan(unified_planning.plans.plan.Plan):
         else:
             assert isinstance(constraints, Dict), "Typing not respected"
             gen = flatten_dict_structure(constraints)
-        f0 = Fraction(0)
+        f0 = self._bound(0)
         for a_node, lower_bound, upper_bound, b_node in gen:
             if (
                 a_node.environment is not None
@@ -635,10 +798,55 @@ class STNPlan(unified_planning.plans.plan.Plan):
                 )
             # start_plan = STNPlanNode(TimepointKind.GLOBAL_START)
             # self._stn.insert_interval(start_plan, b_node, left_bound=f0)
-            lb = None if lower_bound is None else Fraction(float(lower_bound))
-            ub = None if upper_bound is None else Fraction(float(upper_bound))
+            lb = None if lower_bound is None else self._bound(lower_bound)
+            ub = None if upper_bound is None else self._bound(upper_bound)
             self._stn.insert_interval(a_node, b_node, left_bound=lb, right_bound=ub)
 
             self._potential_end_actions[b_node] = a_node
 
 
+class STNSignature:
+    """
+    A canonical summary of an `STNPlan` as seen by the actions added after `previous_node`, over the start and the
+    end of the plan, `previous_node` and the potential end actions, which are identified by their action.
+
+    Two signatures are equal if the shortest paths between these nodes are equal. The constraints of the next
+    actions are incident to these nodes only, so two STNs with equal signatures accept the same next actions with
+    the same earliest and latest times.
+    The earliest and the latest times of the nodes, which the STN maintains, are compared first, the shortest
+    paths are computed only if they are equal. The STN must not be changed while the signature is used.
+    """
+    __slots__ = ('_stn', '_nodes', '_times', '_distances')
+
+    def __init__(self, stn_plan: STNPlan, previous_node: Optional[STNPlanNode] = None):
+        self._stn = stn_plan._stn
+        self._nodes = None
+        self._times = ()
+        self._distances = ()
+        if not self._stn.check_stn():
+            return
+        start_plan = self._stn.origin
+        end_plan = STNPlanNode(TimepointKind.GLOBAL_END)
+        potential = sorted(stn_plan._potential_end_actions, key=lambda node: node.action_instance.action.name)
+        self._nodes = [start_plan, end_plan, start_plan if previous_node is None else previous_node] + potential
+        start_time = self._stn.get_stn_model(start_plan)
+        self._times = (tuple(node.action_instance.action.name for node in potential),
+                       tuple((self._stn.get_stn_model(node) - start_time, self._stn.get_latest_time(node))
+                             for node in self._nodes))
+        self._distances = None
+
+    def distances(self) -> Tuple:
+        """ Returns the shortest paths between the nodes of the signature, None where a node does not bound another """
+        if self._distances is None:
+            nodes = self._nodes
+            self._distances = tuple(tuple(distances.get(other, None) for other in nodes)
+                                    for distances in map(self._stn.get_distances_from, nodes))
+        return self._distances
+
+    def __eq__(self, other):
+        if not isinstance(other, STNSignature):
+            return False
+        return self._times == other._times and self.distances() == other.distances()
+
+    def __hash__(self):
+        return hash(self._times)
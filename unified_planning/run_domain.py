@@ -1,7 +1,11 @@
+import gc
 import os
+import random
 import time
+import tracemalloc
 
 import dill
+import numpy as np
 import sys
 
 """For the bash script"""
@@ -37,16 +41,58 @@ def print_stats():
     print(f'Selection Type = {up.args.selection_type}')
     print(f'Exploration Constant = {up.args.exploration_constant}')
     print(f'Search time = {up.args.search_time}')
+    print(f'Search iterations = {up.args.search_iterations}')
+    print(f'Seed = {up.args.seed}')
     print(f'Search depth = {up.args.search_depth}')
     print(f'Deadline = {up.args.deadline}')
     print(f'Domain Type = {up.args.domain_type}')
     print(f'Object Amount = {up.args.object_amount}')
     print(f'Garbage Action Amount = {up.args.garbage_amount}')
     print(f'K Random Actions = {up.args.k}')
+    print(f'Workers = {up.args.workers}')
+    print(f'Parallel = {up.args.parallel}')
+    print(f'Virtual Loss = {up.args.virtual_loss}')
+    print(f'Cache Size = {up.args.cache_size}')
+    print(f'Heuristic Cache Size = {up.args.heuristic_cache_size}')
+    print(f'Heuristic Samples = {up.args.heuristic_samples}')
+    print(f'Heuristic Mode = {up.args.heuristic_mode}')
+    print(f'Lazy Expansion = {up.args.lazy_expansion}')
+    print(f'STN Bounds = {up.args.stn_bounds}')
+    print(f'STN Type = {up.args.stn_type}')
+    print(f'Tree Reuse = {up.args.tree_reuse}')
+    print(f'Transpositions = {up.args.transpositions}')
+    print(f'Interval Resolution = {up.args.interval_resolution}')
+    print(f'Interval Coalesce = {up.args.interval_coalesce}')
+    print(f'Outcome Threshold = {up.args.outcome_threshold}')
+    print(f'Outcome Mass = {up.args.outcome_mass}')
+    print(f'Profile = {up.args.profile}')
+    print(f'Profile JSON = {up.args.profile_json}')
+    print(f'Memory Benchmark = {up.args.memory_benchmark}')
+
+
+def create_search_budget(search_time=None, search_iterations=None):
+    """
+    Creates the search budget of each step, one second if neither the time nor the iterations are given
+    """
+    if search_time is None and search_iterations is None:
+        search_time = 1
+    return SearchBudget(iterations=search_iterations, timeout=search_time)
+
+
+def print_cache_info(mdp, mdp_name='mdp'):
+    """
+    Prints the hits and the misses of the mdp caches, the caches of forked root parallel workers are not counted
+    """
+    for name, info in mdp.cache_info().items():
+        print(f"Cache {mdp_name} {name}: hits= {info['hits']}, misses= {info['misses']}, hit rate= {info['hit_rate']:.3f}, "
+              f"entries= {info['entries']}")
 
 
 def run_regular(domain, runs, domain_type, deadline, search_time, search_depth, exploration_constant, object_amount, garbage_amount,
-                selection_type='avg', k=10):
+                selection_type='avg', k=10, workers=1, parallel='root', virtual_loss=1, search_iterations=None,
+                cache_size=0, heuristic_cache_size=0, heuristic_samples=1, heuristic_mode='sample', lazy_expansion=False,
+                stn_bounds='auto', stn_type='delta', tree_reuse=False, transpositions=False, interval_resolution=None,
+                interval_coalesce=False, profile=False, profile_json=None, memory_benchmark_only=False):
     """
     Run split action to start and end actions logic - TP-MCTS approach
     """
@@ -78,10 +124,68 @@ def run_regular(domain, runs, domain_type, deadline, search_time, search_depth,
     print(f"Action amount= {len(ground_problem.actions)}, Proposition amount= {len(ground_problem.explicit_initial_values)}")
 
 
-    mdp = MDP(converted_problem, discount_factor=0.95)
+    mdp = MDP(converted_problem, discount_factor=0.95, cache_size=cache_size, heuristic_cache_size=heuristic_cache_size,
+              heuristic_samples=heuristic_samples, heuristic_mode=heuristic_mode)
+
+    search_budget = create_search_budget(search_time, search_iterations)
+    if memory_benchmark_only:
+        memory_benchmark(mdp, search_budget, search_depth, exploration_constant, selection_type, k, lazy_expansion,
+                         stn_bounds, stn_type, interval_resolution, interval_coalesce)
+        return
 
-    params = (mdp, 90, search_time, search_depth, exploration_constant, selection_type, k)
-    up.engines.solvers.evaluate.evaluation_loop(runs, up.engines.solvers.mcts.plan, params)
+    params = (mdp, 90, search_budget, search_depth, exploration_constant, selection_type, k, workers, parallel,
+              virtual_loss, lazy_expansion, stn_bounds, stn_type, tree_reuse, transpositions, interval_resolution,
+              interval_coalesce)
+    if profile or profile_json is not None:
+        up.engines.profiler.enable()
+    up.engines.solvers.evaluate.evaluation_loop(runs, up.engines.solvers.mcts.plan, params, profile_json)
+    print_cache_info(mdp)
+
+
+def count_tree_nodes(root_node):
+    """
+    Returns the amount of state nodes, of action nodes and of interval fragments in the search tree of `root_node`
+    """
+    snodes, anodes, fragments = 0, 0, 0
+    stack = [root_node]
+    while stack:
+        snode = stack.pop()
+        snodes += 1
+        if snode.isInterval:
+            fragments += len(snode.statistics()[1])
+        for anode in snode.children.values():
+            anodes += 1
+            if anode.isInterval:
+                fragments += len(anode.statistics()[1])
+            stack.extend(anode.children.values())
+    return snodes, anodes, fragments
+
+
+def memory_benchmark(mdp, search_budget, search_depth, exploration_constant, selection_type='avg', k=10,
+                     lazy_expansion=False, stn_bounds='auto', stn_type='delta', interval_resolution=None,
+                     interval_coalesce=False):
+    """
+    Runs one TP-MCTS search from the initial state and prints the memory held by the search tree per node.
+    The tree memory is the memory released when the tree is dropped, so the caches of the mdp are not counted.
+    """
+    stn = create_init_stn(mdp, stn_bounds, stn_type)
+    tracemalloc.start()
+    mcts = up.engines.solvers.mcts.C_MCTS(mdp, None, mdp.initial_state(), search_depth, exploration_constant, stn,
+                                          selection_type, k, lazy_expansion=lazy_expansion,
+                                          interval_resolution=interval_resolution, interval_coalesce=interval_coalesce)
+    mcts.anytime_search(search_budget, selection_type)
+    snodes, anodes, fragments = count_tree_nodes(mcts.root_node)
+    gc.collect()
+    with_tree = tracemalloc.get_traced_memory()[0]
+    del mcts
+    gc.collect()
+    tree_memory = with_tree - tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"State nodes= {snodes}, Action nodes= {anodes}")
+    if selection_type == 'rootInterval':
+        print(f"Interval fragments= {fragments}")
+    print(f"Tree memory= {tree_memory / 2 ** 20:.2f} MiB, Memory per state node= {tree_memory / snodes / 2 ** 10:.2f} KiB")
 
 
 def create_combination_domain(domain, deadline, object_amount, garbage_amount):
@@ -106,7 +210,9 @@ def create_combination_domain(domain, deadline, object_amount, garbage_amount):
 
 
 def run_combination(domain, runs, solver, deadline, search_time, search_depth, exploration_constant, object_amount, garbage_amount,
-                    selection_type='avg', k=10):
+                    selection_type='avg', k=10, workers=1, parallel='root', virtual_loss=1, search_iterations=None,
+                    cache_size=0, heuristic_cache_size=0, heuristic_samples=1, heuristic_mode='sample', tree_reuse=False,
+                    transpositions=False, outcome_threshold=0, outcome_mass=1, profile=False, profile_json=None):
     """
     Run the combination logic - Mausem and Weld approach
     """
@@ -141,27 +247,53 @@ def run_combination(domain, runs, solver, deadline, search_time, search_depth, e
         converted_problem = convert_combination_problem._converted_problem
         split_problem = convert_combination_problem._split_problem
 
-    mdp = combinationMDP(converted_problem, discount_factor=0.95)
-    split_mdp = MDP(split_problem, discount_factor=0.95)
+    mdp = combinationMDP(converted_problem, discount_factor=0.95, cache_size=cache_size)
+    split_mdp = MDP(split_problem, discount_factor=0.95, cache_size=cache_size, heuristic_cache_size=heuristic_cache_size,
+                    heuristic_samples=heuristic_samples, heuristic_mode=heuristic_mode)
 
+    search_budget = create_search_budget(search_time, search_iterations)
+    if profile or profile_json is not None:
+        up.engines.profiler.enable()
     if solver == 'rtdp':
-        params = (mdp, split_mdp, 90, search_time, search_depth)
-        up.engines.solvers.evaluate.evaluation_loop(runs, up.engines.solvers.rtdp.plan, params)
+        params = (mdp, split_mdp, 90, search_budget, search_depth, outcome_threshold, outcome_mass)
+        up.engines.solvers.evaluate.evaluation_loop(runs, up.engines.solvers.rtdp.plan, params, profile_json)
 
     else:
-        params = (mdp, split_mdp, 90, search_time, search_depth, exploration_constant, selection_type, k)
-        up.engines.solvers.evaluate.evaluation_loop(runs, up.engines.solvers.mcts.combination_plan, params)
+        params = (mdp, split_mdp, 90, search_budget, search_depth, exploration_constant, selection_type, k, workers,
+                  parallel, virtual_loss, tree_reuse, transpositions)
+        up.engines.solvers.evaluate.evaluation_loop(runs, up.engines.solvers.mcts.combination_plan, params, profile_json)
+    print_cache_info(mdp)
+    print_cache_info(split_mdp, 'split_mdp')
 
 
+if up.args.parallel == 'tree' and up.args.workers > 1 and up.args.selection_type != 'avg':
+    up.parser.parser.error('tree parallel search supports only the avg selection type')
 
+if up.args.seed is not None:
+    random.seed(up.args.seed)
+    np.random.seed(up.args.seed)
 
 if up.args.domain_type == 'combination':
     run_combination(domain=up.args.domain, runs=up.args.runs, solver=up.args.solver, deadline=up.args.deadline,
                     search_time=up.args.search_time,
                     search_depth=up.args.search_depth, exploration_constant=up.args.exploration_constant,
-                    selection_type=up.args.selection_type, object_amount=up.args.object_amount, garbage_amount=up.args.garbage_amount, k=up.args.k)
+                    selection_type=up.args.selection_type, object_amount=up.args.object_amount, garbage_amount=up.args.garbage_amount, k=up.args.k,
+                    workers=up.args.workers, parallel=up.args.parallel, virtual_loss=up.args.virtual_loss,
+                    search_iterations=up.args.search_iterations, cache_size=up.args.cache_size,
+                    heuristic_cache_size=up.args.heuristic_cache_size, heuristic_samples=up.args.heuristic_samples,
+                    heuristic_mode=up.args.heuristic_mode, tree_reuse=up.args.tree_reuse,
+                    transpositions=up.args.transpositions, outcome_threshold=up.args.outcome_threshold,
+                    outcome_mass=up.args.outcome_mass, profile=up.args.profile, profile_json=up.args.profile_json)
 else:
     run_regular(domain=up.args.domain, domain_type=up.args.domain_type, runs=up.args.runs, deadline=up.args.deadline,
                 search_time=up.args.search_time,
                 search_depth=up.args.search_depth, exploration_constant=up.args.exploration_constant,
-                selection_type=up.args.selection_type, object_amount=up.args.object_amount, garbage_amount=up.args.garbage_amount, k=up.args.k)
+                selection_type=up.args.selection_type, object_amount=up.args.object_amount, garbage_amount=up.args.garbage_amount, k=up.args.k,
+                workers=up.args.workers, parallel=up.args.parallel, virtual_loss=up.args.virtual_loss,
+                search_iterations=up.args.search_iterations, cache_size=up.args.cache_size,
+                heuristic_cache_size=up.args.heuristic_cache_size, heuristic_samples=up.args.heuristic_samples,
+                heuristic_mode=up.args.heuristic_mode, lazy_expansion=up.args.lazy_expansion,
+                stn_bounds=up.args.stn_bounds, stn_type=up.args.stn_type, tree_reuse=up.args.tree_reuse,
+                transpositions=up.args.transpositions, interval_resolution=up.args.interval_resolution,
+                interval_coalesce=up.args.interval_coalesce, profile=up.args.profile, profile_json=up.args.profile_json,
+                memory_benchmark_only=up.args.memory_benchmark)
@@ -1,12 +1,16 @@
 from unified_planning.tests.problems import (mutex_converted_problem,
                                              OAP_converted_problem,
                                              combination_converted_problem,
-                                             LS_converted_problem)
+                                             stuck_car_combination_converted_problem,
+                                             LS_converted_problem,
+                                             stuck_car_converted_problem)
 
 
 __all__ = [
     "mutex_converted_problem",
     "OAP_converted_problem",
     "combination_converted_problem",
+    "stuck_car_combination_converted_problem",
     "LS_converted_problem",
+    "stuck_car_converted_problem",
     ]
\ No newline at end of file
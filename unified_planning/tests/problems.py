@@ -142,6 +142,18 @@ combination_convert_problem = unified_planning.engines.Convert_problem_combinati
 combination_converted_problem = combination_convert_problem._converted_problem
 
 
+stuck_car_combination_domain = unified_planning.domains.Stuck_Car(kind='combination', deadline=15, object_amount=1)
+grounder = unified_planning.engines.compilers.Grounder()
+stuck_car_combination_grounding_result = grounder._compile(stuck_car_combination_domain.problem)
+stuck_car_combination_ground_problem = stuck_car_combination_grounding_result.problem
+
+stuck_car_combination_convert_problem = unified_planning.engines.Convert_problem_combination(
+    stuck_car_combination_domain, stuck_car_combination_ground_problem)
+
+stuck_car_combination_converted_problem = stuck_car_combination_convert_problem._converted_problem
+stuck_car_combination_domain.remove_actions(stuck_car_combination_converted_problem)
+
+
 
 LS_problem = unified_planning.model.Problem('long_short_actions')
 
@@ -178,4 +190,15 @@ LS_ground_problem = LS_grounding_result.problem
 
 LS_convert_problem = unified_planning.engines.Convert_problem(OAP_ground_problem)
 
-LS_converted_problem = LS_convert_problem._converted_problem
\ No newline at end of file
+LS_converted_problem = LS_convert_problem._converted_problem
+
+
+
+stuck_car_domain = unified_planning.domains.Stuck_Car(kind='regular', deadline=15, object_amount=1)
+grounder = unified_planning.engines.compilers.Grounder()
+stuck_car_grounding_result = grounder._compile(stuck_car_domain.problem)
+stuck_car_ground_problem = stuck_car_grounding_result.problem
+
+stuck_car_convert_problem = unified_planning.engines.Convert_problem(stuck_car_ground_problem)
+
+stuck_car_converted_problem = stuck_car_convert_problem._converted_problem
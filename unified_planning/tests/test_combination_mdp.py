@@ -2,7 +2,7 @@ import unified_planning as up
 from unified_planning.shortcuts import *
 import unittest
 
-from unified_planning.tests import combination_converted_problem
+from unified_planning.tests import combination_converted_problem, stuck_car_combination_converted_problem
 
 
 class Test_Combination_MDP(unittest.TestCase):
@@ -22,6 +22,8 @@ class Test_Combination_MDP(unittest.TestCase):
         cls.effect3 = combination_converted_problem.fluent_by_name('effect3')
         cls.in_execution = combination_converted_problem.fluent_by_name('inExecution')
 
+        cls.stuck_car_problem = stuck_car_combination_converted_problem
+
     # def setUp(self) -> None:
     #
 
@@ -102,6 +104,46 @@ class Test_Combination_MDP(unittest.TestCase):
             for node in next_state.active_actions.data:
                 self.assertTrue(node.duration_left == node.action.duration.lower.int_constant_value() -2, 'the duration left should decrease by 2')
 
+    def test_combination_cached_active_actions(self):
+        print("Running test_combination_cached_active_actions...")
+
+        mdp = unified_planning.engines.combinationMDP(self.combination_converted_problem, discount_factor=0.95,
+                                                      cache_size=10)
+        second_35 = combination_converted_problem.action_by_name('second_3,second_5')
+        second_5 = combination_converted_problem.action_by_name('second_5')
+        _, first_state, _ = mdp.step(self.init_state, second_35)
+        first_hash = hash(first_state)
+        first_active_actions = len(first_state.active_actions)
+        _, cached_state, _ = mdp.step(self.init_state, second_35)
+
+        cached_state.add_action(second_5)
+        self.assertEqual(first_hash, hash(first_state), 'states of the cached step should not share active actions')
+        self.assertEqual(first_active_actions, len(first_state.active_actions))
+
+    def test_combination_successors(self):
+        print("Running test_combination_successors...")
+
+        mdp = unified_planning.engines.combinationMDP(self.stuck_car_problem, discount_factor=0.95)
+        state = mdp.initial_state()
+        push_car = self.stuck_car_problem.action_by_name('push_car_r0_c0')
+
+        transitions, covered = mdp.successors(state, push_car)
+        probabilities = [probability for _, probability in transitions]
+        self.assertEqual(4, len(transitions))
+        self.assertEqual(4, len(set(next_state for next_state, _ in transitions)), 'equal next states should be merged')
+        self.assertAlmostEqual(1, covered)
+        self.assertEqual(sorted(probabilities, reverse=True), probabilities, 'the most likely outcomes come first')
+        self.assertAlmostEqual(1, sum(probability for _, probability in mdp.transition_function(state, push_car)),
+                               msg='merging the next states keeps the total probability')
+
+        transitions, covered = mdp.successors(state, push_car, threshold=0.05)
+        self.assertEqual(3, len(transitions))
+        self.assertAlmostEqual(0.96, covered)
+
+        transitions, covered = mdp.successors(state, push_car, mass=0.9)
+        self.assertEqual(2, len(transitions))
+        self.assertAlmostEqual(0.9, covered)
+
 
 
 if __name__ == '__main__':
@@ -0,0 +1,225 @@
+import math
+
+import unified_planning
+from unified_planning.shortcuts import *
+import unittest
+
+
+class TestIntervalMap(unittest.TestCase):
+    def setUp(self) -> None:
+        self.intervalMap = IntervalMap()
+
+    def test_empty_list(self):
+        print("Running test_empty_list...")
+
+        node = LinkedListNode(3, 5, 10)
+
+        self.intervalMap.update(3, 5, 10)
+        self.assertTrue(self.intervalMap.max_value == 10, 'max value should be 10')
+        self.assertTrue(self.intervalMap.head.equal(node), 'head must be equal to node')
+
+    def test_add_before_head(self):
+        print("Running test_add_before_head...")
+
+        next = LinkedListNode(3, 5, 10)
+        head = LinkedListNode(1, 2, 20)
+
+        self.intervalMap.update(3, 5, 10)
+        self.intervalMap.update(1, 2, 20)
+
+        head.next = next
+
+        self.assertTrue(self.intervalMap.max_value == 20, 'max value should be 20')
+        self.assertTrue(self.intervalMap.head.equal(head), 'head must be equal to head')
+
+    def test_add_intersection_head(self):
+        print("Running test_add_intersection_head...")
+
+        self.intervalMap.update(3, 5, 10)
+        self.intervalMap.update(1, 4, 20)
+
+        head = LinkedListNode(1, 3 - self.intervalMap.epsilon, 20)
+        next = LinkedListNode(3, 4, 30)
+        next2 = LinkedListNode(4 + self.intervalMap.epsilon, 5, 10)
+        head.next = next
+        next.next = next2
+
+        self.assertTrue(self.intervalMap.max_value == 30, 'max value should be 30')
+        self.assertTrue(self.intervalMap.head.equal(head), 'head must be equal to head')
+
+    def test_add_intersection(self):
+        print("Running test_add_intersection_head...")
+
+        self.intervalMap.update(3, 5, 10)
+        self.intervalMap.update(6, 8, 10)
+        self.intervalMap.update(9, 11, 10)
+        self.intervalMap.update(7, 10, 20)
+
+        head = LinkedListNode(3, 5, 10)
+        next = LinkedListNode(6, 7 - self.intervalMap.epsilon, 10)
+        next1 = LinkedListNode(7, 8, 30)
+        next2 = LinkedListNode(8 + self.intervalMap.epsilon, 9 - self.intervalMap.epsilon, 20)
+        next3 = LinkedListNode(9, 10, 30)
+        next4 = LinkedListNode(10 + self.intervalMap.epsilon, 11, 10)
+        head.next = next
+        next.next = next1
+        next1.next = next2
+        next2.next = next3
+        next3.next = next4
+
+        interval_value = self.intervalMap.interval_value(4, 6.5)
+
+        node = LinkedListNode(4, 5, 10)
+        node.next = LinkedListNode(6, 6.5, 10)
+
+        self.assertTrue(self.intervalMap.max_value == 30, 'max value should be 30')
+        self.assertTrue(self.intervalMap.head.equal(head), 'head must be equal to head')
+        self.assertTrue(interval_value.equal(node))
+
+    def test_add_after_head(self):
+        print("Running test_add_after_head...")
+
+
+        head = LinkedListNode(3, 5, 10)
+        next = LinkedListNode(6, 7, 20)
+
+        self.intervalMap.update(3, 5, 10)
+        self.intervalMap.update(6, 7, 20)
+
+
+        head.next = next
+
+        self.assertTrue(self.intervalMap.max_value == 20, 'max value should be 20')
+        self.assertTrue(self.intervalMap.head.equal(head), 'head must be equal to head')
+
+
+    def test_add_several_nodes_at_once(self):
+        print("Running test_add_several_nodes_at_once...")
+
+        self.intervalMap.update(3, 5, 10)
+        self.intervalMap.update(6, 8, 10)
+        self.intervalMap.update(10, 12, 10)
+
+
+        self.intervalMap.update(4, 5, 10)
+        self.intervalMap.update(6, 11, 10)
+
+        head = LinkedListNode(3, 4 - self.intervalMap.epsilon, 10)
+        next = LinkedListNode(4, 5, 20)
+        next1 = LinkedListNode(6, 8, 20)
+        next2 = LinkedListNode(8+self.intervalMap.epsilon, 10 - self.intervalMap.epsilon, 10)
+        next3 = LinkedListNode(10, 11, 20)
+        next4 = LinkedListNode(11 + self.intervalMap.epsilon, 12, 10)
+        head.next = next
+        next.next = next1
+        next1.next = next2
+        next2.next = next3
+        next3.next = next4
+
+
+        self.assertTrue(self.intervalMap.max_value == 20, 'max value should be 20')
+        self.assertTrue(self.intervalMap.head.equal(head), 'head must be equal to head')
+
+    def test_same_interval(self):
+        print("Running test_same_interval...")
+
+        self.intervalMap.update(3, 5, 10)
+        self.intervalMap.update(6, 10, 10)
+
+        self.intervalMap.update(3, 5, 10)
+        self.intervalMap.update(6, 6, 10)
+
+        head = LinkedListNode(3, 5, 20)
+        next = LinkedListNode(6, 6, 20)
+        next2 = LinkedListNode(6+self.intervalMap.epsilon, 10, 10)
+        head.next = next
+        head.next.next = next2
+
+        self.assertTrue(self.intervalMap.max_value == 20, 'max value should be 20')
+        self.assertTrue(self.intervalMap.head.equal(head), 'head must be equal to head')
+
+    def test_same_interval_and_head_change(self):
+        print("Running test_same_interval_and_head_change...")
+
+        self.intervalMap.update(6, 10, 10)
+
+        self.intervalMap.update(3, 5, 10)
+        self.intervalMap.update(6, 6, 10)
+
+        head = LinkedListNode(3, 5, 10)
+        next = LinkedListNode(6, 6, 20)
+        next2 = LinkedListNode(6+self.intervalMap.epsilon, 10, 10)
+        head.next = next
+        head.next.next = next2
+
+        self.assertTrue(self.intervalMap.max_value == 20, 'max value should be 20')
+        self.assertTrue(self.intervalMap.head.equal(head), 'head must be equal to head')
+
+
+    def test_maximum_value_interval(self):
+        print("Running test_maximum_value_interval...")
+
+        self.intervalMap.update(6, 10, 10)
+        self.intervalMap.update(6, 10, 13)
+        self.intervalMap.update(6, 10, 13)
+        self.intervalMap.update(6, 10, 10)
+        self.intervalMap.update(8, 10, 10)
+        self.intervalMap.update(8, 10, 10)
+
+        self.assertTrue(self.intervalMap.max_value == 66, 'max value should be 66')
+        self.assertTrue(self.intervalMap.max_interval == (8, 10), 'the maximum interval should be (8,10)')
+
+    def test_max_update(self):
+        print("Running test_max_update...")
+
+        self.intervalMap.update(3, 5, 10)
+        self.intervalMap.update(6, 8, 30)
+
+        backup_node = LinkedListNode(4, 7, 20)
+        backup_node.next = LinkedListNode(7 + self.intervalMap.epsilon, 9, 5)
+        update_node = self.intervalMap.update(backup_node, type='Max')
+
+        self.assertEqual([(3, 4 - self.intervalMap.epsilon, 10), (4, 5, 20), (5 + self.intervalMap.epsilon, 6 - self.intervalMap.epsilon, 20),
+                          (6, 7, 30), (7 + self.intervalMap.epsilon, 8, 30), (8 + self.intervalMap.epsilon, 9, 5)],
+                         self.intervalMap.fragments())
+        self.assertEqual((4, 5, 20), update_node.interval() + (update_node.value,))
+        self.assertEqual(30, self.intervalMap.range_max(4, 9))
+        self.assertEqual(20, self.intervalMap.range_max(0, 5.5))
+        self.assertIsNone(self.intervalMap.range_max(10, 12))
+
+    def test_coalesce_max_interval(self):
+        print("Running test_coalesce_max_interval...")
+
+        coalesced = IntervalMap(coalesce=True)
+        for intervals in (self.intervalMap, coalesced):
+            intervals.update(2, 10, 10)
+            intervals.update(4, 6, 5)
+            intervals.update(2, 4 - intervals.epsilon, 5)
+            intervals.update(6 + intervals.epsilon, 8, 5)
+
+        self.assertEqual(self.intervalMap.max_value, coalesced.max_value)
+        self.assertEqual((4, 6), self.intervalMap.max_interval)
+        # the maximal interval of the coalesced map contains the maximal interval of the other map
+        self.assertEqual((2, 8), coalesced.max_interval)
+        self.assertEqual([(2, 8, 15), (8 + coalesced.epsilon, 10, 10)], coalesced.fragments())
+        self.assertLess(len(coalesced), len(self.intervalMap))
+
+    def test_resolution(self):
+        print("Running test_resolution...")
+
+        intervals = IntervalMap(resolution=0.5)
+        intervals.update(1.1, 2.9, 10)
+        intervals.update(0.9, 3.2, 10)
+        self.assertEqual([(1, 3, 20)], intervals.fragments())
+
+        intervals.update(1.2, 1.4, 10)
+        self.assertEqual([(1, 1.5, 30), (1.5 + intervals.epsilon, 3, 20)], intervals.fragments())
+        self.assertEqual((1, 1.5), intervals.max_interval)
+        self.assertEqual(IntervalMap(resolution=0.5).fragments(), intervals.empty().fragments())
+        self.assertEqual(0.5, intervals.empty().resolution)
+
+
+
+
+if __name__ == '__main__':
+    unittest.main()
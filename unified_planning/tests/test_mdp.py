@@ -1,13 +1,16 @@
 import unified_planning
 from unified_planning.shortcuts import *
+import random
 import unittest
-from unified_planning.tests import mutex_converted_problem
+import numpy as np
+from unified_planning.tests import mutex_converted_problem, stuck_car_converted_problem
 
 class TestMDP(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         cls.converted_problem = mutex_converted_problem
         cls.mdp = unified_planning.engines.MDP(cls.converted_problem, discount_factor=0.95)
+        cls.stuck_car_problem = stuck_car_converted_problem
 
     def test_soft_mutex_is_not_legal(self):
         print("Running test_soft_mutex_is_not_legal...")
@@ -40,6 +43,128 @@ class TestMDP(unittest.TestCase):
 
         self.assertTrue(next_state2 in legal)
 
+    def test_bitset_state(self):
+        print("Running test_bitset_state...")
+
+        add_effect = self.converted_problem.action_by_name("add_effect")
+        _, next_state, _ = self.mdp.step(self.mdp.initial_state(), add_effect)
+
+        # A state built from the predicates equals the bitset state built by the MDP
+        state = up.engines.State(set(next_state.predicates))
+        self.assertEqual(next_state.mask, self.mdp.state_mask(state))
+        self.assertEqual(state, next_state)
+        self.assertEqual(hash(state), hash(next_state))
+        self.assertEqual(self.mdp.legal_actions(state), self.mdp.legal_actions(next_state))
+
+    def test_vectorized_legal_actions(self):
+        print("Running test_vectorized_legal_actions...")
+
+        vectorized_mdp = unified_planning.engines.MDP(self.converted_problem, discount_factor=0.95,
+                                                      vectorize_threshold=0)
+        self.assertIsNotNone(vectorized_mdp.legal_actions_engine)
+
+        start_a = self.converted_problem.action_by_name("start_a")
+        start_soft_mutex = self.converted_problem.action_by_name("start_soft_mutex")
+        state = self.mdp.initial_state()
+        for action in [start_a, start_soft_mutex]:
+            self.assertEqual(self.mdp.legal_actions(state), vectorized_mdp.legal_actions(state))
+            _, state, _ = self.mdp.step(state, action)
+        self.assertEqual(self.mdp.legal_actions(state), vectorized_mdp.legal_actions(state))
+
+    def test_cache(self):
+        print("Running test_cache...")
+
+        cached_mdp = unified_planning.engines.MDP(self.converted_problem, discount_factor=0.95, cache_size=2)
+        start_a = self.converted_problem.action_by_name("start_a")
+        state = cached_mdp.initial_state()
+
+        for _ in range(2):
+            self.assertEqual(self.mdp.legal_actions(state), cached_mdp.legal_actions(state))
+            self.assertEqual(self.mdp.step(state, start_a), cached_mdp.step(state, start_a))
+
+        cache_info = cached_mdp.cache_info()
+        self.assertEqual(1, cache_info['legal_actions']['hits'])
+        self.assertEqual(1, cache_info['step']['hits'])
+
+        # The cached legal actions are not changed by the callers
+        cached_mdp.legal_actions(state).clear()
+        self.assertEqual(self.mdp.legal_actions(state), cached_mdp.legal_actions(state))
+
+    def test_heuristic_cache(self):
+        print("Running test_heuristic_cache...")
+
+        cached_mdp = unified_planning.engines.MDP(self.converted_problem, discount_factor=0.95,
+                                                  heuristic_cache_size=10, heuristic_samples=3)
+        state = cached_mdp.initial_state()
+        samples = cached_mdp.heuristic_cache.samples
+
+        for _ in range(samples + 1):
+            self.assertEqual(self.mdp.heuristic(state, 0), cached_mdp.heuristic(state, 0))
+
+        info = cached_mdp.cache_info()['heuristic']
+        self.assertEqual(samples, info['misses'], "The TRPG runs until the expected value is estimated")
+        self.assertEqual(1, info['hits'])
+        self.assertEqual(1, info['entries'])
+
+    def test_relaxed_heuristic_modes(self):
+        print("Running test_relaxed_heuristic_modes...")
+
+        for mode in ['union', 'most_likely']:
+            mdp = unified_planning.engines.MDP(self.stuck_car_problem, discount_factor=0.95, heuristic_mode=mode)
+            state = mdp.initial_state()
+            random_state = np.random.get_state()[1].copy()
+            values = {mdp.heuristic(state, 0) for _ in range(10)}
+
+            self.assertEqual(1, len(values), f"The {mode} heuristic should be deterministic")
+            self.assertTrue((random_state == np.random.get_state()[1]).all(), "No outcome should be drawn")
+
+    def test_compiled_outcomes(self):
+        print("Running test_compiled_outcomes...")
+
+        mdps = [unified_planning.engines.MDP(self.stuck_car_problem, discount_factor=0.95, seed=3) for _ in range(2)]
+
+        search = self.stuck_car_problem.action_by_name('end_search_r0')
+        push_gas = self.stuck_car_problem.action_by_name('end_push_gas_r0_c0')
+        self.assertIsInstance(mdps[0].probabilistic_outcomes(search)[0], CompiledOutcomes)
+        self.assertNotIsInstance(mdps[0].probabilistic_outcomes(push_gas)[0], CompiledOutcomes,
+                                 "The outcomes of pushing depend on the state")
+
+        state = mdps[0].initial_state()
+        draws = [[mdp.apply_probabilistic_masks(state, search) for _ in range(50)] for mdp in mdps]
+        self.assertEqual(draws[0], draws[1], "Equally seeded mdps should draw the same outcomes")
+        self.assertEqual(2, len(set(draws[0])))
+
+    def test_structured_outcomes(self):
+        print("Running test_structured_outcomes...")
+
+        search = self.stuck_car_problem.action_by_name('end_search_r0').probabilistic_effects[0]
+        push_gas = self.stuck_car_problem.action_by_name('end_push_gas_r0_c0').probabilistic_effects[0]
+
+        self.assertIsNotNone(search.static_outcomes, "The outcomes of searching are computed when grounding")
+        self.assertIsNone(push_gas.static_outcomes, "The outcomes of pushing depend on the state")
+        self.assertEqual([0.1, 0.9], [probability for probability, _, _ in search.static_outcomes])
+        self.assertIsNone(ProbabilisticEffect(search.fluents, search.probability_function).static_outcomes,
+                          "Only the effects declared static are computed once")
+
+        fluent = search.fluents[0]
+        self.assertEqual([(0.5, frozenset([fluent]), frozenset()), (0.5, frozenset(), frozenset([fluent]))],
+                         to_outcomes([(0.5, [fluent], []), (0.5, [], [fluent])]),
+                         "Outcomes with equal probabilities should not collide")
+        self.assertEqual([(0.3, frozenset([fluent]), frozenset()), (0.7, frozenset(), frozenset())],
+                         to_outcomes({0.3: {fluent: True}, 0.7: {}}))
+
+    def test_alias_sampler(self):
+        print("Running test_alias_sampler...")
+
+        probabilities = [0.57, 0.38, 0.02, 0.03]
+        sampler = AliasSampler(probabilities)
+        rng = random.Random(0)
+        counts = [0] * len(probabilities)
+        for _ in range(20000):
+            counts[sampler.sample(rng)] += 1
+
+        for count, p in zip(counts, probabilities):
+            self.assertAlmostEqual(p, count / 20000, delta=0.01)
 
 
 if __name__ == '__main__':
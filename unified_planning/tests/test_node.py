@@ -20,7 +20,7 @@ class TestNode(unittest.TestCase):
 
         state = self.mdp.initial_state()
         snode = up.engines.C_SNode(state, 0, self.mdp.legal_actions(state), self.stn, isInterval=True)
-        anode = list(snode.children.values())[0]
+        anode = snode.child(snode.possible_actions[0])
 
         for i in range(3):
             backup_node = LinkedListNode(1,3, 10)
@@ -36,7 +36,7 @@ class TestNode(unittest.TestCase):
 
         state = self.mdp_LS.initial_state()
         snode = up.engines.C_SNode(state, 0, self.mdp.legal_actions(state), self.stn, isInterval=True)
-        anode = list(snode.children.values())[0]
+        anode = snode.child(snode.possible_actions[0])
 
         for i in range(3):
             backup_node = LinkedListNode(1, 3, 10)
@@ -47,6 +47,46 @@ class TestNode(unittest.TestCase):
 
         self.assertFalse(self.stn.is_consistent(), 'Long action cannot end before the short action')
 
+    def test_virtual_loss_diverts_uct(self):
+        print("Running test_virtual_loss_diverts_uct...")
+
+        state = self.mdp.initial_state()
+        snode = up.engines.SNode(state, 0, self.mdp.legal_actions(state))
+        mcts = up.engines.solvers.mcts.Base_MCTS(self.mdp, 10, 10, 10)
+        for action in snode.possible_actions:
+            snode.update(1)
+            snode.child(action).update(1)
+
+        action = mcts.uct(snode, 10)
+        snode.add_virtual_loss(1)
+        snode.child(action).add_virtual_loss(1)
+        self.assertNotEqual(action, mcts.uct(snode, 10), 'A node with virtual loss should not be chosen again')
+
+        snode.remove_virtual_loss(1)
+        snode.child(action).remove_virtual_loss(1)
+        self.assertEqual(action, mcts.uct(snode, 10))
+
+    def test_transpositions(self):
+        print("Running test_transpositions...")
+
+        state = self.mdp.initial_state()
+        snode = up.engines.SNode(state, 0, self.mdp.legal_actions(state))
+        mcts = up.engines.solvers.mcts.Base_MCTS(self.mdp, 10, 10, 10, transpositions=True)
+        first, second = snode.child(snode.possible_actions[0]), snode.child(snode.possible_actions[1])
+
+        key = mcts.find_transposition(first, state, 1)
+        self.assertIsNotNone(key, 'The state is not in the table yet')
+        next_snode = up.engines.SNode(state, 1, self.mdp.legal_actions(state), first)
+        first.add_child(next_snode)
+        mcts.add_transposition(key, next_snode)
+
+        self.assertIsNone(mcts.find_transposition(second, state, 1))
+        self.assertIs(next_snode, second.children[state], 'The state node is shared by both action nodes')
+        self.assertIs(first, next_snode.parent)
+        third = snode.child(snode.possible_actions[2])
+        self.assertIsNotNone(mcts.find_transposition(third, state, 2), 'The depth is part of the key')
+        self.assertEqual(1, mcts.transposition_hits)
+
 
 if __name__ == '__main__':
     unittest.main()
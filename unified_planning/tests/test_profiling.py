@@ -0,0 +1,39 @@
+import unittest
+
+from unified_planning.engines import Profiler
+from unified_planning.engines.interval_map import IntervalMap
+
+
+class TestProfiling(unittest.TestCase):
+    def test_records_calls_per_step(self):
+        print("Running test_records_calls_per_step...")
+
+        original = IntervalMap.update
+        profiler = Profiler()
+        profiler.enable()
+        try:
+            self.assertIsNot(original, IntervalMap.update)
+            intervals = IntervalMap()
+            profiler.start_step()
+            intervals.update(0, 5, 1)
+            intervals.update(2, 3, 1)
+            profiler.start_step()
+            intervals.update(1, 4, 1)
+        finally:
+            profiler.disable()
+
+        self.assertIs(original, IntervalMap.update)
+        summary = profiler.summary()
+        self.assertEqual(3, summary['components']['interval_update']['count'])
+        self.assertEqual([2, 1], [step['interval_update']['count'] for step in summary['steps']])
+
+    def test_disabled_profiler_records_nothing(self):
+        print("Running test_disabled_profiler_records_nothing...")
+
+        profiler = Profiler()
+        IntervalMap().update(0, 5, 1)
+        self.assertEqual({}, profiler.summary()['components'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import threading
+
+import unified_planning
+from unified_planning.shortcuts import *
+import unittest
+from unified_planning.tests import mutex_converted_problem
+
+
+class TestSearchBudget(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.converted_problem = mutex_converted_problem
+        cls.mdp = unified_planning.engines.MDP(cls.converted_problem, discount_factor=0.95)
+
+    def test_iteration_budget(self):
+        print("Running test_iteration_budget...")
+
+        budget = SearchBudget(iterations=25)
+        stn = create_init_stn(self.mdp)
+        mcts = C_MCTS(self.mdp, None, self.mdp.initial_state(), 10, 10, stn, 'avg', 10)
+        action, statistics = mcts.anytime_search(budget)
+
+        self.assertEqual(25, mcts.iterations)
+        self.assertEqual(25, sum(count for count, _ in statistics.values()))
+        self.assertIn(action.name, statistics)
+
+    def test_stop_event(self):
+        print("Running test_stop_event...")
+
+        stop_event = threading.Event()
+        budget = SearchBudget(iterations=100, stop_event=stop_event, time_check_stride=1)
+        while not budget.exhausted():
+            budget.step()
+            if budget.iterations == 10:
+                stop_event.set()
+
+        self.assertEqual(10, budget.iterations, "The search should stop once the event is set")
+
+        budget.start()
+        self.assertEqual(0, budget.iterations, "Starting the budget should reset it")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import unified_planning
 from unified_planning.shortcuts import *
+import random
 import unittest
 
 
@@ -219,6 +220,241 @@ class TestSTN(unittest.TestCase):
 
         self.assertTrue(self.stn.get_legal_interval(node)==(4,6), 'The deadline is 6')
 
+    def test_consistent_actions(self):
+        print("Running test_consistent_actions...")
+
+        starts = [self.a_start_short, self.a_start_long, self.a_start_very_long, self.a_start_very_short]
+        for stn_type in ['delta', 'array']:
+            for prefix in [[], [self.a_start_long], [self.a_start_short, self.a_start_long],
+                           [self.a_start_very_long, self.a_start_short], [self.a_start_long, self.a_start_very_short]]:
+                stn = create_init_stn(self.mdp, stn_type=stn_type)
+                node = None
+                for action in prefix:
+                    node = update_stn(stn, action, node)
+                candidates = starts + [end.action_instance.action for end in stn._potential_end_actions]
+
+                expected = []
+                for action in candidates:
+                    clone = stn.clone()
+                    update_stn(clone, action, node)
+                    if clone.is_consistent():
+                        expected.append(action)
+                self.assertEqual(expected, stn.consistent_actions(candidates, node))
+
+    def test_compact(self):
+        print("Running test_compact...")
+
+        for stn_type in ['delta', 'array']:
+            stn = create_init_stn(self.mdp, stn_type=stn_type)
+            compacted = create_init_stn(self.mdp, stn_type=stn_type)
+            node = compacted_node = None
+            for action in [self.a_start_long, self.a_start_short, self.a_end_short, self.a_end_long]:
+                node = update_stn(stn, action, node, type='SetTime')
+                compacted_node = update_stn(compacted, action, compacted_node, type='SetTime')
+                compacted.compact(keep=[compacted_node])
+
+                self.assertTrue(compacted.is_consistent())
+                self.assertEqual(stn.get_current_end_time(), compacted.get_current_end_time())
+                self.assertEqual(stn.get_legal_interval(node), compacted.get_legal_interval(compacted_node))
+                self.assertEqual(stn.get_lower_bound_potential_end_action(),
+                                 compacted.get_lower_bound_potential_end_action())
+
+            self.assertEqual(3, len(compacted._stn.distances), 'Only the plan start, the plan end and the last action remain')
+            self.assertLess(len(compacted._stn.distances), len(stn._stn.distances))
+
+    def test_copy_on_write(self):
+        print("Running test_copy_on_write...")
+
+        stn = unified_planning.plans.stn.DeltaSimpleTemporalNetwork()
+        stn.insert_interval('start', 'a', left_bound=2)
+        copies = [stn.copy_stn()]
+        for _ in range(5):
+            copies.append(copies[-1].copy_stn())
+        copy = copies[-1]
+
+        copy.insert_interval('a', 'b', left_bound=3)
+        stn.insert_interval('a', 'b', right_bound=1)
+        stn.insert_interval('start', 'b', left_bound=4)
+
+        self.assertNotIn('b', copies[0], 'A change of a copy is not shared')
+        self.assertEqual(5, copy.get_stn_model('b'))
+        self.assertTrue(copy.check_stn())
+        self.assertEqual(4, stn.get_stn_model('b'), 'A change of the original is not shared')
+        self.assertEqual({'start': [(-2, 'a')], 'a': [(-3, 'b')], 'b': []}, copy.get_constraints())
+
+        stn.insert_interval('a', 'b', left_bound=2)
+        self.assertFalse(stn.check_stn())
+        self.assertTrue(copy.check_stn())
+
+    def test_latest_times(self):
+        print("Running test_latest_times...")
+
+        stn = unified_planning.plans.stn.DeltaSimpleTemporalNetwork(origin='start')
+        stn.insert_interval('start', 'end', left_bound=0, right_bound=10)
+        stn.insert_interval('start', 'a', left_bound=0)
+        stn.insert_interval('a', 'end', left_bound=0)
+        self.assertEqual(10, stn.get_latest_time('a'))
+
+        copy = stn.copy_stn()
+        copy.insert_interval('a', 'b', left_bound=3, right_bound=4)
+        copy.insert_interval('b', 'end', left_bound=0)
+        self.assertEqual(7, copy.get_latest_time('a'), 'b lasts at least 3 after a and ends before 10')
+        self.assertEqual(10, copy.get_latest_time('b'))
+        self.assertEqual(10, stn.get_latest_time('a'), 'A change of a copy is not shared')
+        self.assertIsNone(stn.get_latest_time('b'))
+
+        copy.remove_endPlan_constraint('a', 'end')
+        self.assertEqual(7, copy.get_latest_time('a'), 'a is still bounded through b')
+        copy.remove_endPlan_constraint('b', 'end')
+        self.assertIsNone(copy.get_latest_time('a'))
+
+    def test_array_stn(self):
+        print("Running test_array_stn...")
+
+        random.seed(1)
+        for _ in range(50):
+            delta = unified_planning.plans.stn.DeltaSimpleTemporalNetwork(origin=0)
+            array = unified_planning.plans.stn.ArraySimpleTemporalNetwork(origin=0, capacity=2)
+            for event in range(1, 8):
+                for stn in [delta, array]:
+                    stn.insert_interval(0, event, left_bound=0)
+                    stn.insert_interval(event, 8, left_bound=0)
+                    stn.insert_interval(0, 8, right_bound=20)
+            for _ in range(6):
+                a, b = random.sample(range(1, 8), 2)
+                lower = random.randint(0, 6)
+                upper = random.choice([None, lower + random.randint(0, 3)])
+                delta.insert_interval(a, b, left_bound=lower, right_bound=upper)
+                array.insert_interval(a, b, left_bound=lower, right_bound=upper)
+                array = array.copy_stn()
+
+            self.assertEqual(delta.check_stn(), array.check_stn())
+            if delta.check_stn():
+                for event in range(9):
+                    self.assertEqual(delta.get_stn_model(event), array.get_stn_model(event))
+                    self.assertEqual(delta.get_latest_time(event), array.get_latest_time(event))
+
+        stn = create_init_stn(self.mdp, stn_type='array')
+        node = update_stn(stn, self.a_start_long)
+        node_short = update_stn(stn, self.a_start_short, node)
+        node = update_stn(stn, self.a_end_long, node_short)
+        update_stn(stn, self.a_end_short, node)
+        self.assertEqual((3, 4), stn.get_legal_interval(node_short))
+
+    def test_bound_types(self):
+        print("Running test_bound_types...")
+
+        intervals = {}
+        for bound_type in ['auto', 'fraction', 'float']:
+            stn = create_init_stn(self.mdp, bound_type)
+            node = update_stn(stn, self.a_start_long)
+            node_short = update_stn(stn, self.a_start_short, node)
+            node = update_stn(stn, self.a_end_long, node_short)
+            update_stn(stn, self.a_end_short, node)
+            self.assertTrue(stn.is_consistent())
+            intervals[bound_type] = stn.get_legal_interval(node_short)
+
+        self.assertEqual((3, 4), intervals['auto'])
+        self.assertEqual(intervals['auto'], intervals['fraction'])
+        self.assertEqual(intervals['auto'], intervals['float'])
+
+        stn = create_init_stn(self.mdp)
+        update_stn(stn, self.a_start_long)
+        self.assertIsInstance(stn.get_current_end_time(), int)
+        self.assertTrue(all(type(d) is int for d in stn._stn.distances.values()), 'Integral bounds are kept as ints')
+
+    def test_lazy_expansion(self):
+        print("Running test_lazy_expansion...")
+
+        state = self.mdp.initial_state()
+        snode = unified_planning.engines.C_SNode(state, 0, self.mdp.legal_actions(state), self.stn, lazy=True)
+        self.assertEqual({}, snode.children, 'The action nodes are created when the actions are visited')
+
+        self.assertFalse(snode.child(self.a_start_very_short).expanded)
+        self.assertTrue(snode.expand_child(self.a_start_very_long))
+        anode = snode.children[self.a_start_very_long]
+        self.assertFalse(snode.children[self.a_start_very_short].expanded)
+
+        _, next_state, _ = self.mdp.step(state, self.a_start_very_long)
+        next_snode = unified_planning.engines.C_SNode(next_state, 1, self.mdp.legal_actions(next_state),
+                                                      anode.stn, anode, lazy=True)
+        self.assertNotIn(self.a_end_very_long, next_snode.possible_actions, 'The very long action ends after the deadline')
+        self.assertFalse(next_snode.has_consistent_action())
+        self.assertTrue(self.stn.is_consistent(), 'The STN of the parent is not changed')
+
+    def test_signature(self):
+        print("Running test_signature...")
+
+        node = update_stn(self.stn, self.a_start_long)
+        node = update_stn(self.stn, self.a_start_short, node)
+        signature = self.stn.signature(node)
+
+        same_stn = create_init_stn(self.mdp)
+        same_node = update_stn(same_stn, self.a_start_long)
+        same_node = update_stn(same_stn, self.a_start_short, same_node)
+        self.assertEqual(signature, same_stn.signature(same_node))
+        self.assertEqual(hash(signature), hash(same_stn.signature(same_node)))
+
+        # the long action may start later than the short one
+        other_stn = create_init_stn(self.mdp)
+        other_node = update_stn(other_stn, self.a_start_short)
+        other_node = update_stn(other_stn, self.a_start_long, other_node)
+        self.assertNotEqual(signature, other_stn.signature(other_node))
+
+        # the previous node changes the STN as seen by the next action
+        self.assertNotEqual(signature, same_stn.signature(None))
+
+    def test_tree_reuse(self):
+        print("Running test_tree_reuse...")
+
+        # the goal is reached at the end of the action, so the tree grows below its start
+        problem = unified_planning.model.Problem('reuse_problem')
+        goal = unified_planning.model.Fluent('goal', BoolType())
+        problem.add_fluent(goal)
+        problem.set_initial_value(goal, False)
+        work_action = unified_planning.model.DurativeAction('work_action')
+        work_action.add_effect(goal, True)
+        work_action.set_fixed_duration(2)
+        problem.add_action(work_action)
+        problem.set_deadline(Timing(delay=6, timepoint=Timepoint(TimepointKind.START)))
+        problem.add_goal(goal)
+        ground_problem = unified_planning.engines.compilers.Grounder()._compile(problem).problem
+        converted_problem = unified_planning.engines.Convert_problem(ground_problem)._converted_problem
+        mdp = unified_planning.engines.MDP(converted_problem, discount_factor=0.95)
+
+        stn = create_init_stn(mdp)
+        state = mdp.initial_state()
+        mcts = unified_planning.engines.solvers.mcts.C_MCTS(mdp, None, state, 10, 10, stn, 'avg', 10)
+        mcts.search(unified_planning.engines.solvers.search_budget.SearchBudget(iterations=200))
+        action = converted_problem.action_by_name("start_work_action")
+        _, next_state, _ = mdp.step(state, action)
+        reused = mcts.root_node.children[action].children[next_state]
+        count = reused.count
+
+        previous_node = update_stn(stn, action, None, type='SetTime')
+        stn.compact(keep=[previous_node])
+        root_node = mcts.root_node.pop_subtree(action, next_state)
+        root_node.rebase(stn, previous_node)
+
+        self.assertIs(reused, root_node)
+        self.assertIsNone(root_node.parent)
+        self.assertEqual({}, mcts.root_node.children, 'The rest of the tree is released')
+        self.assertEqual(count, root_node.count, 'The statistics of the subtree are kept')
+        stack = [root_node]
+        while stack:
+            snode = stack.pop()
+            for child in snode.children.values():
+                self.assertTrue(child.is_consistent())
+                for next_snode in child.children.values():
+                    self.assertEqual(snode.depth + 1, next_snode.depth)
+                    self.assertIs(child.stn, next_snode._stn, 'The state node shares the STN of its parent')
+                    stack.append(next_snode)
+        self.assertEqual(0, root_node.depth)
+
+        mcts = unified_planning.engines.solvers.mcts.C_MCTS(mdp, root_node, next_state, 10, 10, stn, 'avg', 10, previous_node)
+        mcts.search(unified_planning.engines.solvers.search_budget.SearchBudget(iterations=50))
+        self.assertEqual(count + 50, root_node.count, 'The search continues the reused tree')
+
 
 if __name__ == '__main__':
     unittest.main()